@@ -0,0 +1,419 @@
+""" 效能量測套件
+
+以 `benchmarks/synthetic.py` 產生不同規模的仿真新聞列表，量測主要熱點路徑的耗時，
+並將結果寫入 JSON 檔，以便比較不同提交 (commit) 之間的效能差異。
+
+使用方法 (根目錄下執行):
+    python -m benchmarks.run                              # 規模 1×、10×
+    python -m benchmarks.run --scale 1 10 100 1000        # 完整規模
+    python -m benchmarks.run --filter simulation          # 只量測名稱包含 simulation 者
+    python -m benchmarks.run --compare benchmarks/results/<commit>.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from benchmarks.synthetic import (generate_news_dict_list,
+                                  get_county_name_list, write_news_list_json)
+from libs.blackout import (BLACKOUT_RGB_STR_LUT, get_blackout_color_index,
+                           get_blackout_rgb_str)
+from libs.event_log import get_event_div_font_size_pt
+from libs.news import NewsList, load_news_list
+from libs.news_store import NewsStore
+from libs.reason_emoji import get_reason_emoji, get_reason_emoji_i_list
+from libs.simulation import (BlackoutSimulation, get_city_ratio_list_list,
+                             get_city_ratio_matrix)
+from libs.timeline import Timeline, build_timeline_bundle_dict
+
+BENCHMARK_RESULT_DIR_PATH = Path(__file__).parent / 'results'
+
+BENCHMARK_RESULT_VERSION = 1
+"""結果 JSON 格式版本"""
+
+
+@dataclass
+class BenchmarkDataset:
+    """ 單一規模的量測資料 """
+    scale: float
+    news_dict_list: list[dict]
+    county_name_list: list[str]
+    tmp_dir_path: Path
+    _timeline: Timeline | None = field(default=None, repr=False)
+
+    @property
+    def news_list_json_path(self) -> Path:
+        return self.tmp_dir_path / "news_list.json"
+
+    @property
+    def timeline(self) -> Timeline:
+        if self._timeline is None:
+            self._timeline = Timeline(
+                build_timeline_bundle_dict(self.news_dict_list, self.county_name_list)
+            )
+        return self._timeline
+
+
+@dataclass
+class Benchmark:
+    """ 單一量測項目
+    Attributes:
+        run (Callable[[], object]): 被計時的函數
+        op_count (int): 每次執行包含的操作數 (用以換算每次操作的耗時)
+        reset (Callable[[], None] | None): 每次執行前 (不計時) 重設狀態的函數
+    """
+    run: Callable[[], object]
+    op_count: int = 1
+    reset: Callable[[], None] | None = None
+
+
+BENCHMARK_NAME_TO_SETUP_DICT = dict[str, Callable[[BenchmarkDataset], Benchmark | None]]()
+"""量測項目名稱 -> 準備函數 (返回 None 表示此環境無法量測)"""
+
+
+def benchmark(name: str):
+    """ 註冊量測項目的裝飾器 """
+    def decorator(setup: Callable[[BenchmarkDataset], Benchmark | None]):
+        BENCHMARK_NAME_TO_SETUP_DICT[name] = setup
+        return setup
+    return decorator
+
+
+@benchmark("news.pydantic_validate_json")
+def setup_pydantic_validate_json(dataset: BenchmarkDataset) -> Benchmark:
+    news_list_json_bytes = dataset.news_list_json_path.read_bytes()
+    return Benchmark(
+        run=lambda: NewsList.model_validate_json(news_list_json_bytes),
+        op_count=len(dataset.news_dict_list),
+    )
+
+
+@benchmark("news.load_news_list_snapshot")
+def setup_load_news_list_snapshot(dataset: BenchmarkDataset) -> Benchmark:
+    news_list_snapshot_path = dataset.tmp_dir_path / "news_list.snapshot.pickle"
+    load_news_list(dataset.news_list_json_path, news_list_snapshot_path)
+    return Benchmark(
+        run=lambda: load_news_list(dataset.news_list_json_path, news_list_snapshot_path),
+        op_count=len(dataset.news_dict_list),
+    )
+
+
+@benchmark("reason_emoji.get_reason_emoji")
+def setup_get_reason_emoji(dataset: BenchmarkDataset) -> Benchmark:
+    reason_list = [
+        news_dict["reason"]
+        for news_dict in dataset.news_dict_list
+        if news_dict["reason"] is not None
+    ]
+
+    def run() -> None:
+        for reason in reason_list:
+            get_reason_emoji(reason)
+
+    return Benchmark(
+        run=run,
+        op_count=len(reason_list),
+        reset=get_reason_emoji.cache_clear,
+    )
+
+
+@benchmark("reason_emoji.get_reason_emoji_i_list")
+def setup_get_reason_emoji_i_list(dataset: BenchmarkDataset) -> Benchmark:
+    reason_list = [
+        news_dict["reason"] or ""
+        for news_dict in dataset.news_dict_list
+    ]
+    return Benchmark(
+        run=lambda: get_reason_emoji_i_list(reason_list),
+        op_count=len(reason_list),
+    )
+
+
+@benchmark("timeline.build_timeline_bundle")
+def setup_build_timeline_bundle(dataset: BenchmarkDataset) -> Benchmark:
+    return Benchmark(
+        run=lambda: build_timeline_bundle_dict(
+            dataset.news_dict_list,
+            dataset.county_name_list,
+        ),
+        op_count=len(dataset.news_dict_list),
+    )
+
+
+@benchmark("timeline.group_by_day")
+def setup_group_by_day(dataset: BenchmarkDataset) -> Benchmark:
+    """ 依日期分組事件 (原本以 itertools.groupby 實作，現由時間軸的日索引取代) """
+    timeline = dataset.timeline
+    date_list = [
+        timeline.start_date + datetime.timedelta(days=day_i)
+        for day_i in range(timeline.day_count)
+    ]
+
+    def run() -> None:
+        for date in date_list:
+            timeline.get_event_index_range(date)
+
+    return Benchmark(run=run, op_count=len(date_list))
+
+
+@benchmark("simulation.simulate_day")
+def setup_simulate_day(dataset: BenchmarkDataset) -> Benchmark:
+    timeline = dataset.timeline
+    blackout_simulation = BlackoutSimulation(timeline)
+
+    def run() -> None:
+        for day_i in range(timeline.day_count):
+            blackout_simulation.simulate_day(day_i)
+            blackout_simulation.get_city_to_color_index_dict(day_i)
+
+    return Benchmark(run=run, op_count=timeline.day_count)
+
+
+@benchmark("simulation.city_ratio_list_list")
+def setup_city_ratio_list_list(dataset: BenchmarkDataset) -> Benchmark:
+    timeline = dataset.timeline
+    return Benchmark(
+        run=lambda: get_city_ratio_list_list(timeline),
+        op_count=timeline.day_count,
+    )
+
+
+@benchmark("simulation.city_ratio_matrix")
+def setup_city_ratio_matrix(dataset: BenchmarkDataset) -> Benchmark | None:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return None
+    timeline = dataset.timeline
+    return Benchmark(
+        run=lambda: get_city_ratio_matrix(timeline),
+        op_count=timeline.day_count,
+    )
+
+
+@benchmark("render.blackout_rgb_str")
+def setup_blackout_rgb_str(dataset: BenchmarkDataset) -> Benchmark:
+    """ 每個影格每個縣市的顏色計算 (直接格式化字串) """
+    blackout_ratio_list = [
+        color_i / 1000
+        for color_i in range(1000)
+    ] * max(dataset.timeline.day_count // 1000, 1)
+    return Benchmark(
+        run=lambda: [
+            get_blackout_rgb_str(blackout_ratio)
+            for blackout_ratio in blackout_ratio_list
+        ],
+        op_count=len(blackout_ratio_list),
+    )
+
+
+@benchmark("render.blackout_rgb_str_lut")
+def setup_blackout_rgb_str_lut(dataset: BenchmarkDataset) -> Benchmark:
+    """ 每個影格每個縣市的顏色計算 (量化後查表) """
+    blackout_ratio_list = [
+        color_i / 1000
+        for color_i in range(1000)
+    ] * max(dataset.timeline.day_count // 1000, 1)
+    return Benchmark(
+        run=lambda: [
+            BLACKOUT_RGB_STR_LUT[get_blackout_color_index(blackout_ratio)]
+            for blackout_ratio in blackout_ratio_list
+        ],
+        op_count=len(blackout_ratio_list),
+    )
+
+
+@benchmark("render.event_div_font_size")
+def setup_event_div_font_size(dataset: BenchmarkDataset) -> Benchmark:
+    household_list = dataset.timeline.household_list
+    return Benchmark(
+        run=lambda: [
+            get_event_div_font_size_pt(households)
+            for households in household_list
+        ],
+        op_count=len(household_list),
+    )
+
+
+@benchmark("news_store.append_dedup")
+def setup_news_store_append_dedup(dataset: BenchmarkDataset) -> Benchmark:
+    """ 爬取新聞後的去重複與追加 (一半為既有新聞，一半為新新聞) """
+    store_dir_path = dataset.tmp_dir_path / "news_store"
+    store_dir_path.mkdir(exist_ok=True)
+    news_list_json_path = store_dir_path / "news_list.json"
+    half_news_count = len(dataset.news_dict_list) // 2
+    existing_news_dict_list = dataset.news_dict_list[:half_news_count]
+    appended_news_dict_list = dataset.news_dict_list
+
+    def reset() -> None:
+        for path in store_dir_path.iterdir():
+            path.unlink()
+        write_news_list_json(existing_news_dict_list, news_list_json_path)
+        # 預先建立索引，使量測不包含重建索引的時間
+        NewsStore(news_list_json_path)
+
+    return Benchmark(
+        run=lambda: NewsStore(news_list_json_path).append(appended_news_dict_list),
+        op_count=len(appended_news_dict_list),
+        reset=reset,
+    )
+
+
+def get_git_commit_str() -> str:
+    """ 取得目前的 git 提交雜湊值 (無法取得時為 "unknown") """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(benchmark: Benchmark, repeat_count: int) -> list[float]:
+    """ 重複執行量測項目，返回每次的耗時 (秒) """
+    elapsed_sec_list = list[float]()
+    for _ in range(repeat_count):
+        if benchmark.reset is not None:
+            benchmark.reset()
+        start_sec = time.perf_counter()
+        benchmark.run()
+        elapsed_sec_list.append(time.perf_counter() - start_sec)
+    return elapsed_sec_list
+
+
+def run_benchmark_suite(
+    scale_list: list[float],
+    repeat_count: int = 5,
+    seed: int = 0,
+    name_filter_str: str = "",
+) -> dict:
+    """ 對每個規模執行所有量測項目
+    Returns:
+        dict: 量測結果 (可直接寫入 JSON)
+    """
+    county_name_list = get_county_name_list()
+    result_dict_list = list[dict]()
+    for scale in scale_list:
+        news_dict_list = generate_news_dict_list(
+            scale=scale,
+            seed=seed,
+            county_name_list=county_name_list,
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir_str:
+            dataset = BenchmarkDataset(
+                scale=scale,
+                news_dict_list=news_dict_list,
+                county_name_list=county_name_list,
+                tmp_dir_path=Path(tmp_dir_str),
+            )
+            write_news_list_json(news_dict_list, dataset.news_list_json_path)
+            for name, setup in BENCHMARK_NAME_TO_SETUP_DICT.items():
+                if name_filter_str not in name:
+                    continue
+                if (benchmark := setup(dataset)) is None:
+                    print(f"{name} (scale={scale:g}): 略過", file=sys.stderr)
+                    continue
+                elapsed_sec_list = run_benchmark(benchmark, repeat_count)
+                result_dict = {
+                    "name": name,
+                    "scale": scale,
+                    "news_count": len(news_dict_list),
+                    "op_count": benchmark.op_count,
+                    "min_sec": min(elapsed_sec_list),
+                    "median_sec": statistics.median(elapsed_sec_list),
+                    "mean_sec": statistics.fmean(elapsed_sec_list),
+                    "per_op_min_us": (
+                        min(elapsed_sec_list) / max(benchmark.op_count, 1) * 1e6
+                    ),
+                }
+                result_dict_list.append(result_dict)
+                print(
+                    f"{name:<40} scale={scale:<6g} "
+                    f"min={result_dict['min_sec'] * 1000:10.3f}ms "
+                    f"({result_dict['per_op_min_us']:.3f}us/op)",
+                    file=sys.stderr,
+                )
+
+    return {
+        "version": BENCHMARK_RESULT_VERSION,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit_str(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat_count": repeat_count,
+        "result_list": result_dict_list,
+    }
+
+
+def compare_benchmark_result(
+    baseline_result_dict: dict,
+    result_dict: dict,
+) -> list[tuple[str, float, float]]:
+    """ 比較兩次量測結果的最短耗時
+    Returns:
+        list[tuple[str, float, float]]: (量測項目與規模, 基準耗時, 本次耗時/基準耗時)
+    """
+    key_to_baseline_min_sec_dict = {
+        (_result_dict["name"], _result_dict["scale"]): _result_dict["min_sec"]
+        for _result_dict in baseline_result_dict["result_list"]
+    }
+    comparison_list = list[tuple[str, float, float]]()
+    for _result_dict in result_dict["result_list"]:
+        key = (_result_dict["name"], _result_dict["scale"])
+        if (baseline_min_sec := key_to_baseline_min_sec_dict.get(key)) is None:
+            continue
+        comparison_list.append((
+            f"{key[0]} (scale={key[1]:g})",
+            baseline_min_sec,
+            _result_dict["min_sec"] / baseline_min_sec if baseline_min_sec else float("inf"),
+        ))
+    return comparison_list
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="台灣停電事件模擬器效能量測")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", default="", help="只量測名稱包含此字串的項目")
+    parser.add_argument("--output", type=Path, help="結果 JSON 檔路徑 (預設為 benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="與此基準結果 JSON 檔比較")
+    args = parser.parse_args()
+
+    # 量測期間不輸出函式庫的日誌
+    logger.disable("libs")
+    result_dict = run_benchmark_suite(
+        scale_list=args.scale,
+        repeat_count=args.repeat,
+        seed=args.seed,
+        name_filter_str=args.filter,
+    )
+    output_path = args.output or (
+        BENCHMARK_RESULT_DIR_PATH / f"{result_dict['git_commit']}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(result_dict, indent=4), encoding="utf-8")
+    print(f"量測結果已寫入 {output_path}")
+
+    if args.compare:
+        for key_str, baseline_min_sec, ratio in compare_benchmark_result(
+            json.loads(args.compare.read_text(encoding="utf-8")),
+            result_dict,
+        ):
+            print(f"{key_str:<56} {baseline_min_sec * 1000:10.3f}ms x{ratio:.2f}")
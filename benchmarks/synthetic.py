@@ -0,0 +1,108 @@
+""" 以固定亂數種子產生仿真的新聞列表資料，供效能量測使用
+
+產生的資料與 `data/news_list.json` 的格式與分布相近:
+    - 日期範圍相同，筆數為現有新聞列表的 scale 倍 (密度隨之提高)
+    - 約 1/4 的新聞標註停電戶數 (對數均勻分布)、縣市 (取自 GeoJSON 的真實縣市名稱) 與停電原因
+    - 停電原因與標題皆包含 `libs/reason_emoji.py` 中的真實關鍵字
+"""
+import datetime
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.reason_emoji import EMOJI_TO_KW_LIST_DICT
+
+DATA_DIR_PATH = Path(__file__).parent.parent / 'data'
+GEOJSON_PATH = DATA_DIR_PATH / 'twCounty2010merge.geojson'
+
+BASE_NEWS_COUNT = 2246
+"""現有新聞列表的筆數 (scale=1 時產生的筆數)"""
+
+START_DATE = datetime.date(2014, 2, 22)
+END_DATE = datetime.date(2024, 7, 18)
+
+ANNOTATED_RATIO = 0.24
+"""已標註停電戶數的新聞比例"""
+
+LOCATION_COUNT_WEIGHT_DICT = {1: 511, 2: 7, 3: 1, 4: 1, 5: 1, 7: 1, 22: 17}
+"""已標註新聞的縣市數量分布 (取自現有新聞列表)"""
+
+MEDIA_NAME_LIST = [
+    "自由時報", "聯合新聞網", "Yahoo奇摩新聞", "ETtoday新聞雲",
+    "中央社", "TVBS新聞網", "三立新聞網", "中時新聞網",
+]
+TITLE_FILLER_LIST = [
+    "大停電", "無預警停電", "住戶悶熱難耐", "台電搶修中", "緊急復電",
+    "居民怨聲載道", "紅綠燈全熄", "電梯受困", "商家損失慘重", "今晨",
+]
+
+
+def get_county_name_list(geojson_path: Path = GEOJSON_PATH) -> list[str]:
+    """ 取得 GeoJSON 中的縣市名稱 """
+    geojson_dict = json.loads(geojson_path.read_text(encoding="utf-8"))
+    return [
+        city_dict["properties"]["COUNTYNAME"]
+        for city_dict in geojson_dict["features"]
+    ]
+
+
+def generate_news_dict_list(
+    scale: float = 1,
+    seed: int = 0,
+    county_name_list: list[str] | None = None,
+) -> list[dict]:
+    """ 產生仿真的新聞字典串列 (依日期排序，相同參數必定產生相同結果)
+    Args:
+        scale (float): 筆數相對於現有新聞列表的倍數
+        seed (int): 亂數種子
+    """
+    _random = random.Random(seed)
+    county_name_list = county_name_list or get_county_name_list()
+    reason_kw_list = [
+        reason_kw
+        for reason_kw_list in EMOJI_TO_KW_LIST_DICT.values()
+        for reason_kw in reason_kw_list
+    ]
+    location_count_list = list(LOCATION_COUNT_WEIGHT_DICT)
+    location_count_weight_list = list(LOCATION_COUNT_WEIGHT_DICT.values())
+    day_count = (END_DATE - START_DATE).days + 1
+
+    news_count = max(int(BASE_NEWS_COUNT * scale), 1)
+    news_dict_list = list[dict]()
+    for news_i, day_i in enumerate(sorted(
+        _random.randrange(day_count)
+        for _ in range(news_count)
+    )):
+        date = START_DATE + datetime.timedelta(days=day_i)
+        reason_kw = _random.choice(reason_kw_list)
+        location_count = min(
+            _random.choices(location_count_list, location_count_weight_list)[0],
+            len(county_name_list),
+        )
+        location_list = _random.sample(county_name_list, location_count)
+        households = int(10 ** _random.uniform(1, 6.5))
+        title = (
+            f"{location_list[0]}{_random.choice(TITLE_FILLER_LIST)}！"
+            f"疑{reason_kw}{households}戶受影響 "
+            f"{_random.choice(TITLE_FILLER_LIST)} - {_random.choice(MEDIA_NAME_LIST)}"
+        )
+        is_annotated = _random.random() < ANNOTATED_RATIO
+        news_dict_list.append({
+            "date": f"{date:%Y-%m-%d}",
+            "title": title,
+            "url": f"https://news.google.com/rss/articles/synthetic-{seed}-{news_i}",
+            "households": households if is_annotated else None,
+            "locations": location_list if is_annotated else None,
+            "reason": f"疑似{reason_kw}" if is_annotated else None,
+        })
+    return news_dict_list
+
+
+def write_news_list_json(news_dict_list: list[dict], news_list_json_path: Path) -> None:
+    """ 以與 `data/news_list.json` 相同的格式寫入新聞列表 """
+    news_list_json_path.write_text(
+        json.dumps(news_dict_list, ensure_ascii=False, indent=4),
+        encoding="utf-8",
+    )
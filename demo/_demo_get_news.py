@@ -1,28 +1,20 @@
 import datetime
+import sys
+from pathlib import Path
 from pprint import pprint
 
-from gnews import GNews
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.news import get_raw_news_dict_list
 
 start_date = datetime.date(2024, 5, 18)
 end_date = (
     start_date+datetime.timedelta(days=1)
 )
 
-google_news = GNews(
-    language='zh-Hant',
-    country='TW',
-    start_date=start_date,
-    end_date=end_date,
-    max_results=100,
-    # proxy=proxy,
-    exclude_websites=[
-        'https://www.cw.com.tw',  # 天下雜誌
-        'https://www.parenting.com.tw',  # 親子天下
-        'https://www.ithome.com.tw',  # iThome
-        'https://news.housefun.com.tw',  # 好房網
-        'https://www.soft4fun.net',  # 硬是要學
-    ]
+# 經由本機回應快取查詢 (設定環境變數 NEWS_CACHE_MODE=offline 可離線重播)
+raw_news_dict_list = get_raw_news_dict_list(
+    start_date,
+    end_date,
+    query_str="停電",
 )
-
-raw_news_dict_list = google_news.get_news("停電")
 pprint(raw_news_dict_list)
@@ -2,14 +2,12 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))  # noqa
-from libs.news import NEWS_LIST_JSON_PATH, NewsList
+from libs.news import load_news_list
 from libs.reason_emoji import get_reason_emoji
 
 if __name__ == '__main__':
     # 讀取現有的新聞列表資料
-    news_list = NewsList.model_validate_json(
-        NEWS_LIST_JSON_PATH.read_text(encoding="utf-8")
-    ).root
+    news_list = load_news_list()
 
     # # 排序新聞列表資料
     # news_list.sort(key=lambda news: news.date)
@@ -0,0 +1,174 @@
+""" 停電事件的前綴和彙總索引 (可於 Brython 中使用)
+
+對時間軸的每一天累計停電戶數與事件數 (前綴和)，任意日期範圍的總和只需兩次查表 (O(1))。
+可依縣市與停電原因篩選: 各篩選條件的前綴和於第一次查詢時才建立並快取，
+因此不會預先建立所有 (縣市 × 停電原因) 組合。
+
+註: 涉及多個縣市的事件，其停電戶數會分別計入每個縣市。
+"""
+import datetime
+
+from libs.timeline import Timeline
+
+
+class AggregateIndex:
+    """ 停電戶數與事件數的前綴和彙總索引
+    """
+
+    def __init__(self, timeline: Timeline) -> None:
+        self.timeline = timeline
+        self._key_to_prefix_list_tuple_dict = {}
+        """(縣市索引, 停電原因代碼) -> (停電戶數前綴和, 事件數前綴和)，None 表示不篩選"""
+
+    def _get_key(
+        self,
+        city_name: str | None,
+        reason_emoji: str | None,
+    ) -> tuple[int | None, int | None]:
+        """ 將縣市名稱與停電原因 emoji ("" 表示無對應原因) 轉為索引鍵
+        """
+        county_i = (
+            None if city_name is None else
+            self.timeline.county_name_list.index(city_name)
+        )
+        reason_code = (
+            None if reason_emoji is None else
+            -1 if reason_emoji == "" else
+            self.timeline.reason_emoji_list.index(reason_emoji)
+        )
+        return county_i, reason_code
+
+    def _get_prefix_list_tuple(
+        self,
+        county_i: int | None,
+        reason_code: int | None,
+    ) -> tuple[list[int], list[int]]:
+        """ 取得 (或建立) 篩選條件的前綴和: 第 day_i 個元素為第 day_i 天之前 (不含) 的總和
+        """
+        key = (county_i, reason_code)
+        if (prefix_list_tuple := self._key_to_prefix_list_tuple_dict.get(key)) is not None:
+            return prefix_list_tuple
+
+        timeline = self.timeline
+        household_prefix_list = [0] * (timeline.day_count + 1)
+        event_count_prefix_list = [0] * (timeline.day_count + 1)
+        for event_i, day_i in enumerate(timeline.day_list):
+            if county_i is not None and not timeline.city_mask_list[event_i] >> county_i & 1:
+                continue
+            if reason_code is not None and timeline.reason_code_list[event_i] != reason_code:
+                continue
+            household_prefix_list[day_i + 1] += timeline.household_list[event_i]
+            event_count_prefix_list[day_i + 1] += 1
+        for day_i in range(timeline.day_count):
+            household_prefix_list[day_i + 1] += household_prefix_list[day_i]
+            event_count_prefix_list[day_i + 1] += event_count_prefix_list[day_i]
+
+        prefix_list_tuple = (household_prefix_list, event_count_prefix_list)
+        self._key_to_prefix_list_tuple_dict[key] = prefix_list_tuple
+        return prefix_list_tuple
+
+    def _get_day_i_range(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> tuple[int, int]:
+        """ 將日期範圍 (含首尾) 轉為限制於時間軸內的日索引範圍 [start_day_i, end_day_i)
+        """
+        day_count = self.timeline.day_count
+        start_day_i = min(max(self.timeline.get_day_index(start_date), 0), day_count)
+        end_day_i = min(max(self.timeline.get_day_index(end_date) + 1, 0), day_count)
+        return start_day_i, max(start_day_i, end_day_i)
+
+    def get_household_count(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        city_name: str | None = None,
+        reason_emoji: str | None = None,
+    ) -> int:
+        """ 取得日期範圍 (含首尾) 內的停電戶數總和
+        Args:
+            city_name (str | None): 只計入涉及此縣市的事件
+            reason_emoji (str | None): 只計入此停電原因的事件 ("" 表示無對應原因)
+        """
+        household_prefix_list, _ = self._get_prefix_list_tuple(
+            *self._get_key(city_name, reason_emoji)
+        )
+        start_day_i, end_day_i = self._get_day_i_range(start_date, end_date)
+        return household_prefix_list[end_day_i] - household_prefix_list[start_day_i]
+
+    def get_event_count(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        city_name: str | None = None,
+        reason_emoji: str | None = None,
+    ) -> int:
+        """ 取得日期範圍 (含首尾) 內的停電事件數 (參數同 get_household_count)
+        """
+        _, event_count_prefix_list = self._get_prefix_list_tuple(
+            *self._get_key(city_name, reason_emoji)
+        )
+        start_day_i, end_day_i = self._get_day_i_range(start_date, end_date)
+        return event_count_prefix_list[end_day_i] - event_count_prefix_list[start_day_i]
+
+    def get_day_household_count_list(
+        self,
+        city_name: str | None = None,
+        reason_emoji: str | None = None,
+    ) -> list[int]:
+        """ 取得時間軸每一天的停電戶數
+        """
+        household_prefix_list, _ = self._get_prefix_list_tuple(
+            *self._get_key(city_name, reason_emoji)
+        )
+        return [
+            household_prefix_list[day_i + 1] - household_prefix_list[day_i]
+            for day_i in range(self.timeline.day_count)
+        ]
+
+    def get_rolling_household_count_list(
+        self,
+        window_day_count: int,
+        city_name: str | None = None,
+        reason_emoji: str | None = None,
+    ) -> list[int]:
+        """ 取得時間軸每一天往前 window_day_count 天 (含當天) 的停電戶數總和
+        """
+        household_prefix_list, _ = self._get_prefix_list_tuple(
+            *self._get_key(city_name, reason_emoji)
+        )
+        return [
+            household_prefix_list[day_i + 1]
+            - household_prefix_list[max(day_i + 1 - window_day_count, 0)]
+            for day_i in range(self.timeline.day_count)
+        ]
+
+    def get_month_household_count_list(
+        self,
+        city_name: str | None = None,
+        reason_emoji: str | None = None,
+    ) -> list[tuple[datetime.date, int]]:
+        """ 取得時間軸每個月份的停電戶數總和
+        Returns:
+            list[tuple[datetime.date, int]]: (月份第一天, 停電戶數總和)
+        """
+        household_prefix_list, _ = self._get_prefix_list_tuple(
+            *self._get_key(city_name, reason_emoji)
+        )
+        month_household_count_list = list[tuple[datetime.date, int]]()
+        month_date = self.timeline.start_date.replace(day=1)
+        while month_date <= self.timeline.end_date:
+            next_month_date = (
+                month_date + datetime.timedelta(days=32)
+            ).replace(day=1)
+            start_day_i, end_day_i = self._get_day_i_range(
+                month_date,
+                next_month_date - datetime.timedelta(days=1),
+            )
+            month_household_count_list.append((
+                month_date,
+                household_prefix_list[end_day_i] - household_prefix_list[start_day_i],
+            ))
+            month_date = next_month_date
+        return month_household_count_list
@@ -0,0 +1,58 @@
+""" 停電音效混音器
+
+將同一個影格內觸發的停電音效合併為單一發聲 (voice)，其音量由停電比值總和決定，
+並以固定數量的發聲槽限制同時播放的音效數，使高速播放時的音效成本維持有界。
+"""
+
+MIN_VOLUME_RATIO = 0.3
+"""停電音效的最小音量"""
+
+
+def get_power_outage_volume_ratio(darkness_ratio_sum: float) -> float:
+    """ 根據停電比值總和返回停電音效的音量
+    """
+    return max(
+        min(darkness_ratio_sum, 1),
+        MIN_VOLUME_RATIO,
+    )
+
+
+class AudioMixer:
+    """ 停電音效的發聲槽分配器
+    """
+
+    def __init__(
+        self,
+        max_voice_count: int = 4,
+        clip_duration_sec: float = 0,
+    ) -> None:
+        self.clip_duration_sec = clip_duration_sec
+        """音效長度 (秒)，於音檔解碼完成後設定"""
+        self.voice_end_sec_list = [0.0] * max_voice_count
+        """各發聲槽播放結束的時間"""
+        self.pending_darkness_ratio_sum = 0.0
+        """本影格內待播放的停電比值總和"""
+
+    def trigger(self, darkness_ratio_list: list[float]) -> None:
+        """ 觸發停電音效 (於下一次 flush 時合併播放)
+        """
+        self.pending_darkness_ratio_sum += sum(darkness_ratio_list)
+
+    def flush(self, now_sec: float) -> tuple[int, float] | None:
+        """ 合併本影格內觸發的停電音效，並分配一個閒置的發聲槽
+        Returns:
+            tuple[int, float] | None: (發聲槽索引, 音量)；
+                若沒有待播放的音效或所有發聲槽皆忙碌中則返回 None (捨棄本次音效)
+        """
+        darkness_ratio_sum = self.pending_darkness_ratio_sum
+        self.pending_darkness_ratio_sum = 0.0
+        if darkness_ratio_sum <= 0:
+            return None
+
+        for voice_i, voice_end_sec in enumerate(self.voice_end_sec_list):
+            if voice_end_sec <= now_sec:
+                self.voice_end_sec_list[voice_i] = (
+                    now_sec + self.clip_duration_sec
+                )
+                return voice_i, get_power_outage_volume_ratio(darkness_ratio_sum)
+        return None
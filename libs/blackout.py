@@ -0,0 +1,285 @@
+""" 停電比值的解析式衰減模型
+
+每個縣市僅記錄「最後一次停電的時間」與「當時的停電比值 (強度)」，
+任意時間點的停電比值皆可由封閉解直接求得:
+
+    ratio(t) = max(intensity - (t - hit_time) * decay_per_unit, 0)
+
+即時播放、跳轉 (關鍵影格) 與無頭批次模擬皆以模擬天數 (日索引) 為時間單位，
+因此不論播放速度為何，跳轉後的狀態皆與連續播放至該天的狀態相同。
+"""
+from libs.timeline import Timeline
+
+FADE_OUT_DURATION_SEC = 5
+"""停電比值由 1 淡出至 0 的時間 (秒)"""
+
+PER_SEC_DAY_COUNT = 30
+"""播放速度: 每秒播放的天數"""
+
+DECAY_PER_SEC = 1 / FADE_OUT_DURATION_SEC
+"""每秒衰減的停電比值"""
+
+DECAY_PER_DAY = DECAY_PER_SEC / PER_SEC_DAY_COUNT
+"""每模擬一天衰減的停電比值 (以預設播放速度播放時，淡出需 FADE_OUT_DURATION_SEC 秒)"""
+
+MAX_HOUSEHOLDS_THRESHOLD = 1_000_000
+"""動畫特效為全黑的戶數"""
+
+
+def get_blackout_rgb_str(blackout_ratio: float) -> str:
+    """ 根據停電比值返回對應的 RGB 顏色
+    Args:
+        blackout_ratio (float): 停電比值
+            0: 黃色
+            1: 黑色
+    """
+    return f"rgb({255 - int(255 * blackout_ratio)}, {255 - int(255 * blackout_ratio)}, 0)"
+
+
+def get_blackout_color_index(blackout_ratio: float) -> int:
+    """ 將停電比值量化為顏色查找表的索引 (0~255)
+    """
+    return int(255 * blackout_ratio)
+
+
+BLACKOUT_RGB_STR_LUT = [
+    get_blackout_rgb_str(color_i / 255)
+    for color_i in range(256)
+]
+"""顏色查找表: 量化後的停電比值 -> RGB 顏色"""
+
+
+def get_darkness_ratio(households: int) -> float:
+    """ 根據停電戶數返回單一事件造成的停電比值
+    """
+    return max(
+        (households/MAX_HOUSEHOLDS_THRESHOLD)**0.5,
+        0.1,
+    )
+
+
+def get_county_i_list(city_mask: int) -> list[int]:
+    """ 將縣市位元遮罩解碼為縣市索引串列 (由小至大，每次取出最低位的位元，迴圈次數即為縣市數)
+    """
+    county_i_list = list[int]()
+    while city_mask:
+        low_bit = city_mask & -city_mask
+        county_i_list.append(low_bit.bit_length() - 1)
+        city_mask ^= low_bit
+    return county_i_list
+
+
+class BlackoutDecay:
+    """ 各縣市停電比值的衰減狀態
+
+    狀態以縣市索引 (county_name_list 的索引，即時間軸縣市位元遮罩的位元位置) 存放於固定長度的浮點數串列，
+    並以位元遮罩記錄尚未移除的縣市，因此疊加事件時可直接走訪事件的縣市位元遮罩，不需解碼為縣市名稱。
+    """
+
+    def __init__(self, decay_per_unit: float, county_name_list: list[str]) -> None:
+        self.decay_per_unit = decay_per_unit
+        self.county_name_list = county_name_list
+        self.county_name_to_i_dict = {
+            county_name: county_i
+            for county_i, county_name in enumerate(county_name_list)
+        }
+        self.hit_time_list = [0.0] * len(county_name_list)
+        """各縣市最後一次停電的時間"""
+        self.intensity_list = [0.0] * len(county_name_list)
+        """各縣市最後一次停電時的停電比值"""
+        self.hit_county_mask = 0
+        """曾停電且尚未移除 (prune) 的縣市位元遮罩"""
+
+    def copy(self) -> "BlackoutDecay":
+        """ 複製衰減狀態 (供關鍵影格使用) """
+        blackout_decay = BlackoutDecay(self.decay_per_unit, self.county_name_list)
+        blackout_decay.set_state(self)
+        return blackout_decay
+
+    def set_state(self, blackout_decay: "BlackoutDecay") -> None:
+        """ 將衰減狀態重設為另一個衰減狀態的複本 (衰減速率不變) """
+        self.hit_time_list = list(blackout_decay.hit_time_list)
+        self.intensity_list = list(blackout_decay.intensity_list)
+        self.hit_county_mask = blackout_decay.hit_county_mask
+
+    def get_county_ratio(self, county_i: int, t: float) -> float:
+        """ 取得指定縣市索引於時間 t 的停電比值
+        """
+        if not self.hit_county_mask >> county_i & 1:
+            return 0
+        return max(
+            self.intensity_list[county_i]
+            - (t - self.hit_time_list[county_i]) * self.decay_per_unit,
+            0,
+        )
+
+    def get_ratio(self, city_name: str, t: float) -> float:
+        """ 取得指定縣市於時間 t 的停電比值
+        """
+        if (county_i := self.county_name_to_i_dict.get(city_name)) is None:
+            return 0
+        return self.get_county_ratio(county_i, t)
+
+    def get_hit_county_i_list(self) -> list[int]:
+        """ 取得曾停電且尚未移除的縣市索引 (由小至大) """
+        return get_county_i_list(self.hit_county_mask)
+
+    def get_city_to_ratio_dict(self, t: float, is_pruning: bool = False) -> dict[str, float]:
+        """ 取得各縣市於時間 t 的停電比值 (只包含曾停電且尚未移除的縣市)
+        Args:
+            is_pruning (bool): 是否同時移除於時間 t 已完全淡出的縣市 (同 prune，但只需計算一次停電比值)
+        """
+        city_to_ratio_dict = dict[str, float]()
+        for county_i in self.get_hit_county_i_list():
+            ratio = self.get_county_ratio(county_i, t)
+            city_to_ratio_dict[self.county_name_list[county_i]] = ratio
+            if is_pruning and ratio <= 0:
+                self.hit_county_mask &= ~(1 << county_i)
+        return city_to_ratio_dict
+
+    def hit_city_mask(self, city_mask: int, t: float, darkness_ratio: float) -> int:
+        """ 於時間 t 對位元遮罩中的每個縣市疊加停電比值 (上限為 1)
+        Returns:
+            int: 受影響的縣市數
+        """
+        county_i_list = get_county_i_list(city_mask)
+        for county_i in county_i_list:
+            self.intensity_list[county_i] = min(
+                self.get_county_ratio(county_i, t) + darkness_ratio,
+                1.0,
+            )
+            self.hit_time_list[county_i] = t
+        self.hit_county_mask |= city_mask
+        return len(county_i_list)
+
+    def hit(self, city_name: str, t: float, darkness_ratio: float) -> None:
+        """ 於時間 t 對指定縣市疊加停電比值 (上限為 1)
+        """
+        self.hit_city_mask(1 << self.county_name_to_i_dict[city_name], t, darkness_ratio)
+
+    def prune(self, t: float) -> None:
+        """ 移除於時間 t 已完全淡出的縣市
+        """
+        self.get_city_to_ratio_dict(t, is_pruning=True)
+
+    def set_city_to_ratio_dict(
+        self,
+        city_to_ratio_dict: dict[str, float],
+        t: float,
+    ) -> None:
+        """ 將各縣市的停電比值重設為指定值，並自時間 t 起開始衰減
+        """
+        self.set_city_to_hit_dict({
+            city_name: (t, ratio)
+            for city_name, ratio in city_to_ratio_dict.items()
+            if ratio > 0
+        })
+
+    def get_city_to_hit_dict(self) -> dict[str, tuple[float, float]]:
+        """ 取得曾停電且尚未移除的縣市 -> (最後一次停電的時間, 當時的停電比值) (供序列化使用)
+        """
+        return {
+            self.county_name_list[county_i]: (
+                self.hit_time_list[county_i],
+                self.intensity_list[county_i],
+            )
+            for county_i in self.get_hit_county_i_list()
+        }
+
+    def set_city_to_hit_dict(self, city_to_hit_dict: dict[str, tuple[float, float]]) -> None:
+        """ 將衰減狀態重設為 get_city_to_hit_dict 的結果
+        """
+        self.hit_county_mask = 0
+        for city_name, (hit_time, intensity) in city_to_hit_dict.items():
+            county_i = self.county_name_to_i_dict[city_name]
+            self.hit_time_list[county_i] = hit_time
+            self.intensity_list[county_i] = intensity
+            self.hit_county_mask |= 1 << county_i
+
+
+def hit_day_events(
+    blackout_decay: BlackoutDecay,
+    timeline: Timeline,
+    day_i: int,
+    t: float,
+) -> list[float]:
+    """ 於時間 t 將第 day_i 天的停電事件依序疊加至衰減狀態
+    (衰減狀態的縣市順序須與 timeline.county_name_list 相同)
+    Returns:
+        list[float]: 每個受影響縣市各一筆的停電比值 (供停電音效使用)
+    """
+    darkness_ratio_list = list[float]()
+    for event_i in range(
+        timeline.day_offset_list[day_i],
+        timeline.day_offset_list[day_i + 1],
+    ):
+        darkness_ratio = get_darkness_ratio(timeline.household_list[event_i])
+        darkness_ratio_list.extend([darkness_ratio] * blackout_decay.hit_city_mask(
+            timeline.city_mask_list[event_i],
+            t,
+            darkness_ratio,
+        ))
+    return darkness_ratio_list
+
+
+class BlackoutKeyframeIndex:
+    """ 停電比值的關鍵影格索引
+
+    每隔 keyframe_interval_day_count 天記錄一次衰減狀態，查詢任意一天時
+    只需從最近的關鍵影格重播至多 keyframe_interval_day_count 天的事件。
+    """
+
+    def __init__(
+        self,
+        timeline: Timeline,
+        keyframe_interval_day_count: int = 30,
+        decay_per_day: float = DECAY_PER_DAY,
+    ) -> None:
+        self.timeline = timeline
+        self.keyframe_interval_day_count = keyframe_interval_day_count
+        self.decay_per_day = decay_per_day
+
+        # 依序重播事件，並於每個關鍵影格日 (當天事件發生前) 記錄衰減狀態
+        self.keyframe_list = list[BlackoutDecay]()
+        self.built_day_count = 0
+        """已重播的天數 (不超過時間軸已載入的天數)"""
+        self._blackout_decay = BlackoutDecay(decay_per_day, timeline.county_name_list)
+        self.build()
+
+    def build(self) -> None:
+        """ 接續重播至時間軸已載入的最後一天 (時間軸分批載入事件後呼叫)
+        """
+        for day_i in range(self.built_day_count, self.timeline.loaded_day_count):
+            if day_i % self.keyframe_interval_day_count == 0:
+                self.keyframe_list.append(self._blackout_decay.copy())
+            self._hit_day_events(self._blackout_decay, day_i)
+        self.built_day_count = max(self.built_day_count, self.timeline.loaded_day_count)
+
+    def _hit_day_events(self, blackout_decay: BlackoutDecay, day_i: int) -> None:
+        """ 將第 day_i 天的停電事件疊加至衰減狀態
+        """
+        hit_day_events(blackout_decay, self.timeline, day_i, day_i)
+
+    def get_blackout_decay(self, day_i: int) -> BlackoutDecay:
+        """ 取得第 day_i 天 (含當天事件) 結束時的衰減狀態
+        Args:
+            day_i (int): 日索引 (距離時間軸起始日的天數)，可超出時間軸範圍
+        """
+        if day_i < 0 or not self.keyframe_list:
+            return BlackoutDecay(self.decay_per_day, self.timeline.county_name_list)
+
+        keyframe_i = min(
+            day_i // self.keyframe_interval_day_count,
+            len(self.keyframe_list) - 1,
+        )
+        blackout_decay = self.keyframe_list[keyframe_i].copy()
+        for _day_i in range(
+            keyframe_i * self.keyframe_interval_day_count,
+            min(day_i + 1, self.built_day_count),
+        ):
+            self._hit_day_events(blackout_decay, _day_i)
+        return blackout_decay
+
+    def get_city_to_ratio_dict(self, day_i: int) -> dict[str, float]:
+        """ 取得第 day_i 天 (含當天事件) 結束時各縣市的停電比值 """
+        return self.get_blackout_decay(day_i).get_city_to_ratio_dict(day_i)
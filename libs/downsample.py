@@ -0,0 +1,120 @@
+""" 時間序列的細節層級降採樣 (可於 Brython 中使用)
+
+圖表可顯示的點數受限於像素寬度，每天一根長條在整條時間軸上遠超過像素數量。
+此模組預先建立 min/max 金字塔: 第 k 層將序列每 2^k 天分為一桶，記錄桶內最小值與最大值的索引。
+縮放時依可視範圍與像素寬度選擇最粗但點數足夠的層級，只取出可視範圍內的桶，
+因此每次縮放的耗時只與輸出點數成正比，且各桶的極值 (停電高峰) 一定會被保留。
+
+另提供 LTTB (Largest-Triangle-Three-Buckets) 演算法，適合折線圖的形狀保留。
+"""
+
+
+def downsample_lttb(y_list: list[float], threshold: int) -> list[int]:
+    """ 以 LTTB 演算法挑選保留形狀的點 (x 座標為索引)
+    Args:
+        y_list (list[float]): 原始序列
+        threshold (int): 輸出點數上限 (至少 3)
+    Returns:
+        list[int]: 保留的索引 (遞增，含首尾)
+    """
+    point_count = len(y_list)
+    if threshold >= point_count or threshold < 3:
+        return list(range(point_count))
+
+    index_list = [0]
+    bucket_size = (point_count - 2) / (threshold - 2)
+    a_i = 0
+    for bucket_i in range(threshold - 2):
+        # 下一桶的平均點
+        next_start_i = int((bucket_i + 1) * bucket_size) + 1
+        next_end_i = min(int((bucket_i + 2) * bucket_size) + 1, point_count)
+        next_count = next_end_i - next_start_i
+        avg_x = (next_start_i + next_end_i - 1) / 2
+        avg_y = sum(y_list[next_start_i:next_end_i]) / next_count
+
+        # 本桶中與前一個選點、下一桶平均點構成最大三角形的點
+        start_i = int(bucket_i * bucket_size) + 1
+        end_i = int((bucket_i + 1) * bucket_size) + 1
+        a_y = y_list[a_i]
+        max_area, max_i = -1.0, start_i
+        for i in range(start_i, end_i):
+            area = abs(
+                (a_i - avg_x) * (y_list[i] - a_y)
+                - (a_i - i) * (avg_y - a_y)
+            )
+            if area > max_area:
+                max_area, max_i = area, i
+        index_list.append(max_i)
+        a_i = max_i
+    index_list.append(point_count - 1)
+    return index_list
+
+
+class MinMaxPyramid:
+    """ 序列的 min/max 金字塔: 第 level 層每桶涵蓋 2^level 個元素
+    """
+
+    def __init__(self, y_list: list[float]) -> None:
+        self.y_list = y_list
+        self.level_min_i_list_list = [list(range(len(y_list)))]
+        self.level_max_i_list_list = [list(range(len(y_list)))]
+        """各層各桶最小值與最大值的索引"""
+        while len(self.level_max_i_list_list[-1]) > 1:
+            self.level_min_i_list_list.append(self._merge_bucket_list(
+                self.level_min_i_list_list[-1],
+                lambda i, j: y_list[j] < y_list[i],
+            ))
+            self.level_max_i_list_list.append(self._merge_bucket_list(
+                self.level_max_i_list_list[-1],
+                lambda i, j: y_list[j] > y_list[i],
+            ))
+
+    @staticmethod
+    def _merge_bucket_list(i_list: list[int], is_better) -> list[int]:
+        """ 將相鄰兩桶合併為一桶 (取較佳者，相同時保留較早者) """
+        merged_i_list = list[int]()
+        for bucket_i in range(0, len(i_list), 2):
+            i = i_list[bucket_i]
+            if bucket_i + 1 < len(i_list) and is_better(i, i_list[bucket_i + 1]):
+                i = i_list[bucket_i + 1]
+            merged_i_list.append(i)
+        return merged_i_list
+
+    def get_level(self, start_i: int, end_i: int, max_point_count: int) -> int:
+        """ 選擇可視範圍 [start_i, end_i) 內的桶數 (每桶 2 點) 不超過 max_point_count 的最細層級
+        """
+        level = 0
+        while (
+            level + 1 < len(self.level_max_i_list_list)
+            and ((end_i - start_i) >> level) * (2 if level else 1) > max_point_count
+        ):
+            level += 1
+        return level
+
+    def get_index_list(self, start_i: int, end_i: int, max_point_count: int) -> list[int]:
+        """ 取得可視範圍 [start_i, end_i) 內降採樣後的索引 (遞增)
+        Args:
+            max_point_count (int): 輸出點數上限 (通常為圖表的像素寬度)
+        """
+        start_i = max(start_i, 0)
+        end_i = min(end_i, len(self.y_list))
+        if start_i >= end_i:
+            return []
+        level = self.get_level(start_i, end_i, max_point_count)
+        if level == 0:
+            return list(range(start_i, end_i))
+
+        # 完整落在可視範圍內的桶直接查表，首尾不完整的桶則直接掃描其可視部分
+        y_list = self.y_list
+        index_set = set[int]()
+        for bucket_i in range(start_i >> level, ((end_i - 1) >> level) + 1):
+            bucket_start_i = bucket_i << level
+            bucket_end_i = bucket_start_i + (1 << level)
+            if start_i <= bucket_start_i and bucket_end_i <= end_i:
+                index_set.add(self.level_min_i_list_list[level][bucket_i])
+                index_set.add(self.level_max_i_list_list[level][bucket_i])
+                continue
+            i_range = range(max(bucket_start_i, start_i), min(bucket_end_i, end_i))
+            index_set.add(min(i_range, key=y_list.__getitem__))
+            index_set.add(max(i_range, key=y_list.__getitem__))
+        return sorted(index_set)
@@ -0,0 +1,116 @@
+""" 停電事件日誌
+
+以固定容量的環形緩衝區保存最近的事件日誌列，不論模擬播放多久，
+記憶體用量與每個影格需要繪製的列數皆為常數。
+"""
+from collections import deque
+from dataclasses import dataclass
+
+LINE_HEIGHT_RATIO = 1.5
+"""行高相對於字體大小的比例"""
+
+PX_PER_PT = 4 / 3
+"""每 pt 對應的像素數"""
+
+
+def get_event_div_font_size_pt(household_count: int) -> float:
+    # 設定事件日誌字體大小設定
+    min_font_size_pt = 10
+    max_font_size_pt = 50
+    min_font_size_household_count = 100
+    max_font_size_household_count = 1_000_000
+
+    a = (
+        (max_font_size_pt-min_font_size_pt)
+        / (max_font_size_household_count-min_font_size_household_count)
+    )
+    b = min_font_size_pt - a*min_font_size_household_count
+    return max(
+        min(
+            household_count*a+b,
+            max_font_size_pt,
+        ),
+        min_font_size_pt,
+    )
+
+
+@dataclass
+class EventLogRow:
+    """ 停電事件日誌列
+    """
+    date_str: str
+    """停電時間"""
+    location_households_str: str
+    """停電縣市+戶數"""
+    reason_emoji: str
+    """停電原因 emoji"""
+    title: str
+    """新聞標題"""
+    font_size_pt: float
+    """字體大小 (pt)"""
+
+    @classmethod
+    def from_event(
+        cls,
+        date_str: str,
+        locations: list[str],
+        households: int,
+        reason_emoji: str,
+        title: str,
+    ) -> 'EventLogRow':
+        locations_str = (
+            "全台" if len(locations) >= 20 else
+            ",".join(locations)
+        )
+        return cls(
+            date_str=f"{date_str} ",
+            location_households_str=f"[{locations_str} +{households:,}戶] ",
+            reason_emoji=reason_emoji,
+            title=title,
+            font_size_pt=get_event_div_font_size_pt(
+                household_count=households
+            ),
+        )
+
+    @property
+    def min_height_px(self) -> float:
+        """ 此列不換行時的高度 (像素) """
+        return self.font_size_pt * PX_PER_PT * LINE_HEIGHT_RATIO
+
+
+class EventLog:
+    """ 停電事件日誌的環形緩衝區
+    """
+
+    def __init__(self, capacity: int = 200) -> None:
+        self.row_deque = deque(maxlen=capacity)
+        self.version = 0
+        """每次內容變動時遞增，供繪製端判斷是否需要重繪"""
+
+    def __len__(self) -> int:
+        return len(self.row_deque)
+
+    def append(self, row: EventLogRow) -> None:
+        """ 追加一列日誌 (超出容量時捨棄最舊的一列)
+        """
+        self.row_deque.append(row)
+        self.version += 1
+
+    def clear(self) -> None:
+        self.row_deque.clear()
+        self.version += 1
+
+    def get_visible_row_list(self, height_px: float) -> list[EventLogRow]:
+        """ 取得足以填滿指定高度的最新幾列 (由舊至新排列)
+        Args:
+            height_px (float): 日誌區塊的可視高度 (像素)
+        """
+        visible_row_list = list[EventLogRow]()
+        total_height_px = 0
+        for row in reversed(self.row_deque):
+            if total_height_px >= height_px:
+                break
+            visible_row_list.append(row)
+            total_height_px += row.min_height_px
+        visible_row_list.reverse()
+        return visible_row_list
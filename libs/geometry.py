@@ -0,0 +1,306 @@
+""" 行政區地圖幾何的離線建置工具
+
+將 GeoJSON 切分為共用邊界 (arc) 後以 Douglas–Peucker 演算法簡化，
+相鄰行政區的共用邊界只簡化一次，因此簡化後不會出現縫隙或重疊。
+簡化結果以與前端相同的麥卡托投影預先投影，並輸出數個細節層級 (LOD) 的 SVG path 字串，
+前端可直接繪製而不需再進行投影計算。
+
+建置方法 (根目錄下執行):
+    python -m libs.geometry
+"""
+import json
+import math
+from pathlib import Path
+
+DATA_DIR_PATH = Path(__file__).parent.parent / 'data'
+GEOJSON_PATH = DATA_DIR_PATH / 'twCounty2010merge.geojson'
+
+# 與原本前端 d3.geoMercator() 相同的投影參數
+PROJECTION_CENTER_LON_LAT = (121, 24)
+PROJECTION_SCALE = 8000
+PROJECTION_TRANSLATE_XY = (600 / 2, 800 / 2)
+VIEW_BOX_STR = "0 200 600 800"
+
+LOD_NAME_TO_TOLERANCE_PX_DICT = {
+    "low": 0.5,
+    "medium": 0.2,
+    "high": 0.05,
+}
+"""細節層級名稱 -> 簡化容許誤差 (viewBox 單位)，由粗至細排列"""
+
+Point = tuple[float, float]
+
+
+def get_lod_json_path(geojson_path: Path, lod_name: str) -> Path:
+    """ 取得指定細節層級的 path 資料 JSON 檔路徑
+    """
+    return geojson_path.with_name(f"{geojson_path.stem}.{lod_name}.json")
+
+
+def project_mercator(lon: float, lat: float) -> Point:
+    """ 以前端相同的參數進行麥卡托投影 (等同 d3.geoMercator)
+    """
+    def get_mercator_y(lat: float) -> float:
+        return math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+
+    center_lon, center_lat = PROJECTION_CENTER_LON_LAT
+    translate_x, translate_y = PROJECTION_TRANSLATE_XY
+    return (
+        translate_x
+        + PROJECTION_SCALE * math.radians(lon - center_lon),
+        translate_y
+        - PROJECTION_SCALE * (get_mercator_y(lat) - get_mercator_y(center_lat)),
+    )
+
+
+def simplify_douglas_peucker(
+    point_list: list[Point],
+    tolerance: float,
+) -> list[Point]:
+    """ 以 Douglas–Peucker 演算法簡化折線 (保留首尾兩點)
+    """
+    if len(point_list) <= 2:
+        return list(point_list)
+
+    is_kept_list = [False] * len(point_list)
+    is_kept_list[0] = is_kept_list[-1] = True
+    range_stack = [(0, len(point_list) - 1)]
+    while range_stack:
+        start_i, end_i = range_stack.pop()
+        (x0, y0), (x1, y1) = point_list[start_i], point_list[end_i]
+        dx, dy = x1 - x0, y1 - y0
+        segment_length = math.hypot(dx, dy)
+
+        max_distance, max_i = -1.0, None
+        for i in range(start_i + 1, end_i):
+            x, y = point_list[i]
+            distance = (
+                abs(dy * (x - x0) - dx * (y - y0)) / segment_length
+                if segment_length else math.hypot(x - x0, y - y0)
+            )
+            if distance > max_distance:
+                max_distance, max_i = distance, i
+
+        if max_i is not None and max_distance > tolerance:
+            is_kept_list[max_i] = True
+            range_stack.append((start_i, max_i))
+            range_stack.append((max_i, end_i))
+
+    return [
+        point
+        for point, is_kept in zip(point_list, is_kept_list)
+        if is_kept
+    ]
+
+
+def get_feature_ring_list_list(geojson_dict: dict) -> list[list[list[Point]]]:
+    """ 取得各行政區的環 (ring) 串列，環不含重複的閉合點
+    """
+    feature_ring_list_list = list[list[list[Point]]]()
+    for feature_dict in geojson_dict["features"]:
+        geometry_dict = feature_dict["geometry"]
+        polygon_list = (
+            geometry_dict["coordinates"]
+            if geometry_dict["type"] == "MultiPolygon"
+            else [geometry_dict["coordinates"]]
+        )
+        feature_ring_list_list.append([
+            [tuple(point) for point in ring[:-1]]
+            for polygon in polygon_list
+            for ring in polygon
+        ])
+    return feature_ring_list_list
+
+
+def get_junction_point_set(ring_list: list[list[Point]]) -> set[Point]:
+    """ 取得所有環的交會點: 共用此點的環集合與其相鄰點不同者
+    """
+    point_to_ring_i_set_dict = dict[Point, set[int]]()
+    for ring_i, ring in enumerate(ring_list):
+        for point in ring:
+            point_to_ring_i_set_dict.setdefault(point, set()).add(ring_i)
+
+    junction_point_set = set[Point]()
+    for ring in ring_list:
+        for point_i, point in enumerate(ring):
+            ring_i_set = point_to_ring_i_set_dict[point]
+            if len(ring_i_set) > 1 and (
+                point_to_ring_i_set_dict[ring[point_i - 1]] != ring_i_set
+                or point_to_ring_i_set_dict[ring[(point_i + 1) % len(ring)]] != ring_i_set
+            ):
+                junction_point_set.add(point)
+    return junction_point_set
+
+
+def simplify_ring_list(
+    ring_list: list[list[Point]],
+    tolerance: float,
+) -> list[list[Point]]:
+    """ 保留拓撲地簡化所有環: 於交會點切分為邊界 (arc)，每條邊界僅簡化一次
+    Args:
+        ring_list (list[list[Point]]): 已投影的環串列
+        tolerance (float): 簡化容許誤差
+    Returns:
+        list[list[Point]]: 簡化後的環串列 (退化為少於 3 點的環以空串列表示)
+    """
+    junction_point_set = get_junction_point_set(ring_list)
+    arc_key_to_simplified_arc_dict = dict[tuple[Point, ...], list[Point]]()
+
+    def get_simplified_arc(arc: list[Point]) -> list[Point]:
+        """ 簡化邊界，相同 (或反向相同) 的邊界共用同一份簡化結果 """
+        arc_key = tuple(arc)
+        reversed_arc_key = arc_key[::-1]
+        if arc_key in arc_key_to_simplified_arc_dict:
+            return arc_key_to_simplified_arc_dict[arc_key]
+        if reversed_arc_key in arc_key_to_simplified_arc_dict:
+            return arc_key_to_simplified_arc_dict[reversed_arc_key][::-1]
+        simplified_arc = simplify_douglas_peucker(arc, tolerance)
+        arc_key_to_simplified_arc_dict[arc_key] = simplified_arc
+        return simplified_arc
+
+    simplified_ring_list = list[list[Point]]()
+    for ring in ring_list:
+        junction_i_list = [
+            point_i
+            for point_i, point in enumerate(ring)
+            if point in junction_point_set
+        ]
+        if not junction_i_list:
+            # 沒有交會點 (獨立的環或與另一個環完全重合): 以最小點與距其最遠的點切分，
+            # 使完全重合的環得到相同的切分
+            min_i = min(range(len(ring)), key=lambda point_i: ring[point_i])
+            far_i = max(
+                range(len(ring)),
+                key=lambda point_i: math.dist(ring[min_i], ring[point_i]),
+            )
+            junction_i_list = sorted({min_i, far_i})
+
+        # 將環旋轉至以第一個交會點起始，並於各交會點切分
+        start_i = junction_i_list[0]
+        rotated_ring = ring[start_i:] + ring[:start_i] + [ring[start_i]]
+        cut_i_list = [
+            junction_i - start_i
+            for junction_i in junction_i_list
+        ] + [len(ring)]
+        simplified_ring = list[Point]()
+        for cut_start_i, cut_end_i in zip(cut_i_list, cut_i_list[1:]):
+            simplified_ring.extend(
+                get_simplified_arc(rotated_ring[cut_start_i:cut_end_i + 1])[:-1]
+            )
+        simplified_ring_list.append(
+            simplified_ring if len(simplified_ring) >= 3 else []
+        )
+    return simplified_ring_list
+
+
+def get_svg_path_str(ring_list: list[list[Point]], decimal_count: int) -> str:
+    """ 將環串列轉為 SVG path 字串
+    """
+    return "".join(
+        "M" + "L".join(
+            f"{round(x, decimal_count):g},{round(y, decimal_count):g}"
+            for x, y in ring
+        ) + "Z"
+        for ring in ring_list
+        if ring
+    )
+
+
+def build_lod_json(
+    geojson_path: Path = GEOJSON_PATH,
+    lod_name_to_tolerance_px_dict: dict[str, float] = LOD_NAME_TO_TOLERANCE_PX_DICT,
+) -> dict[str, dict]:
+    """ 建置各細節層級的 SVG path 資料，並寫入 `<GeoJSON 檔名>.<細節層級>.json`
+    Returns:
+        dict[str, dict]: 細節層級名稱 -> path 資料
+            view_box: SVG viewBox
+            tolerance_px: 簡化容許誤差 (viewBox 單位)
+            lod_name_list: 所有細節層級名稱 (由粗至細)，供前端選擇升級的層級
+            lod_tolerance_px_list: 所有細節層級的簡化容許誤差
+            name_list: 各行政區名稱
+            path_list: 各行政區的 SVG path 字串
+            bbox_list: 各行政區的邊界框 [x0, y0, x1, y1]
+    """
+    geojson_dict = json.loads(geojson_path.read_text(encoding="utf-8"))
+    name_list = [
+        feature_dict["properties"]["name"]
+        for feature_dict in geojson_dict["features"]
+    ]
+
+    # 投影所有環，並記錄各環所屬的行政區
+    projected_ring_list = list[list[Point]]()
+    ring_feature_i_list = list[int]()
+    for feature_i, ring_list in enumerate(
+        get_feature_ring_list_list(geojson_dict)
+    ):
+        for ring in ring_list:
+            projected_ring_list.append([
+                project_mercator(lon, lat)
+                for lon, lat in ring
+            ])
+            ring_feature_i_list.append(feature_i)
+
+    lod_name_to_lod_dict = dict[str, dict]()
+    for lod_name, tolerance_px in lod_name_to_tolerance_px_dict.items():
+        feature_ring_list_list = [
+            list[list[Point]]()
+            for _ in name_list
+        ]
+        for feature_i, simplified_ring in zip(
+            ring_feature_i_list,
+            simplify_ring_list(projected_ring_list, tolerance_px),
+        ):
+            feature_ring_list_list[feature_i].append(simplified_ring)
+
+        # 若行政區的所有環皆退化 (極小的離島)，則保留其最大的原始環
+        for feature_i, ring_list in enumerate(feature_ring_list_list):
+            if not any(ring_list):
+                ring_list.append(max(
+                    (
+                        projected_ring
+                        for projected_ring, ring_feature_i in zip(
+                            projected_ring_list,
+                            ring_feature_i_list,
+                        )
+                        if ring_feature_i == feature_i
+                    ),
+                    key=len,
+                ))
+
+        decimal_count = max(0, math.ceil(-math.log10(tolerance_px)))
+        lod_dict = {
+            "view_box": VIEW_BOX_STR,
+            "tolerance_px": tolerance_px,
+            "lod_name_list": list(lod_name_to_tolerance_px_dict),
+            "lod_tolerance_px_list": list(lod_name_to_tolerance_px_dict.values()),
+            "name_list": name_list,
+            "path_list": [
+                get_svg_path_str(ring_list, decimal_count)
+                for ring_list in feature_ring_list_list
+            ],
+            "bbox_list": [
+                [
+                    round(min(x for ring in ring_list for x, _ in ring), 1),
+                    round(min(y for ring in ring_list for _, y in ring), 1),
+                    round(max(x for ring in ring_list for x, _ in ring), 1),
+                    round(max(y for ring in ring_list for _, y in ring), 1),
+                ]
+                for ring_list in feature_ring_list_list
+            ],
+        }
+        get_lod_json_path(geojson_path, lod_name).write_text(
+            json.dumps(lod_dict, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        lod_name_to_lod_dict[lod_name] = lod_dict
+    return lod_name_to_lod_dict
+
+
+if __name__ == '__main__':
+    for lod_name, lod_dict in build_lod_json().items():
+        lod_json_path = get_lod_json_path(GEOJSON_PATH, lod_name)
+        print(
+            f"{lod_json_path.name}: "
+            f"{lod_json_path.stat().st_size:,} bytes "
+            f"(容許誤差 {lod_dict['tolerance_px']}px)"
+        )
@@ -0,0 +1,102 @@
+""" Canvas 地圖繪製器的局部重繪 (可於 Brython 中使用)
+
+Canvas 繪製器將各行政區快取為 Path2D，顏色有變化時只重繪變化行政區的邊界框 (dirty bbox):
+以邊界框裁切後，依原本的順序重新填充與其相交的所有行政區，再貼上預先繪製於離屏 canvas 的靜態邊界線。
+行政區達數百個 (鄉鎮市區) 時，以均勻網格索引查詢與邊界框相交的行政區，而不需逐一比對。
+
+邊界框皆為 viewBox 單位的 [x0, y0, x1, y1] (同 `libs.geometry` 輸出的 bbox_list)。
+"""
+REGION_GRID_CELL_SIZE = 50
+"""網格索引的格子大小 (viewBox 單位)"""
+
+DIRTY_BBOX_PADDING = 1
+"""重繪範圍向外擴張的距離 (viewBox 單位)，涵蓋邊界線的寬度與反鋸齒"""
+
+
+def is_bbox_intersected(bbox_a: list[float], bbox_b: list[float]) -> bool:
+    """ 兩個邊界框是否相交 (含邊緣相接) """
+    return (
+        bbox_a[0] <= bbox_b[2] and bbox_b[0] <= bbox_a[2]
+        and bbox_a[1] <= bbox_b[3] and bbox_b[1] <= bbox_a[3]
+    )
+
+
+def get_union_bbox(bbox_a: list[float], bbox_b: list[float]) -> list[float]:
+    """ 取得同時涵蓋兩個邊界框的最小邊界框 """
+    return [
+        min(bbox_a[0], bbox_b[0]),
+        min(bbox_a[1], bbox_b[1]),
+        max(bbox_a[2], bbox_b[2]),
+        max(bbox_a[3], bbox_b[3]),
+    ]
+
+
+def merge_bbox_list(bbox_list: list[list[float]]) -> list[list[float]]:
+    """ 將相交的邊界框合併為一個，使重疊的範圍只重繪一次 (不相交者維持分開，避免相距甚遠的行政區合併為大範圍)
+    """
+    merged_bbox_list = list[list[float]]()
+    for bbox in bbox_list:
+        bbox = list(bbox)
+        merged_bbox_i = 0
+        while merged_bbox_i < len(merged_bbox_list):
+            if is_bbox_intersected(bbox, merged_bbox_list[merged_bbox_i]):
+                # 合併後的範圍變大，須重新與其餘的邊界框比對
+                bbox = get_union_bbox(bbox, merged_bbox_list.pop(merged_bbox_i))
+                merged_bbox_i = 0
+            else:
+                merged_bbox_i += 1
+        merged_bbox_list.append(bbox)
+    return merged_bbox_list
+
+
+class RegionGridIndex:
+    """ 行政區邊界框的均勻網格索引
+    """
+
+    def __init__(
+        self,
+        bbox_list: list[list[float]],
+        cell_size: float = REGION_GRID_CELL_SIZE,
+    ) -> None:
+        self.bbox_list = [list(bbox) for bbox in bbox_list]
+        self.cell_size = cell_size
+        self.cell_to_region_i_list_dict = dict[tuple[int, int], list[int]]()
+        """網格 (行, 列) -> 邊界框與其相交的行政區索引 (由小至大)"""
+        for region_i, bbox in enumerate(self.bbox_list):
+            for cell in self.get_cell_list(bbox):
+                self.cell_to_region_i_list_dict.setdefault(cell, []).append(region_i)
+
+    def get_cell_list(self, bbox: list[float]) -> list[tuple[int, int]]:
+        """ 取得與邊界框相交的網格 """
+        return [
+            (column_i, row_i)
+            for column_i in range(int(bbox[0] // self.cell_size), int(bbox[2] // self.cell_size) + 1)
+            for row_i in range(int(bbox[1] // self.cell_size), int(bbox[3] // self.cell_size) + 1)
+        ]
+
+    def get_region_i_list(self, bbox: list[float]) -> list[int]:
+        """ 取得邊界框與指定邊界框相交的行政區索引 (由小至大，即原本的繪製順序)
+        """
+        region_i_set = set[int]()
+        for cell in self.get_cell_list(bbox):
+            for region_i in self.cell_to_region_i_list_dict.get(cell, []):
+                if region_i not in region_i_set and is_bbox_intersected(self.bbox_list[region_i], bbox):
+                    region_i_set.add(region_i)
+        return sorted(region_i_set)
+
+    def get_dirty_bbox_list(
+        self,
+        region_i_list: list[int],
+        padding: float = DIRTY_BBOX_PADDING,
+    ) -> list[list[float]]:
+        """ 取得重繪指定行政區所需的範圍 (各行政區的邊界框向外擴張 padding 後合併)
+        """
+        return merge_bbox_list([
+            [
+                self.bbox_list[region_i][0] - padding,
+                self.bbox_list[region_i][1] - padding,
+                self.bbox_list[region_i][2] + padding,
+                self.bbox_list[region_i][3] + padding,
+            ]
+            for region_i in region_i_list
+        ])
@@ -0,0 +1,200 @@
+""" 近似重複新聞偵測
+
+不同媒體常以略為不同的標題報導同一起停電事件，僅比對完全相同的標題無法去除。
+此模組以標題的字元 shingle 計算 MinHash 簽章，再以 LSH 分段 (banding) 找出候選配對，
+且只比較日期相距在滑動視窗內的新聞，整體耗時約與新聞數量成線性關係。
+
+使用方法 (根目錄下執行):
+    python -m libs.near_duplicate          # 列出近似重複的新聞群組
+    python -m libs.near_duplicate --merge  # 移除群組中未標註的重複新聞
+"""
+import argparse
+import datetime
+import json
+import random
+import re
+import zlib
+from collections import deque
+
+SHINGLE_CHAR_COUNT = 2
+"""shingle 的字元數"""
+
+BAND_COUNT = 8
+"""LSH 分段數"""
+
+BAND_ROW_COUNT = 4
+"""每段的 MinHash 數 (簽章長度為 BAND_COUNT * BAND_ROW_COUNT)"""
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+_random = random.Random(20240718)
+MINHASH_COEFFICIENT_TUPLE_LIST = [
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME))
+    for _ in range(BAND_COUNT * BAND_ROW_COUNT)
+]
+"""MinHash 使用的雜湊函數係數 (a, b): h(x) = (a*x + b) mod p"""
+
+
+def get_normalized_title(title: str) -> str:
+    """ 正規化新聞標題: 去除結尾的媒體名稱、空白與標點符號
+    """
+    title = title.rsplit(" - ", 1)[0]
+    return re.sub(r"[\s\W_]+", "", title)
+
+
+def get_shingle_hash_set(title: str) -> set[int]:
+    """ 取得標題的字元 shingle 雜湊值集合
+    """
+    normalized_title = get_normalized_title(title)
+    return {
+        zlib.crc32(normalized_title[i:i + SHINGLE_CHAR_COUNT].encode("utf-8"))
+        for i in range(max(len(normalized_title) - SHINGLE_CHAR_COUNT + 1, 1))
+    }
+
+
+def get_minhash_signature(shingle_hash_set: set[int]) -> list[int]:
+    """ 計算 shingle 集合的 MinHash 簽章
+    """
+    return [
+        min((a * shingle_hash + b) % MERSENNE_PRIME for shingle_hash in shingle_hash_set)
+        for a, b in MINHASH_COEFFICIENT_TUPLE_LIST
+    ]
+
+
+def get_jaccard_similarity(set_a: set, set_b: set) -> float:
+    return len(set_a & set_b) / len(set_a | set_b) if set_a or set_b else 1.0
+
+
+def get_near_duplicate_cluster_list(
+    news_dict_list: list[dict],
+    window_day_count: int = 3,
+    min_similarity: float = 0.5,
+) -> list[list[int]]:
+    """ 找出近似重複的新聞群組
+    Args:
+        news_dict_list (list[dict]): 新聞字典串列
+        window_day_count (int): 只比較日期相距不超過此天數的新聞
+        min_similarity (float): 判定為近似重複的標題 shingle Jaccard 相似度下限
+    Returns:
+        list[list[int]]: 各群組的新聞索引 (依索引排序，只列出兩筆以上的群組)
+    """
+    ordinal_list = [
+        datetime.date.fromisoformat(news_dict["date"]).toordinal()
+        for news_dict in news_dict_list
+    ]
+    shingle_hash_set_list = [
+        get_shingle_hash_set(news_dict["title"])
+        for news_dict in news_dict_list
+    ]
+
+    # 聯集-查找 (union-find)
+    parent_i_list = list(range(len(news_dict_list)))
+
+    def find(news_i: int) -> int:
+        while parent_i_list[news_i] != news_i:
+            parent_i_list[news_i] = parent_i_list[parent_i_list[news_i]]
+            news_i = parent_i_list[news_i]
+        return news_i
+
+    # 依日期順序處理新聞，每個 LSH 桶只保留滑動視窗內的新聞
+    band_key_to_news_i_deque_dict = dict[tuple, deque]()
+    for news_i in sorted(range(len(news_dict_list)), key=ordinal_list.__getitem__):
+        signature = get_minhash_signature(shingle_hash_set_list[news_i])
+        candidate_news_i_set = set[int]()
+        for band_i in range(BAND_COUNT):
+            band_key = (
+                band_i,
+                *signature[band_i * BAND_ROW_COUNT:(band_i + 1) * BAND_ROW_COUNT],
+            )
+            news_i_deque = band_key_to_news_i_deque_dict.setdefault(band_key, deque())
+            while (
+                news_i_deque
+                and ordinal_list[news_i] - ordinal_list[news_i_deque[0]] > window_day_count
+            ):
+                news_i_deque.popleft()
+            candidate_news_i_set.update(news_i_deque)
+            news_i_deque.append(news_i)
+
+        # 以實際的 Jaccard 相似度確認候選配對
+        for candidate_news_i in candidate_news_i_set:
+            if get_jaccard_similarity(
+                shingle_hash_set_list[news_i],
+                shingle_hash_set_list[candidate_news_i],
+            ) >= min_similarity:
+                parent_i_list[find(news_i)] = find(candidate_news_i)
+
+    root_i_to_news_i_list_dict = dict[int, list[int]]()
+    for news_i in range(len(news_dict_list)):
+        root_i_to_news_i_list_dict.setdefault(find(news_i), []).append(news_i)
+    return sorted(
+        (
+            news_i_list
+            for news_i_list in root_i_to_news_i_list_dict.values()
+            if len(news_i_list) > 1
+        ),
+        key=lambda news_i_list: news_i_list[0],
+    )
+
+
+def merge_near_duplicate_news_dict_list(
+    news_dict_list: list[dict],
+    near_duplicate_cluster_list: list[list[int]],
+) -> list[dict]:
+    """ 合併近似重複的新聞: 群組中已標註停電戶數的新聞一律保留 (交由人工判斷)，
+    未標註者僅在群組沒有任何已標註的新聞時保留最早的一筆
+    """
+    removed_news_i_set = set[int]()
+    for news_i_list in near_duplicate_cluster_list:
+        annotated_news_i_list = [
+            news_i
+            for news_i in news_i_list
+            if news_dict_list[news_i]["households"] is not None
+        ]
+        kept_news_i_set = set(annotated_news_i_list or news_i_list[:1])
+        removed_news_i_set.update(set(news_i_list) - kept_news_i_set)
+    return [
+        news_dict
+        for news_i, news_dict in enumerate(news_dict_list)
+        if news_i not in removed_news_i_set
+    ]
+
+
+if __name__ == '__main__':
+    from libs.news import NEWS_LIST_JSON_PATH
+    from libs.news_store import NewsStore
+
+    parser = argparse.ArgumentParser(description="偵測近似重複的停電新聞")
+    parser.add_argument("--window-day-count", type=int, default=3)
+    parser.add_argument("--min-similarity", type=float, default=0.5)
+    parser.add_argument("--merge", action="store_true", help="移除群組中未標註的重複新聞")
+    args = parser.parse_args()
+
+    # 先將日誌中尚未壓實的新聞合併回新聞列表，使其也參與比對
+    news_store = NewsStore(NEWS_LIST_JSON_PATH)
+    news_store.compact()
+    news_dict_list = json.loads(NEWS_LIST_JSON_PATH.read_text(encoding="utf-8"))
+    near_duplicate_cluster_list = get_near_duplicate_cluster_list(
+        news_dict_list,
+        window_day_count=args.window_day_count,
+        min_similarity=args.min_similarity,
+    )
+    for news_i_list in near_duplicate_cluster_list:
+        for news_i in news_i_list:
+            news_dict = news_dict_list[news_i]
+            print(
+                f"{news_dict['date']} "
+                f"{'✔' if news_dict['households'] is not None else ' '} "
+                f"{news_dict['title']}"
+            )
+        print()
+    print(f"共 {len(near_duplicate_cluster_list)} 組近似重複的新聞")
+
+    if args.merge:
+        merged_news_dict_list = merge_near_duplicate_news_dict_list(
+            news_dict_list,
+            near_duplicate_cluster_list,
+        )
+        news_store.rewrite(merged_news_dict_list)
+        print(
+            f"已移除 {len(news_dict_list) - len(merged_news_dict_list)} 筆重複新聞"
+        )
@@ -1,11 +1,27 @@
 import calendar
 import datetime
+import hashlib
+import http.client
+import json
+import pickle
+import threading
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, Sequence, TypeVar
 
 from gnews import GNews
+from gnews.exceptions import NetworkError, RateLimitError
 from loguru import logger
 from pydantic import BaseModel, Field, HttpUrl, RootModel, model_validator
 
+from libs.news_cache import get_cached_raw_news_dict_list
+from libs.news_store import (NewsStore, get_journal_jsonl_path,
+                             iter_journal_news_dict,
+                             merge_journal_news_dict_list, write_bytes_atomic,
+                             write_text_atomic)
+
 # 初始化新聞列表資料 JSON 檔
 NEWS_LIST_JSON_PATH = (
     Path(__file__).parent.parent / 'data/news_list.json'
@@ -15,6 +31,19 @@ if not NEWS_LIST_JSON_PATH.exists():
     NEWS_LIST_JSON_PATH.write_text('[]')
 # exit()
 
+# 回填進度檔: 記錄已完成爬取的月份及其新聞，供中斷後續傳
+BACKFILL_CHECKPOINT_JSON_PATH = (
+    NEWS_LIST_JSON_PATH.with_name('news_list.backfill_checkpoint.json')
+)
+
+# 新聞列表的已驗證快照: 供 load_news_list 跳過重複的 pydantic 驗證
+NEWS_LIST_SNAPSHOT_PATH = (
+    NEWS_LIST_JSON_PATH.parent / '.cache/news_list.snapshot.pickle'
+)
+NEWS_LIST_SNAPSHOT_VERSION = 2
+
+T = TypeVar('T')
+
 
 class News(BaseModel):
     date: datetime.date = Field(...)
@@ -47,6 +76,286 @@ class NewsList(RootModel[list[News]]):
     pass
 
 
+def get_news_dict_hash_str(news_dict: dict) -> str:
+    """ 取得新聞字典內容的雜湊值 (供快照判斷記錄是否變動)
+    """
+    return hashlib.blake2b(
+        json.dumps(news_dict, ensure_ascii=False, sort_keys=True).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+class LazyNewsList(Sequence[News]):
+    """ 延遲驗證的新聞列表: 存取記錄時才建立 (並快取) pydantic 物件
+    """
+
+    def __init__(
+        self,
+        news_dict_list: list[dict],
+        hash_str_to_news_dict: dict[str, News] | None = None,
+    ) -> None:
+        self._news_dict_list = news_dict_list
+        self._news_list: list[News | None] = [None] * len(news_dict_list)
+        self._hash_str_to_news_dict = hash_str_to_news_dict or {}
+
+    def __len__(self) -> int:
+        return len(self._news_dict_list)
+
+    def __getitem__(self, news_i):
+        if isinstance(news_i, slice):
+            return [self[_news_i] for _news_i in range(len(self))[news_i]]
+        if (news := self._news_list[news_i]) is None:
+            news_dict = self._news_dict_list[news_i]
+            news = (
+                self._hash_str_to_news_dict.get(get_news_dict_hash_str(news_dict))
+                or News.model_validate(news_dict)
+            )
+            self._news_list[news_i] = news
+        return news
+
+
+def get_path_stat_tuple(path: Path) -> tuple[int, int] | None:
+    """ 取得檔案的修改時間與大小 (檔案不存在時為 None) """
+    if not path.exists():
+        return None
+    path_stat = path.stat()
+    return path_stat.st_mtime_ns, path_stat.st_size
+
+
+def load_news_list(
+    news_list_json_path: Path = NEWS_LIST_JSON_PATH,
+    news_list_snapshot_path: Path = NEWS_LIST_SNAPSHOT_PATH,
+    lazy: bool = False,
+) -> list[News] | LazyNewsList:
+    """ 讀取新聞列表資料 (含日誌中尚未壓實的新聞): 驗證一次後寫入快照，之後直接讀取快照而不再重複驗證
+    - 新聞列表與日誌的修改時間與大小 (或內容雜湊值) 與快照相同時，直接返回快照
+    - 否則只重新驗證內容有變動的記錄
+    Args:
+        lazy (bool): 快照過期時，不立即驗證所有記錄，而是於存取時才驗證 (不更新快照)
+    """
+    journal_jsonl_path = get_journal_jsonl_path(news_list_json_path)
+    source_stat_tuple = (
+        get_path_stat_tuple(news_list_json_path),
+        get_path_stat_tuple(journal_jsonl_path),
+    )
+    snapshot_dict = None
+    if news_list_snapshot_path.exists():
+        try:
+            snapshot_dict = pickle.loads(news_list_snapshot_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"無法讀取新聞列表快照: {e}")
+        if (
+            snapshot_dict is not None
+            and snapshot_dict["version"] != NEWS_LIST_SNAPSHOT_VERSION
+        ):
+            snapshot_dict = None
+
+    # 修改時間與大小相同: 直接使用快照
+    if (
+        snapshot_dict is not None
+        and snapshot_dict["source_stat"] == source_stat_tuple
+    ):
+        return snapshot_dict["news_list"]
+
+    # 內容雜湊值相同 (例如檔案被重新寫入相同內容): 使用快照並更新修改時間
+    news_list_json_bytes = news_list_json_path.read_bytes()
+    journal_jsonl_bytes = (
+        journal_jsonl_path.read_bytes()
+        if journal_jsonl_path.exists() else b""
+    )
+    sha256_str = hashlib.sha256(
+        news_list_json_bytes + b"\0" + journal_jsonl_bytes
+    ).hexdigest()
+    if snapshot_dict is not None and snapshot_dict["sha256"] == sha256_str:
+        news_list = snapshot_dict["news_list"]
+    else:
+        # 只重新驗證內容有變動的記錄
+        hash_str_to_news_dict = (
+            dict(zip(snapshot_dict["hash_str_list"], snapshot_dict["news_list"]))
+            if snapshot_dict is not None else {}
+        )
+        news_dict_list = json.loads(news_list_json_bytes)
+        if journal_jsonl_bytes:
+            news_dict_list = merge_journal_news_dict_list(
+                news_dict_list,
+                iter_journal_news_dict(
+                    journal_jsonl_bytes.decode("utf-8").splitlines()
+                ),
+            )
+        if lazy:
+            return LazyNewsList(news_dict_list, hash_str_to_news_dict)
+        hash_str_list = [
+            get_news_dict_hash_str(news_dict)
+            for news_dict in news_dict_list
+        ]
+        news_list = [
+            hash_str_to_news_dict.get(hash_str) or News.model_validate(news_dict)
+            for hash_str, news_dict in zip(hash_str_list, news_dict_list)
+        ]
+        snapshot_dict = {
+            "version": NEWS_LIST_SNAPSHOT_VERSION,
+            "hash_str_list": hash_str_list,
+            "news_list": news_list,
+        }
+
+    snapshot_dict.update({
+        "source_stat": source_stat_tuple,
+        "sha256": sha256_str,
+    })
+    news_list_snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    write_bytes_atomic(
+        news_list_snapshot_path,
+        pickle.dumps(snapshot_dict, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+    return news_list
+
+
+class RateLimiter:
+    """ 請求速率限制器: 確保相鄰兩次請求至少間隔指定秒數 (執行緒安全)
+    """
+
+    def __init__(self, min_interval_sec: float) -> None:
+        self.min_interval_sec = min_interval_sec
+        self._next_request_sec = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """ 等待直到允許發出下一次請求
+        """
+        with self._lock:
+            now_sec = time.monotonic()
+            wait_sec = max(self._next_request_sec - now_sec, 0)
+            self._next_request_sec = (
+                max(self._next_request_sec, now_sec) + self.min_interval_sec
+            )
+        if wait_sec:
+            time.sleep(wait_sec)
+
+
+# 各主機的請求速率限制器
+HOST_TO_RATE_LIMITER_DICT = {
+    "news.google.com": RateLimiter(min_interval_sec=1.0),
+}
+
+
+TRANSIENT_ERROR_TYPE_TUPLE = (
+    NetworkError,
+    RateLimitError,
+    urllib.error.URLError,
+    http.client.HTTPException,
+    ConnectionError,
+    TimeoutError,
+)
+"""可能於重試後成功的暫時性錯誤 (網路與 HTTP 錯誤)"""
+
+
+def retry_with_backoff(
+    func: Callable[[], T],
+    max_attempt_count: int = 5,
+    base_delay_sec: float = 2.0,
+) -> T:
+    """ 執行函數，發生暫時性錯誤 (TRANSIENT_ERROR_TYPE_TUPLE) 時以指數退避 (2, 4, 8, ... 秒) 重試
+    (離線模式的快取未命中、資料驗證失敗等必然重複發生的錯誤則立即拋出)
+    """
+    for attempt_i in range(max_attempt_count):
+        try:
+            return func()
+        except TRANSIENT_ERROR_TYPE_TUPLE as e:
+            if attempt_i == max_attempt_count - 1:
+                raise
+            delay_sec = base_delay_sec * 2**attempt_i
+            logger.warning(f"{e} ({delay_sec} 秒後重試)")
+            time.sleep(delay_sec)
+
+
+GNEWS_MAX_RESULT_COUNT = 100
+"""GNews 單次查詢返回的新聞數上限"""
+
+
+GNEWS_LANGUAGE = 'zh-Hant'
+GNEWS_COUNTRY = 'TW'
+GNEWS_EXCLUDE_WEBSITE_LIST = [
+    'https://www.cw.com.tw',  # 天下雜誌
+    'https://www.parenting.com.tw',  # 親子天下
+    'https://www.ithome.com.tw',  # iThome
+    'https://news.housefun.com.tw',  # 好房網
+    'https://www.soft4fun.net',  # 硬是要學
+]
+NEWS_QUERY_STR = '"停電" AND "戶"'
+
+
+def get_raw_news_dict_list(
+    start_date: datetime.date,
+    end_date: datetime.date,
+    query_str: str = NEWS_QUERY_STR,
+) -> list[dict]:
+    """ 以單次 GNews 查詢取得指定日期區間的原始新聞字典串列 (經由本機回應快取)
+    """
+    def fetch_raw_news_dict_list() -> list[dict]:
+        google_news = GNews(
+            language=GNEWS_LANGUAGE,
+            country=GNEWS_COUNTRY,
+            start_date=start_date,
+            end_date=end_date,
+            max_results=GNEWS_MAX_RESULT_COUNT,
+            # proxy=proxy,
+            exclude_websites=GNEWS_EXCLUDE_WEBSITE_LIST,
+        )
+        HOST_TO_RATE_LIMITER_DICT["news.google.com"].wait()
+        return google_news.get_news(query_str) or []
+
+    return get_cached_raw_news_dict_list(
+        request_dict={
+            "query": query_str,
+            "language": GNEWS_LANGUAGE,
+            "country": GNEWS_COUNTRY,
+            "start_date": f"{start_date:%Y-%m-%d}",
+            "end_date": f"{end_date:%Y-%m-%d}",
+            "max_results": GNEWS_MAX_RESULT_COUNT,
+            "exclude_websites": GNEWS_EXCLUDE_WEBSITE_LIST,
+        },
+        end_date=end_date,
+        fetch_raw_news_dict_list=fetch_raw_news_dict_list,
+    )
+
+
+def get_raw_news_dict_list_adaptively(
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> list[dict]:
+    """ 取得指定日期區間的原始新聞字典串列: 若查詢結果達到 GNews 的數量上限 (可能被截斷)，
+    則將區間對半切分並同時查詢兩個子區間，遞迴直到子區間只剩一天或結果未達上限為止，
+    最後合併並去除標題重複的新聞
+    """
+    raw_news_dict_list = get_raw_news_dict_list(start_date, end_date)
+    day_count = (end_date - start_date).days
+    if len(raw_news_dict_list) < GNEWS_MAX_RESULT_COUNT or day_count <= 1:
+        return raw_news_dict_list
+
+    # 查詢結果已飽和: 切分為兩個子區間 (於中間日重疊，重複的新聞於合併時去除)
+    mid_date = start_date + datetime.timedelta(days=day_count // 2)
+    logger.info(
+        f"{start_date}~{end_date} 的查詢結果達到上限，"
+        f"切分為 {start_date}~{mid_date} 與 {mid_date}~{end_date}"
+    )
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sub_raw_news_dict_list_list = list(executor.map(
+            lambda sub_date_tuple: get_raw_news_dict_list_adaptively(
+                *sub_date_tuple
+            ),
+            [(start_date, mid_date), (mid_date, end_date)],
+        ))
+
+    title_to_raw_news_dict = dict[str, dict]()
+    for raw_news_dict in [
+        raw_news_dict
+        for raw_news_dict_list in [raw_news_dict_list, *sub_raw_news_dict_list_list]
+        for raw_news_dict in raw_news_dict_list
+    ]:
+        title_to_raw_news_dict.setdefault(raw_news_dict["title"], raw_news_dict)
+    return list(title_to_raw_news_dict.values())
+
+
 def get_news_list(
     year_int: int,
     month_int: int,
@@ -57,23 +366,11 @@ def get_news_list(
         start_date.year, start_date.month
     )[1]
     end_date = datetime.date(year_int, month_int, last_day_of_month)
-    google_news = GNews(
-        language='zh-Hant',
-        country='TW',
-        start_date=start_date,
-        end_date=end_date,
-        max_results=100,
-        # proxy=proxy,
-        exclude_websites=[
-            'https://www.cw.com.tw',  # 天下雜誌
-            'https://www.parenting.com.tw',  # 親子天下
-            'https://www.ithome.com.tw',  # iThome
-            'https://news.housefun.com.tw',  # 好房網
-            'https://www.soft4fun.net',  # 硬是要學
-        ]
-    )
 
-    raw_news_dict_list = google_news.get_news('"停電" AND "戶"')
+    raw_news_dict_list = get_raw_news_dict_list_adaptively(
+        start_date,
+        end_date,
+    )
     return [
         news
         for news_dict in raw_news_dict_list
@@ -81,68 +378,150 @@ def get_news_list(
     ]
 
 
-def update_news_list_json(
+def iter_year_month_int_tuple(
     start_year_month_int_tuple: tuple[int, int],
     end_year_month_int_tuple: tuple[int, int],
 ):
-    start_year_int, start_month_int = start_year_month_int_tuple
-    end_year_int, end_month_int = end_year_month_int_tuple
+    """ 依序產生起訖月份 (含) 之間的所有 (年, 月)
+    """
+    year_int, month_int = start_year_month_int_tuple
+    while (year_int, month_int) <= end_year_month_int_tuple:
+        yield year_int, month_int
+        year_int, month_int = (
+            year_int + (month_int // 12),
+            (month_int % 12) + 1,
+        )
 
-    month_1st_date = datetime.date(start_year_int, start_month_int, 1)
 
-    # 讀取現有的新聞列表資料
-    news_list = NewsList.model_validate_json(
-        NEWS_LIST_JSON_PATH.read_text(encoding="utf-8")
-    ).root
-    news_title_set = {
-        news.title
-        for news in news_list
-    }
-    # print(news_list)
+def update_news_list_json(
+    start_year_month_int_tuple: tuple[int, int],
+    end_year_month_int_tuple: tuple[int, int],
+):
+    """ 爬取指定月份 (含) 之間的停電新聞，並將新的新聞追加至新聞列表的日誌
+    (結束時若日誌筆數達到門檻才壓實回 `data/news_list.json`)
+    """
+    news_store = NewsStore(NEWS_LIST_JSON_PATH)
 
     try:
-        while (month_1st_date.year, month_1st_date.month) <= (end_year_int, end_month_int):
-
+        for year_int, month_int in iter_year_month_int_tuple(
+            start_year_month_int_tuple,
+            end_year_month_int_tuple,
+        ):
             logger.info(
-                f"正在獲取 {month_1st_date.year}年{month_1st_date.month:02d}月 的停電新聞"
+                f"正在獲取 {year_int}年{month_int:02d}月 的停電新聞"
             )
             _news_list = get_news_list(
-                year_int=month_1st_date.year,
-                month_int=month_1st_date.month,
+                year_int=year_int,
+                month_int=month_int,
             )
             _news_list.sort(key=lambda news: news.date)
             for _news in _news_list:
                 logger.debug(_news)
 
             # 新增新的新聞至資料庫
-            _new_news_list = []
-            for _news in _news_list:
-                if _news.title not in news_title_set:
-                    _new_news_list.append(_news)
-                    news_title_set.add(_news.title)
+            _new_news_dict_list = news_store.append([
+                _news.model_dump(mode="json")
+                for _news in _news_list
+            ])
             logger.success(
-                f"{month_1st_date.year}年{month_1st_date.month:02d}月 "
+                f"{year_int}年{month_int:02d}月 "
                 f"共有 {len(_news_list)} 筆新聞 "
-                f"({len(_new_news_list)} 筆新的新聞)"
-            )
-            news_list.extend(_new_news_list)
-
-            # 跳至下一個月
-            month_1st_date = datetime.date(
-                month_1st_date.year + (month_1st_date.month // 12),
-                (month_1st_date.month % 12) + 1,
-                1,
+                f"({len(_new_news_dict_list)} 筆新的新聞)"
             )
     except Exception as e:
         logger.error(e)
     finally:
-        # 排序新聞列表資料並寫入 JSON 檔
-        news_list.sort(key=lambda news: news.date)
-        NEWS_LIST_JSON_PATH.write_text(
-            NewsList(news_list).model_dump_json(indent=4),
-            encoding="utf-8",
+        news_store.compact_if_needed()
+
+
+def backfill_news_list_json(
+    start_year_month_int_tuple: tuple[int, int],
+    end_year_month_int_tuple: tuple[int, int],
+    max_worker_count: int = 4,
+    checkpoint_json_path: Path = BACKFILL_CHECKPOINT_JSON_PATH,
+) -> None:
+    """ 回填多個月份的停電新聞: 以有限的執行緒池同時爬取各月份，失敗時以指數退避重試，
+    並將已完成的月份記錄於進度檔，中斷後重新執行即可從未完成的月份續傳。
+    所有月份完成後，依月份順序合併至新聞列表資料 (與完成順序無關，結果具決定性)。
+    """
+    # 讀取進度檔: 已完成的月份 -> 該月份爬取到的新聞
+    done_month_str_to_news_dict_list_dict: dict[str, list[dict]] = (
+        json.loads(checkpoint_json_path.read_text(encoding="utf-8"))
+        if checkpoint_json_path.exists() else {}
+    )
+    year_month_int_tuple_list = list(iter_year_month_int_tuple(
+        start_year_month_int_tuple,
+        end_year_month_int_tuple,
+    ))
+    pending_year_month_int_tuple_list = [
+        (year_int, month_int)
+        for year_int, month_int in year_month_int_tuple_list
+        if f"{year_int}-{month_int:02d}" not in done_month_str_to_news_dict_list_dict
+    ]
+    logger.info(
+        f"共 {len(year_month_int_tuple_list)} 個月份，"
+        f"其中 {len(pending_year_month_int_tuple_list)} 個月份尚未完成"
+    )
+
+    checkpoint_lock = threading.Lock()
+    failed_month_str_list = list[str]()
+    with ThreadPoolExecutor(max_workers=max_worker_count) as executor:
+        future_to_month_str_dict = {
+            executor.submit(
+                retry_with_backoff,
+                lambda year_int=year_int, month_int=month_int: get_news_list(
+                    year_int=year_int,
+                    month_int=month_int,
+                ),
+            ): f"{year_int}-{month_int:02d}"
+            for year_int, month_int in pending_year_month_int_tuple_list
+        }
+        for future in as_completed(future_to_month_str_dict):
+            month_str = future_to_month_str_dict[future]
+            try:
+                _news_list = future.result()
+            except Exception as e:
+                logger.error(f"{month_str} 爬取失敗: {e}")
+                failed_month_str_list.append(month_str)
+                continue
+            logger.success(f"{month_str} 共有 {len(_news_list)} 筆新聞")
+
+            # 更新進度檔
+            with checkpoint_lock:
+                done_month_str_to_news_dict_list_dict[month_str] = [
+                    _news.model_dump(mode="json")
+                    for _news in _news_list
+                ]
+                write_text_atomic(
+                    checkpoint_json_path,
+                    json.dumps(
+                        done_month_str_to_news_dict_list_dict,
+                        ensure_ascii=False,
+                    ),
+                )
+
+    if failed_month_str_list:
+        logger.error(
+            f"{len(failed_month_str_list)} 個月份爬取失敗 "
+            f"({', '.join(sorted(failed_month_str_list))})，"
+            "請重新執行以續傳"
+        )
+        return
+
+    # 依月份順序合併至新聞列表資料
+    news_store = NewsStore(NEWS_LIST_JSON_PATH)
+    new_news_count = 0
+    for year_int, month_int in year_month_int_tuple_list:
+        _news_dict_list = sorted(
+            done_month_str_to_news_dict_list_dict[f"{year_int}-{month_int:02d}"],
+            key=lambda news_dict: news_dict["date"],
         )
-        logger.success(f"新聞列表資料已寫入 {NEWS_LIST_JSON_PATH}")
+        new_news_count += len(news_store.append(_news_dict_list))
+    news_store.compact_if_needed()
+    checkpoint_json_path.unlink()
+    logger.success(
+        f"新聞列表資料已更新 {NEWS_LIST_JSON_PATH} ({new_news_count} 筆新的新聞)"
+    )
 
 
 if __name__ == '__main__':
@@ -168,6 +547,13 @@ if __name__ == '__main__':
     #     print()
 
     today = datetime.date.today()
+
+    # # 回填 2014年至今的停電新聞 (中斷後重新執行即可續傳)
+    # backfill_news_list_json(
+    #     start_year_month_int_tuple=(2014, 1),
+    #     end_year_month_int_tuple=(today.year, today.month),
+    # )
+
     update_news_list_json(
         start_year_month_int_tuple=(today.year, today.month),
         end_year_month_int_tuple=(today.year, today.month),
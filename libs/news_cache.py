@@ -0,0 +1,123 @@
+""" 新聞查詢的本機回應快取
+
+以查詢參數 (查詢字串、語言、國家、日期區間等) 的雜湊值為鍵，將查詢結果存於 `data/.cache/gnews/`。
+已結束月份的查詢結果不會再變動，因此給予較長的有效期限；當月的查詢結果則只保留一小段時間。
+
+快取模式可由環境變數 `NEWS_CACHE_MODE` 設定:
+    online: 優先使用有效的快取，未命中或過期時才發出請求 (預設)
+    refresh: 一律發出請求並更新快取
+    offline: 只使用快取 (不論是否過期)，未命中時拋出 NewsCacheMissError，不發出任何網路請求
+"""
+import datetime
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+from libs.news_store import write_text_atomic
+
+NEWS_CACHE_DIR_PATH = Path(__file__).parent.parent / 'data/.cache/gnews'
+
+PAST_WINDOW_TTL_SEC = 365 * 24 * 60 * 60
+"""已結束月份的查詢結果有效期限 (秒)"""
+
+CURRENT_WINDOW_TTL_SEC = 60 * 60
+"""涵蓋當月的查詢結果有效期限 (秒)"""
+
+NEWS_CACHE_MODE_LIST = ["online", "refresh", "offline"]
+
+
+class NewsCacheMissError(LookupError):
+    """ 離線模式下查詢未命中快取 """
+
+
+def get_news_cache_mode() -> str:
+    """ 取得目前的快取模式 (環境變數 NEWS_CACHE_MODE)
+    """
+    news_cache_mode = os.environ.get("NEWS_CACHE_MODE", "online")
+    if news_cache_mode not in NEWS_CACHE_MODE_LIST:
+        raise ValueError(
+            f"NEWS_CACHE_MODE 必須為 {NEWS_CACHE_MODE_LIST} 之一: {news_cache_mode}"
+        )
+    return news_cache_mode
+
+
+def get_news_cache_key(request_dict: dict) -> str:
+    """ 以查詢參數的 SHA-256 雜湊值作為快取鍵
+    """
+    return hashlib.sha256(
+        json.dumps(
+            request_dict,
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def get_news_cache_ttl_sec(
+    end_date: datetime.date,
+    today: datetime.date | None = None,
+) -> int:
+    """ 取得查詢結果的有效期限: 區間於本月之前結束者較長，否則較短
+    """
+    today = today or datetime.date.today()
+    return (
+        PAST_WINDOW_TTL_SEC
+        if end_date < today.replace(day=1) else
+        CURRENT_WINDOW_TTL_SEC
+    )
+
+
+def get_cached_raw_news_dict_list(
+    request_dict: dict,
+    end_date: datetime.date,
+    fetch_raw_news_dict_list: Callable[[], list[dict]],
+    news_cache_dir_path: Path = NEWS_CACHE_DIR_PATH,
+) -> list[dict]:
+    """ 經由快取取得查詢結果
+    Args:
+        request_dict (dict): 查詢參數 (決定快取鍵)
+        end_date (datetime.date): 查詢區間的結束日 (決定有效期限)
+        fetch_raw_news_dict_list (Callable[[], list[dict]]): 實際發出請求的函數
+    """
+    news_cache_mode = get_news_cache_mode()
+    news_cache_key = get_news_cache_key(request_dict)
+    news_cache_json_path = (
+        news_cache_dir_path / news_cache_key[:2] / f"{news_cache_key}.json"
+    )
+
+    if news_cache_mode != "refresh" and news_cache_json_path.exists():
+        news_cache_dict = json.loads(
+            news_cache_json_path.read_text(encoding="utf-8")
+        )
+        if (
+            news_cache_mode == "offline"
+            or time.time() - news_cache_dict["fetched_at"]
+            < get_news_cache_ttl_sec(end_date)
+        ):
+            logger.debug(f"命中快取: {request_dict}")
+            return news_cache_dict["response"]
+
+    if news_cache_mode == "offline":
+        raise NewsCacheMissError(f"離線模式下未命中快取: {request_dict}")
+
+    raw_news_dict_list = fetch_raw_news_dict_list()
+    news_cache_json_path.parent.mkdir(parents=True, exist_ok=True)
+    write_text_atomic(
+        news_cache_json_path,
+        json.dumps(
+            {
+                "request": request_dict,
+                "fetched_at": time.time(),
+                "response": raw_news_dict_list,
+            },
+            ensure_ascii=False,
+            default=str,
+        ),
+    )
+    return raw_news_dict_list
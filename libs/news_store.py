@@ -0,0 +1,285 @@
+""" 新聞列表的增量儲存層
+
+新爬取或修改的新聞先以 JSON Lines 追加至日誌檔 (`data/news_list.journal.jsonl`)，
+並以持久化的標題/網址雜湊索引 (`data/news_list.index.json`) 判斷重複，
+每次更新只需 O(新增筆數) 的時間與 I/O，不必讀取與改寫整份新聞列表。
+日誌筆數達到門檻 (COMPACT_JOURNAL_RECORD_COUNT) 時才壓實 (compact)，將日誌合併回排序後的 `data/news_list.json`，
+讀取新聞列表者 (時間軸資料包、load_news_list 等) 則以 read_news_dict_list 同時讀取新聞列表與日誌。
+日誌與索引皆為暫存的中間產物，不納入版本控制。
+
+所有整檔寫入皆採「寫入暫存檔後更名」，寫入中斷也不會損毀原檔。
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from loguru import logger
+
+COMPACT_JOURNAL_RECORD_COUNT = 500
+"""日誌筆數達到此值時壓實"""
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """ 以「寫入暫存檔後更名」的方式寫入檔案，避免寫入中斷時損毀原檔
+    (每次寫入使用唯一的暫存檔名，多個執行緒同時寫入同一檔案時不會互相覆寫暫存檔)
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as tmp_file:
+        try:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    os.replace(tmp_file.name, path)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """ 以「寫入暫存檔後更名」的方式寫入 UTF-8 文字檔 (同 write_bytes_atomic)
+    """
+    write_bytes_atomic(path, text.encode("utf-8"))
+
+
+def get_journal_jsonl_path(news_list_json_path: Path) -> Path:
+    """ 取得新聞列表的日誌檔路徑 """
+    return news_list_json_path.with_name(f"{news_list_json_path.stem}.journal.jsonl")
+
+
+def iter_journal_news_dict(line_iter: Iterable[str]) -> Iterator[dict]:
+    """ 依序產生日誌各行的新聞字典 (略過空行與寫入中斷造成的不完整紀錄)
+    """
+    for line in line_iter:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"略過日誌中不完整的紀錄: {line!r}")
+
+
+def merge_journal_news_dict_list(
+    news_dict_list: list[dict],
+    journal_news_dict_iter: Iterable[dict],
+) -> list[dict]:
+    """ 將日誌中的新聞合併至新聞列表並依日期排序:
+    取代標題相同的既有新聞 (若有多筆則取代第一筆)，否則追加
+    """
+    news_dict_list = list(news_dict_list)
+    title_to_news_i_dict = dict[str, int]()
+    for news_i, news_dict in enumerate(news_dict_list):
+        title_to_news_i_dict.setdefault(news_dict["title"], news_i)
+    for news_dict in journal_news_dict_iter:
+        if (news_i := title_to_news_i_dict.get(news_dict["title"])) is None:
+            title_to_news_i_dict[news_dict["title"]] = len(news_dict_list)
+            news_dict_list.append(news_dict)
+        else:
+            news_dict_list[news_i] = news_dict
+    news_dict_list.sort(key=lambda news_dict: news_dict["date"])
+    return news_dict_list
+
+
+def read_news_dict_list(news_list_json_path: Path) -> list[dict]:
+    """ 讀取新聞列表，並合併日誌中尚未壓實的新聞 (不改寫任何檔案)
+    """
+    news_dict_list = json.loads(news_list_json_path.read_text(encoding="utf-8"))
+    journal_jsonl_path = get_journal_jsonl_path(news_list_json_path)
+    if not journal_jsonl_path.exists():
+        return news_dict_list
+    with journal_jsonl_path.open("r", encoding="utf-8") as journal_file:
+        return merge_journal_news_dict_list(
+            news_dict_list,
+            iter_journal_news_dict(journal_file),
+        )
+
+
+def get_hash_str(text: str) -> str:
+    """ 取得字串的短雜湊值 (供索引使用) """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class NewsStore:
+    """ 新聞列表的增量儲存層
+    """
+
+    def __init__(self, news_list_json_path: Path) -> None:
+        self.news_list_json_path = news_list_json_path
+        self.journal_jsonl_path = get_journal_jsonl_path(news_list_json_path)
+        self.index_json_path = news_list_json_path.with_name(
+            f"{news_list_json_path.stem}.index.json"
+        )
+        self.title_hash_set = set[str]()
+        self.url_hash_set = set[str]()
+        self.journal_record_count = 0
+        self._load_index()
+
+    def _get_source_stat_dict(self) -> dict:
+        """ 取得新聞列表與日誌檔的狀態，用以判斷索引是否過期 (例如新聞列表被手動編輯)
+        """
+        news_list_json_stat = self.news_list_json_path.stat()
+        return {
+            "news_list_mtime_ns": news_list_json_stat.st_mtime_ns,
+            "news_list_size": news_list_json_stat.st_size,
+            "journal_size": (
+                self.journal_jsonl_path.stat().st_size
+                if self.journal_jsonl_path.exists() else 0
+            ),
+        }
+
+    def _iter_journal_news_dict(self):
+        """ 依序產生日誌中的新聞字典
+        """
+        if not self.journal_jsonl_path.exists():
+            return
+        with self.journal_jsonl_path.open("r", encoding="utf-8") as journal_file:
+            yield from iter_journal_news_dict(journal_file)
+
+    def _load_index(self) -> None:
+        """ 讀取索引，若索引不存在或已過期則重建
+        """
+        if self.index_json_path.exists():
+            index_dict = json.loads(
+                self.index_json_path.read_text(encoding="utf-8")
+            )
+            if index_dict["source_stat"] == self._get_source_stat_dict():
+                self.title_hash_set = set(index_dict["title_hash_list"])
+                self.url_hash_set = set(index_dict["url_hash_list"])
+                self.journal_record_count = index_dict["journal_record_count"]
+                return
+
+        logger.info(f"重建新聞索引 {self.index_json_path}")
+        news_dict_list = json.loads(
+            self.news_list_json_path.read_text(encoding="utf-8")
+        )
+        journal_news_dict_list = list(self._iter_journal_news_dict())
+        self.title_hash_set = set()
+        self.url_hash_set = set()
+        for news_dict in news_dict_list + journal_news_dict_list:
+            self._add_to_index(news_dict)
+        self.journal_record_count = len(journal_news_dict_list)
+        self._save_index()
+
+    def _add_to_index(self, news_dict: dict) -> None:
+        self.title_hash_set.add(get_hash_str(news_dict["title"]))
+        self.url_hash_set.add(get_hash_str(news_dict["url"]))
+
+    def _save_index(self) -> None:
+        write_text_atomic(
+            self.index_json_path,
+            json.dumps({
+                "source_stat": self._get_source_stat_dict(),
+                "journal_record_count": self.journal_record_count,
+                "title_hash_list": sorted(self.title_hash_set),
+                "url_hash_list": sorted(self.url_hash_set),
+            }),
+        )
+
+    def contains(self, news_dict: dict) -> bool:
+        """ 判斷新聞是否已存在 (標題或網址重複)
+        """
+        return (
+            get_hash_str(news_dict["title"]) in self.title_hash_set
+            or get_hash_str(news_dict["url"]) in self.url_hash_set
+        )
+
+    def _append_journal(self, news_dict_list: list[dict]) -> None:
+        """ 將新聞字典追加至日誌檔並更新索引
+        """
+        if not news_dict_list:
+            return
+        with self.journal_jsonl_path.open("a", encoding="utf-8") as journal_file:
+            for news_dict in news_dict_list:
+                journal_file.write(json.dumps(news_dict, ensure_ascii=False) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        for news_dict in news_dict_list:
+            self._add_to_index(news_dict)
+        self.journal_record_count += len(news_dict_list)
+        self._save_index()
+
+    def append(self, news_dict_list: list[dict]) -> list[dict]:
+        """ 追加不重複的新聞
+        Returns:
+            list[dict]: 實際追加的新聞
+        """
+        new_news_dict_list = list[dict]()
+        # 同一批次內重複的新聞 (索引於 _append_journal 中才更新)
+        new_title_hash_set = set[str]()
+        new_url_hash_set = set[str]()
+        for news_dict in news_dict_list:
+            title_hash_str = get_hash_str(news_dict["title"])
+            url_hash_str = get_hash_str(news_dict["url"])
+            if (
+                self.contains(news_dict)
+                or title_hash_str in new_title_hash_set
+                or url_hash_str in new_url_hash_set
+            ):
+                continue
+            new_news_dict_list.append(news_dict)
+            new_title_hash_set.add(title_hash_str)
+            new_url_hash_set.add(url_hash_str)
+        self._append_journal(new_news_dict_list)
+        return new_news_dict_list
+
+    def upsert(self, news_dict_list: list[dict]) -> None:
+        """ 新增或修改新聞 (壓實時以標題相同者為同一筆，後寫入者優先)
+        """
+        self._append_journal(news_dict_list)
+
+    def compact(self) -> None:
+        """ 將日誌合併回依日期排序的新聞列表 JSON 檔，並清空日誌
+        """
+        if not self.journal_record_count:
+            return
+
+        news_dict_list = merge_journal_news_dict_list(
+            json.loads(self.news_list_json_path.read_text(encoding="utf-8")),
+            self._iter_journal_news_dict(),
+        )
+        write_text_atomic(
+            self.news_list_json_path,
+            json.dumps(news_dict_list, ensure_ascii=False, indent=4),
+        )
+        self.journal_jsonl_path.unlink()
+        logger.success(
+            f"已將 {self.journal_record_count} 筆日誌壓實至 {self.news_list_json_path}"
+        )
+        self.journal_record_count = 0
+        self._save_index()
+
+    def compact_if_needed(self) -> None:
+        """ 日誌筆數達到門檻時壓實
+        """
+        if self.journal_record_count >= COMPACT_JOURNAL_RECORD_COUNT:
+            self.compact()
+
+    def rewrite(self, news_dict_list: list[dict]) -> None:
+        """ 以指定的新聞改寫整份新聞列表 (例如移除重複的新聞)，並清空日誌、重建索引
+        (日誌中尚未壓實的新聞會被捨棄，呼叫前應先 compact 並以壓實後的新聞列表為基礎)
+        """
+        write_text_atomic(
+            self.news_list_json_path,
+            json.dumps(news_dict_list, ensure_ascii=False, indent=4),
+        )
+        self.journal_jsonl_path.unlink(missing_ok=True)
+        self.journal_record_count = 0
+        self.title_hash_set = set()
+        self.url_hash_set = set()
+        for news_dict in news_dict_list:
+            self._add_to_index(news_dict)
+        self._save_index()
+
+
+if __name__ == '__main__':
+    from libs.news import NEWS_LIST_JSON_PATH
+
+    # 將日誌壓實至新聞列表 (手動編輯 `data/news_list.json` 前執行)
+    NewsStore(NEWS_LIST_JSON_PATH).compact()
@@ -0,0 +1,86 @@
+""" 以實際經過時間驅動的播放時鐘 (可於 Brython 中使用)
+
+播放位置 (含小數的天數) 依每個影格實際經過的秒數與播放速度推進，
+每個影格返回落在該影格內的所有天數，由呼叫端一次批次模擬，
+因此不論播放速度或單一影格的耗時，播放進度皆與實際時間同步，也不會堆積計時器回呼。
+"""
+from libs.blackout import PER_SEC_DAY_COUNT
+
+PER_SEC_DAY_COUNT_TO_LABEL_DICT = {
+    1: "1 天/秒",
+    7: "1 週/秒",
+    PER_SEC_DAY_COUNT: "1 個月/秒",
+    91: "1 季/秒",
+    365: "1 年/秒",
+}
+"""可選擇的播放速度: 每秒播放的天數 -> 顯示名稱"""
+
+MAX_FRAME_SEC = 0.25
+"""單一影格最多推進的實際秒數 (分頁於背景或主執行緒忙碌時，超出的時間保留至之後的影格逐步追上，以免一次批次處理過多天數)"""
+
+
+class PlaybackClock:
+    """ 播放時鐘: 播放位置以滑條的值 (天數) 表示
+    """
+
+    def __init__(self, per_sec_day_count: float = PER_SEC_DAY_COUNT) -> None:
+        self.per_sec_day_count = per_sec_day_count
+        """播放速度: 每秒播放的天數"""
+        self.is_playing = False
+        self.day_i = 0
+        """已處理的最後一天"""
+        self.position = 0.0
+        """播放位置 (含小數的天數)"""
+        self.last_tick_sec = 0.0
+        """上次推進播放位置的時間 (秒)"""
+        self.pending_day_count = 0.0
+        """已經過但尚未推進的天數 (超出單一影格上限的部分)"""
+
+    def play(self, day_i: int, now_sec: float) -> None:
+        """ 自第 day_i 天 (已處理) 之後開始播放 """
+        self.is_playing = True
+        self.seek(day_i)
+        self.last_tick_sec = now_sec
+
+    def pause(self) -> None:
+        """ 暫停播放 """
+        self.is_playing = False
+
+    def seek(self, day_i: int) -> None:
+        """ 跳轉至第 day_i 天 (視為已處理，並捨棄尚未推進的天數) """
+        self.day_i = day_i
+        self.position = float(day_i)
+        self.pending_day_count = 0.0
+
+    def set_speed(self, per_sec_day_count: float, now_sec: float) -> None:
+        """ 變更播放速度 (至今經過的時間仍以原本的速度推進) """
+        self._advance_position(now_sec)
+        self.per_sec_day_count = per_sec_day_count
+
+    def _advance_position(self, now_sec: float) -> None:
+        """ 將上次推進至 now_sec 經過的實際時間 (以當時的速度) 換算為待推進的天數，
+        並推進播放位置至多 MAX_FRAME_SEC 秒的天數 (暫停中則只更新時間)
+        """
+        elapsed_sec = max(now_sec - self.last_tick_sec, 0)
+        self.last_tick_sec = now_sec
+        if not self.is_playing:
+            return
+        self.pending_day_count += elapsed_sec * self.per_sec_day_count
+        advanced_day_count = min(self.pending_day_count, MAX_FRAME_SEC * self.per_sec_day_count)
+        self.pending_day_count -= advanced_day_count
+        self.position += advanced_day_count
+
+    def tick(self, now_sec: float, end_day_i: int) -> range:
+        """ 推進播放位置至 now_sec，並返回本影格應處理的天數 (播放至 end_day_i 時停止播放)
+        Returns:
+            range: 尚未處理且播放位置已經過的天數 (暫停中或未滿一天則為空)
+        """
+        if not self.is_playing:
+            return range(0)
+        self._advance_position(now_sec)
+        self.position = min(self.position, end_day_i)
+        start_day_i = self.day_i + 1
+        self.day_i = max(self.day_i, int(self.position))
+        if self.day_i >= end_day_i:
+            self.is_playing = False
+        return range(start_day_i, self.day_i + 1)
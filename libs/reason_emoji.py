@@ -1,3 +1,7 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
 EMOJI_TO_KW_LIST_DICT = {
     "👷": [
         "操作失誤", "看錯班表"
@@ -98,11 +102,83 @@ EMOJI_TO_KW_LIST_DICT = {
 }
 
 
+# 停電原因關鍵字 -> 所屬 emoji 的優先順序 (EMOJI_TO_KW_LIST_DICT 中的索引)
+# (由低優先往高優先建立，使重複的關鍵字歸屬於優先的 emoji)
+REASON_KW_TO_EMOJI_I_DICT = {
+    reason_kw_str: emoji_i
+    for emoji_i, reason_kw_str_list in reversed(
+        list(enumerate(EMOJI_TO_KW_LIST_DICT.values()))
+    )
+    for reason_kw_str in reason_kw_str_list
+}
+
+REASON_EMOJI_LIST = list(EMOJI_TO_KW_LIST_DICT)
+"""依優先順序排列的停電原因 emoji"""
+
+# 預先編譯的關鍵字比對: 以前瞻 (lookahead) 找出每個位置起始的關鍵字 (可重疊)，
+# 同一位置有多個關鍵字時，依 emoji 優先順序排列的選項會先比對到優先的關鍵字
+REASON_KW_PATTERN = re.compile(
+    "(?=({}))".format(
+        "|".join(
+            re.escape(reason_kw_str)
+            for reason_kw_str in sorted(
+                REASON_KW_TO_EMOJI_I_DICT,
+                key=REASON_KW_TO_EMOJI_I_DICT.get,
+            )
+        )
+    )
+)
+
+
+def get_reason_emoji_i(reason: str) -> int:
+    """ 取得停電原因對應的 emoji 優先順序 (無對應時返回 -1)
+    """
+    return min(
+        (
+            REASON_KW_TO_EMOJI_I_DICT[match.group(1)]
+            for match in REASON_KW_PATTERN.finditer(reason)
+        ),
+        default=-1,
+    )
+
+
+@lru_cache(maxsize=4096)
 def get_reason_emoji(reason: str) -> str:
-    for reason_emoji, reason_kw_str_list in EMOJI_TO_KW_LIST_DICT.items():
-        if any(
-            reason_kw_str in reason
-            for reason_kw_str in reason_kw_str_list
-        ):
-            return reason_emoji
-    return ""
+    """ 取得停電原因對應的 emoji: 依 EMOJI_TO_KW_LIST_DICT 的順序，先符合者優先
+    """
+    emoji_i = get_reason_emoji_i(reason)
+    return REASON_EMOJI_LIST[emoji_i] if emoji_i >= 0 else ""
+
+
+def get_reason_emoji_i_list(reason_list: list[str]) -> list[int]:
+    """ 一次比對多個停電原因，返回各停電原因對應的 emoji 優先順序 (無對應時為 -1)
+    """
+    # 將所有停電原因以換行串接後只比對一次，再依比對位置歸回各停電原因
+    unique_reason_list = list(dict.fromkeys(reason_list))
+    reason_offset_list = list[int]()
+    offset = 0
+    for reason in unique_reason_list:
+        reason_offset_list.append(offset)
+        offset += len(reason) + 1
+
+    unique_emoji_i_list = [-1] * len(unique_reason_list)
+    for match in REASON_KW_PATTERN.finditer("\n".join(unique_reason_list)):
+        reason_i = bisect_right(reason_offset_list, match.start()) - 1
+        emoji_i = REASON_KW_TO_EMOJI_I_DICT[match.group(1)]
+        if unique_emoji_i_list[reason_i] < 0 or emoji_i < unique_emoji_i_list[reason_i]:
+            unique_emoji_i_list[reason_i] = emoji_i
+
+    reason_to_emoji_i_dict = dict(zip(unique_reason_list, unique_emoji_i_list))
+    return [
+        reason_to_emoji_i_dict[reason]
+        for reason in reason_list
+    ]
+
+
+def get_reason_emoji_list(reason_list: list[str]) -> list[str]:
+    """ 一次比對多個停電原因，返回各停電原因對應的 emoji (無對應時為空字串)
+    """
+    return [
+        REASON_EMOJI_LIST[emoji_i] if emoji_i >= 0 else ""
+        for emoji_i in get_reason_emoji_i_list(reason_list)
+    ]
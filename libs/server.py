@@ -0,0 +1,398 @@
+""" 網頁的靜態檔案伺服器 (僅使用標準函式庫)
+
+相較於 `python -m http.server`:
+    - 預先壓縮: 啟動時將文字類檔案 (HTML、Python、JSON、GeoJSON 等) 壓縮為 gzip 與 brotli
+      (brotli 為選用相依套件)，存放於 `.precompressed/`，並依 Accept-Encoding 選擇回應的版本
+    - 快取驗證: 以檔案內容的雜湊值作為強 ETag，If-None-Match 符合時回應 304 (不傳送內容)
+    - 快取期限: 檔名含內容雜湊值者 (例如 `app.3f9a2c1b.js`) 可永久快取，其餘檔案每次使用前須重新驗證
+    - 位元組範圍請求: 支援單一範圍的 Range 與 If-Range (供音效檔使用)
+
+使用方法 (根目錄下執行):
+    python -m libs.server --port 8000
+    python -m libs.server --precompress-only  # 只產生預先壓縮的檔案 (部署前執行)
+"""
+import argparse
+import email.utils
+import functools
+import gzip
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT_DIR_PATH = Path(__file__).parent.parent
+PRECOMPRESSED_DIR_NAME = '.precompressed'
+
+COMPRESSIBLE_SUFFIX_SET = {
+    ".html", ".css", ".js", ".py", ".json", ".geojson", ".svg", ".txt", ".md",
+}
+"""預先壓縮的副檔名"""
+
+ENCODING_TO_SUFFIX_DICT = {"br": ".br", "gzip": ".gz"}
+"""壓縮格式 -> 預先壓縮檔的副檔名 (依偏好順序排列)"""
+
+MIN_COMPRESSION_RATIO = 0.9
+"""壓縮後的大小須小於原始大小的此比例，否則不保留壓縮版本"""
+
+HASHED_NAME_PATTERN = re.compile(r"\.[0-9a-f]{8,}\.[^.]+$")
+"""含內容雜湊值的檔名 (可永久快取)"""
+
+IMMUTABLE_CACHE_CONTROL_STR = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL_STR = "no-cache"
+
+EXTENSION_TO_CONTENT_TYPE_DICT = {
+    ".py": "text/x-python",
+    ".json": "application/json",
+    ".geojson": "application/geo+json",
+    ".mp3": "audio/mpeg",
+}
+
+
+def get_compress_function_dict() -> dict:
+    """ 取得可用的壓縮函數 (未安裝 brotli 時只提供 gzip)
+    Returns:
+        dict: 壓縮格式 -> 壓縮函數 (bytes -> bytes)
+    """
+    compress_function_dict = {}
+    try:
+        import brotli
+        compress_function_dict["br"] = functools.partial(brotli.compress, quality=11)
+    except ImportError:
+        pass
+    # mtime=0 使相同內容的壓縮結果相同
+    compress_function_dict["gzip"] = functools.partial(gzip.compress, compresslevel=9, mtime=0)
+    return compress_function_dict
+
+
+def is_compressible(path: Path) -> bool:
+    """ 是否為須預先壓縮的檔案 (略過隱藏資料夾與 __pycache__) """
+    return path.suffix in COMPRESSIBLE_SUFFIX_SET and not any(
+        part.startswith(".") or part == "__pycache__"
+        for part in path.parts[:-1]
+    )
+
+
+def get_precompressed_path(path: Path, root_path: Path, encoding: str) -> Path:
+    """ 取得檔案的預先壓縮檔路徑 """
+    return (
+        root_path / PRECOMPRESSED_DIR_NAME
+        / f"{path.relative_to(root_path).as_posix()}{ENCODING_TO_SUFFIX_DICT[encoding]}"
+    )
+
+
+def precompress_site(root_path: Path = ROOT_DIR_PATH) -> int:
+    """ 預先壓縮網站中的文字類檔案 (只重新壓縮內容有變動者)
+
+    預先壓縮檔的修改時間設為與原始檔相同，以此判斷是否已過期。
+    Returns:
+        int: 新產生的預先壓縮檔數量
+    """
+    compress_function_dict = get_compress_function_dict()
+    precompressed_count = 0
+    path_list = list[Path]()
+    for dir_path_str, dir_name_list, file_name_list in os.walk(root_path):
+        dir_name_list[:] = [
+            dir_name
+            for dir_name in dir_name_list
+            if not dir_name.startswith(".") and dir_name != "__pycache__"
+        ]
+        path_list.extend(
+            Path(dir_path_str) / file_name
+            for file_name in file_name_list
+            if Path(file_name).suffix in COMPRESSIBLE_SUFFIX_SET
+        )
+
+    for path in sorted(path_list):
+        stat = path.stat()
+        data = None
+        for encoding, compress_function in compress_function_dict.items():
+            precompressed_path = get_precompressed_path(path, root_path, encoding)
+            if (
+                precompressed_path.is_file()
+                and precompressed_path.stat().st_mtime_ns == stat.st_mtime_ns
+            ):
+                continue
+
+            data = path.read_bytes() if data is None else data
+            compressed_data = compress_function(data)
+            if len(compressed_data) >= len(data) * MIN_COMPRESSION_RATIO:
+                precompressed_path.unlink(missing_ok=True)
+                continue
+            precompressed_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = precompressed_path.with_name(f".{precompressed_path.name}.tmp")
+            tmp_path.write_bytes(compressed_data)
+            os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(tmp_path, precompressed_path)
+            precompressed_count += 1
+    return precompressed_count
+
+
+@dataclass
+class StaticFile:
+    """ 靜態檔案與其可用的預先壓縮版本
+    """
+    path: Path
+    size: int
+    mtime_ns: int
+    hash_str: str
+    """檔案內容的雜湊值 (ETag 的依據)"""
+    encoding_to_path_dict: dict[str, Path]
+    """壓縮格式 -> 未過期的預先壓縮檔路徑"""
+
+    def get_etag(self, encoding: str | None) -> str:
+        """ 取得強 ETag (各壓縮版本的內容不同，因此 ETag 也不同) """
+        return f'"{self.hash_str}-{encoding}"' if encoding else f'"{self.hash_str}"'
+
+
+STATIC_FILE_CACHE_DICT = dict[tuple[Path, int, int], StaticFile]()
+"""(路徑, 修改時間, 大小) -> StaticFile，避免每次請求都重新計算雜湊值"""
+
+
+def get_file_hash_str(path: Path) -> str:
+    """ 以串流方式計算檔案內容的雜湊值 (不將整個檔案讀入記憶體) """
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()[:20]
+
+
+class ByteRangeFile:
+    """ 只讀取檔案中位元組範圍 [start, end) 的檔案物件
+    (由 SimpleHTTPRequestHandler.copyfile 分段讀取並傳送，不需將整個檔案讀入記憶體)
+    """
+
+    def __init__(self, file, start: int, end: int) -> None:
+        self.file = file
+        self.file.seek(start)
+        self.remaining_size = end - start
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining_size:
+            size = self.remaining_size
+        data = self.file.read(size)
+        self.remaining_size -= len(data)
+        return data
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def get_static_file(path: Path, root_path: Path) -> StaticFile:
+    """ 取得 (或建立) 檔案的 StaticFile """
+    stat = path.stat()
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if (static_file := STATIC_FILE_CACHE_DICT.get(key)) is not None:
+        return static_file
+
+    encoding_to_path_dict = {}
+    if is_compressible(path.relative_to(root_path)):
+        for encoding in ENCODING_TO_SUFFIX_DICT:
+            precompressed_path = get_precompressed_path(path, root_path, encoding)
+            if (
+                precompressed_path.is_file()
+                and precompressed_path.stat().st_mtime_ns == stat.st_mtime_ns
+            ):
+                encoding_to_path_dict[encoding] = precompressed_path
+    static_file = StaticFile(
+        path=path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        hash_str=get_file_hash_str(path),
+        encoding_to_path_dict=encoding_to_path_dict,
+    )
+    STATIC_FILE_CACHE_DICT[key] = static_file
+    return static_file
+
+
+def select_encoding(accept_encoding_str: str, encoding_list: list[str]) -> str | None:
+    """ 依 Accept-Encoding 的權重 (q 值) 選擇壓縮格式，權重相同時依 ENCODING_TO_SUFFIX_DICT 的偏好順序
+    Returns:
+        str | None: 壓縮格式 (None 表示不壓縮)
+    """
+    encoding_to_q_dict = {}
+    for item_str in accept_encoding_str.split(","):
+        encoding, *param_str_list = item_str.split(";")
+        q = 1.0
+        for param_str in param_str_list:
+            key, _, value = param_str.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encoding_to_q_dict[encoding.strip().lower()] = q
+
+    selected_encoding, selected_q = None, 0.0
+    for encoding in ENCODING_TO_SUFFIX_DICT:
+        if encoding not in encoding_list:
+            continue
+        q = encoding_to_q_dict.get(encoding, encoding_to_q_dict.get("*", 0.0))
+        if q > selected_q:
+            selected_encoding, selected_q = encoding, q
+    return selected_encoding
+
+
+def parse_range(range_str: str, size: int) -> tuple[int, int] | None:
+    """ 解析單一位元組範圍的 Range 標頭
+    Returns:
+        tuple[int, int] | None: 範圍 [start, end)，None 表示無法解析或為多重範圍 (回應完整內容)
+    Raises:
+        ValueError: 範圍超出檔案大小 (應回應 416)
+    """
+    unit, _, range_set_str = range_str.partition("=")
+    if unit.strip() != "bytes" or "," in range_set_str:
+        return None
+    start_str, sep, end_str = range_set_str.strip().partition("-")
+    if (
+        not sep
+        or not (start_str or end_str)
+        or not all(_str.isdigit() for _str in (start_str, end_str) if _str)
+    ):
+        return None
+
+    if not start_str:
+        # 最後 N 個位元組
+        suffix_length = int(end_str)
+        if suffix_length == 0 or size == 0:
+            raise ValueError(range_str)
+        return max(size - suffix_length, 0), size
+    start = int(start_str)
+    end = min(int(end_str) + 1, size) if end_str else size
+    if start >= size or start >= end:
+        raise ValueError(range_str)
+    return start, end
+
+
+def is_etag_matched(etag_list_str: str, etag: str) -> bool:
+    """ If-None-Match / If-Range 的 ETag 串列是否包含指定的 ETag (忽略弱驗證前綴) """
+    return any(
+        _etag.strip() == "*" or _etag.strip().removeprefix("W/") == etag
+        for _etag in etag_list_str.split(",")
+    )
+
+
+class StaticRequestHandler(SimpleHTTPRequestHandler):
+    """ 支援預先壓縮、ETag 與位元組範圍請求的靜態檔案處理器
+    """
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        **EXTENSION_TO_CONTENT_TYPE_DICT,
+    }
+
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            # 目錄: 補上結尾的斜線或列出目錄內容 (同 http.server)，或回應其 index.html
+            if (
+                not self.path.split("?", 1)[0].endswith("/")
+                or not (path / "index.html").is_file()
+            ):
+                return super().send_head()
+            path = path / "index.html"
+        if not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        # 符號連結解析後位於網站根目錄之外者視為不存在
+        root_path = Path(self.directory).resolve()
+        resolved_path = path.resolve()
+        if not resolved_path.is_relative_to(root_path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        static_file = get_static_file(resolved_path, root_path)
+        range_str = self.headers.get("Range")
+
+        # 範圍請求只針對未壓縮的內容
+        encoding = None if range_str else select_encoding(
+            self.headers.get("Accept-Encoding", ""),
+            list(static_file.encoding_to_path_dict),
+        )
+        etag = static_file.get_etag(encoding)
+        header_dict = {
+            "ETag": etag,
+            "Cache-Control": (
+                IMMUTABLE_CACHE_CONTROL_STR
+                if HASHED_NAME_PATTERN.search(path.name) else
+                REVALIDATE_CACHE_CONTROL_STR
+            ),
+            "Last-Modified": email.utils.formatdate(static_file.mtime_ns / 1e9, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+        if static_file.encoding_to_path_dict:
+            header_dict["Vary"] = "Accept-Encoding"
+
+        if (if_none_match_str := self.headers.get("If-None-Match")) is not None:
+            if is_etag_matched(if_none_match_str, etag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                for key, value in header_dict.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                return None
+
+        file = (
+            static_file.encoding_to_path_dict[encoding]
+            if encoding else
+            resolved_path
+        ).open("rb")
+        size = os.fstat(file.fileno()).st_size
+        start, end = 0, size
+        status = HTTPStatus.OK
+        if range_str and is_etag_matched(self.headers.get("If-Range", etag), etag):
+            try:
+                byte_range = parse_range(range_str, size)
+            except ValueError:
+                file.close()
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            if byte_range is not None:
+                start, end = byte_range
+                header_dict["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        content_type = self.guess_type(str(path))
+        if content_type.startswith("text/") or content_type.endswith("json"):
+            content_type = f"{content_type}; charset=utf-8"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        for key, value in header_dict.items():
+            self.send_header(key, value)
+        self.end_headers()
+        return ByteRangeFile(file, start, end)
+
+
+def create_server(
+    root_path: Path = ROOT_DIR_PATH,
+    host: str = "",
+    port: int = 8000,
+) -> ThreadingHTTPServer:
+    """ 建立靜態檔案伺服器 (port 為 0 時由系統指派) """
+    return ThreadingHTTPServer(
+        (host, port),
+        functools.partial(StaticRequestHandler, directory=str(root_path)),
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="台灣停電事件模擬器的靜態檔案伺服器")
+    parser.add_argument("--root", type=Path, default=ROOT_DIR_PATH)
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--precompress-only", action="store_true")
+    args = parser.parse_args()
+
+    precompressed_count = precompress_site(args.root)
+    print(
+        f"已預先壓縮 {precompressed_count} 個檔案 "
+        f"({', '.join(get_compress_function_dict())})"
+    )
+    if not args.precompress_only:
+        with create_server(args.root, args.host, args.port) as server:
+            print(f"伺服器已啟動: http://localhost:{server.server_address[1]}")
+            server.serve_forever()
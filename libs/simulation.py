@@ -0,0 +1,269 @@
+""" 停電模擬的核心引擎 (不依賴瀏覽器)
+
+`BlackoutSimulation` 封裝了播放時的所有模擬邏輯 (疊加停電事件、衰減、滑條跳轉、事件日誌)，
+瀏覽器端只負責將其結果繪製至地圖與日誌，因此也能在 CPython 中執行、剖析與量測效能。
+
+另提供無頭 (headless) 的批次模擬，一次求得整條時間軸每個影格各縣市的停電比值:
+    get_city_ratio_list_list: 純 Python 的參考實作 (逐影格重播衰減模型)
+    get_city_ratio_matrix: 以 NumPy 向量化的 (影格數 × 縣市數) 矩陣，與參考實作逐位元相同
+
+影格 frame_i 的模擬時間為 frame_i / frame_per_day_count 天，第 day_i 天的事件於時間 day_i 發生。
+"""
+import datetime
+
+from libs.blackout import (DECAY_PER_DAY, BlackoutDecay, BlackoutKeyframeIndex,
+                           get_blackout_color_index, hit_day_events)
+from libs.event_log import EventLog, EventLogRow
+from libs.timeline import Timeline
+from libs.timeline_shard import ShardedTimeline
+
+
+class BlackoutSimulation:
+    """ 停電事件的即時模擬 (以模擬天數為衰減的時間單位: 第 day_i 天的事件於時間 day_i 發生，
+    播放速度只影響每秒推進的天數，因此跳轉後的狀態與連續播放至該天的狀態相同)
+
+    時間軸可為完整的 Timeline (以 BlackoutKeyframeIndex 跳轉)，
+    或依月份分片的 ShardedTimeline (以各分片的關鍵影格跳轉，衰減速率沿用分片建置時的設定)。
+    """
+
+    def __init__(
+        self,
+        timeline: Timeline | ShardedTimeline,
+        decay_per_day: float = DECAY_PER_DAY,
+        event_log: EventLog | None = None,
+    ) -> None:
+        self.timeline = timeline
+        self.blackout_keyframe_index = (
+            timeline
+            if isinstance(timeline, ShardedTimeline) else
+            BlackoutKeyframeIndex(timeline, decay_per_day=decay_per_day)
+        )
+        self.blackout_decay = BlackoutDecay(
+            self.blackout_keyframe_index.decay_per_day,
+            timeline.county_name_list,
+        )
+        self.event_log = event_log if event_log is not None else EventLog()
+
+    @property
+    def is_active(self) -> bool:
+        """ 是否仍有縣市尚未完全淡出 """
+        return bool(self.blackout_decay.hit_county_mask)
+
+    def simulate_day(self, day_i: int) -> list[float]:
+        """ 模擬第 day_i 天的停電事件: 疊加停電比值並追加事件日誌
+        Returns:
+            list[float]: 每個受影響縣市各一筆的停電比值 (供停電音效使用)
+        """
+        timeline, timeline_day_i = self.timeline.get_day_timeline(day_i)
+        if timeline is None:
+            return []
+
+        darkness_ratio_list = hit_day_events(self.blackout_decay, timeline, timeline_day_i, day_i)
+        date_str = f"{timeline.start_date + datetime.timedelta(days=timeline_day_i):%Y-%m-%d}"
+        for event_i in range(
+            timeline.day_offset_list[timeline_day_i],
+            timeline.day_offset_list[timeline_day_i + 1],
+        ):
+            self.event_log.append(
+                EventLogRow.from_event(
+                    date_str=date_str,
+                    locations=timeline.get_locations(event_i),
+                    households=timeline.household_list[event_i],
+                    reason_emoji=timeline.get_reason_emoji(event_i),
+                    title=timeline.get_title(event_i),
+                )
+            )
+        return darkness_ratio_list
+
+    def seek(self, day_i: int) -> None:
+        """ 跳轉至第 day_i 天開始前: 由關鍵影格求得前一天結束時的衰減狀態
+        """
+        self.blackout_decay.set_state(
+            self.blackout_keyframe_index.get_blackout_decay(day_i - 1)
+        )
+
+    def get_city_to_color_index_dict(self, t: float) -> dict[str, int]:
+        """ 取得各縣市於時間 t (含小數的日索引) 量化後的停電比值，並移除已完全淡出的縣市
+        """
+        return {
+            city_name: get_blackout_color_index(blackout_ratio)
+            for city_name, blackout_ratio in (
+                self.blackout_decay.get_city_to_ratio_dict(t, is_pruning=True).items()
+            )
+        }
+
+
+class BlackoutSimulationDiffer:
+    """ 將模擬狀態轉為逐影格的差異 (供 Web Worker 傳送至主執行緒，主執行緒只需將差異套用至 DOM)
+    """
+
+    def __init__(self, blackout_simulation: BlackoutSimulation) -> None:
+        self.blackout_simulation = blackout_simulation
+        self.sent_city_to_color_index_dict = dict[str, int]()
+        """已傳送的各縣市量化停電比值 (未記錄者為 0)"""
+        self.sent_event_log_version = blackout_simulation.event_log.version
+        self.pending_darkness_ratio_list = list[float]()
+        """上次傳送之後觸發的停電比值"""
+
+    def simulate_day(self, day_i: int) -> None:
+        """ 模擬第 day_i 天的停電事件 (同 BlackoutSimulation.simulate_day) """
+        self.pending_darkness_ratio_list.extend(
+            self.blackout_simulation.simulate_day(day_i)
+        )
+
+    def seek(self, day_i: int) -> None:
+        """ 跳轉至第 day_i 天開始前 (同 BlackoutSimulation.seek) """
+        self.blackout_simulation.seek(day_i)
+
+    def get_frame_diff_dict(self, t: float) -> dict:
+        """ 取得時間 t 相對於上次傳送的差異 (只包含可直接以 postMessage 傳送的型別)
+        Returns:
+            dict:
+                city_to_color_index_dict: 顏色有變化的縣市 -> 量化後的停電比值 (0 表示已淡出)
+                row_tuple_list: 上次傳送之後追加的日誌列 (EventLogRow 的欄位值，由舊至新)
+                darkness_ratio_list: 上次傳送之後觸發的停電比值 (供停電音效使用)
+                is_active: 是否仍有縣市尚未完全淡出
+        """
+        city_to_color_index_dict = self.blackout_simulation.get_city_to_color_index_dict(t)
+        changed_city_to_color_index_dict = {
+            city_name: city_to_color_index_dict.get(city_name, 0)
+            for city_name in set(city_to_color_index_dict) | set(self.sent_city_to_color_index_dict)
+            if city_to_color_index_dict.get(city_name, 0)
+            != self.sent_city_to_color_index_dict.get(city_name, 0)
+        }
+        self.sent_city_to_color_index_dict = {
+            city_name: color_i
+            for city_name, color_i in city_to_color_index_dict.items()
+            if color_i
+        }
+
+        event_log = self.blackout_simulation.event_log
+        new_row_count = min(event_log.version - self.sent_event_log_version, len(event_log))
+        self.sent_event_log_version = event_log.version
+        row_tuple_list = [
+            (row.date_str, row.location_households_str, row.reason_emoji, row.title, row.font_size_pt)
+            for row in list(event_log.row_deque)[len(event_log) - new_row_count:]
+        ]
+
+        darkness_ratio_list = self.pending_darkness_ratio_list
+        self.pending_darkness_ratio_list = []
+        return {
+            "city_to_color_index_dict": changed_city_to_color_index_dict,
+            "row_tuple_list": row_tuple_list,
+            "darkness_ratio_list": darkness_ratio_list,
+            "is_active": self.blackout_simulation.is_active,
+        }
+
+
+def get_frame_count(timeline: Timeline, frame_per_day_count: int = 1) -> int:
+    """ 取得涵蓋整條時間軸 (至最後一個事件完全淡出) 的影格數
+    """
+    return (timeline.day_count + 1) * frame_per_day_count
+
+
+def get_hit_column_tuple(
+    timeline: Timeline,
+    decay_per_day: float = DECAY_PER_DAY,
+) -> tuple[list[int], list[int], list[float]]:
+    """ 依序重播所有事件，求得每天結束時被疊加的縣市與其停電比值 (衰減的起點)
+    Returns:
+        tuple[list[int], list[int], list[float]]: (日索引串列, 縣市索引串列, 停電比值串列)
+    """
+    hit_day_list = list[int]()
+    hit_county_i_list = list[int]()
+    hit_intensity_list = list[float]()
+    blackout_decay = BlackoutDecay(decay_per_day, timeline.county_name_list)
+    for day_i in range(timeline.day_count):
+        hit_day_events(blackout_decay, timeline, day_i, day_i)
+        city_mask = 0
+        for event_i in range(
+            timeline.day_offset_list[day_i],
+            timeline.day_offset_list[day_i + 1],
+        ):
+            city_mask |= timeline.city_mask_list[event_i]
+        county_i = 0
+        while city_mask:
+            if city_mask & 1:
+                hit_day_list.append(day_i)
+                hit_county_i_list.append(county_i)
+                hit_intensity_list.append(blackout_decay.intensity_list[county_i])
+            city_mask >>= 1
+            county_i += 1
+    return hit_day_list, hit_county_i_list, hit_intensity_list
+
+
+def get_city_ratio_list_list(
+    timeline: Timeline,
+    frame_per_day_count: int = 1,
+    decay_per_day: float = DECAY_PER_DAY,
+) -> list[list[float]]:
+    """ 純 Python 的參考實作: 逐影格重播衰減模型，求得各影格各縣市的停電比值
+    Args:
+        frame_per_day_count (int): 每天的影格數
+    Returns:
+        list[list[float]]: 各影格的縣市停電比值串列 (縣市順序同 timeline.county_name_list)
+    """
+    blackout_decay = BlackoutDecay(decay_per_day, timeline.county_name_list)
+    city_ratio_list_list = list[list[float]]()
+    for frame_i in range(get_frame_count(timeline, frame_per_day_count)):
+        day_i, day_frame_i = divmod(frame_i, frame_per_day_count)
+        if day_frame_i == 0 and day_i < timeline.day_count:
+            hit_day_events(blackout_decay, timeline, day_i, day_i)
+        t = frame_i / frame_per_day_count
+        city_ratio_list_list.append([
+            blackout_decay.get_county_ratio(county_i, t)
+            for county_i in range(len(timeline.county_name_list))
+        ])
+    return city_ratio_list_list
+
+
+def get_city_ratio_matrix(
+    timeline: Timeline,
+    frame_per_day_count: int = 1,
+    decay_per_day: float = DECAY_PER_DAY,
+):
+    """ 以 NumPy 向量化求得各影格各縣市的停電比值 (與 get_city_ratio_list_list 逐位元相同)
+
+    只有「疊加」須依序重播 (每個事件一次)，其餘每個影格皆由封閉解
+    max(intensity - (t - hit_time) * decay_per_day, 0) 一次算出:
+    將疊加點放入 (影格數 × 縣市數) 矩陣後，沿影格方向前向填補最後一次疊加的影格。
+    Returns:
+        numpy.ndarray: 形狀為 (影格數, 縣市數) 的 float64 矩陣
+    """
+    import numpy as np
+
+    frame_count = get_frame_count(timeline, frame_per_day_count)
+    county_count = len(timeline.county_name_list)
+    hit_day_list, hit_county_i_list, hit_intensity_list = get_hit_column_tuple(
+        timeline,
+        decay_per_day=decay_per_day,
+    )
+    hit_frame_array = np.asarray(hit_day_list, dtype=np.int64) * frame_per_day_count
+    hit_county_i_array = np.asarray(hit_county_i_list, dtype=np.int64)
+
+    # 各影格各縣市最後一次疊加的影格 (-1: 尚未疊加)
+    last_hit_frame_matrix = np.full((frame_count, county_count), -1, dtype=np.int64)
+    last_hit_frame_matrix[hit_frame_array, hit_county_i_array] = hit_frame_array
+    np.maximum.accumulate(last_hit_frame_matrix, axis=0, out=last_hit_frame_matrix)
+
+    # 疊加後的停電比值，以最後一次疊加的影格查詢
+    intensity_matrix = np.zeros((frame_count, county_count), dtype=np.float64)
+    intensity_matrix[hit_frame_array, hit_county_i_array] = hit_intensity_list
+    is_hit_matrix = last_hit_frame_matrix >= 0
+    county_i_matrix = np.broadcast_to(np.arange(county_count), (frame_count, county_count))
+    last_intensity_matrix = intensity_matrix[
+        np.where(is_hit_matrix, last_hit_frame_matrix, 0),
+        county_i_matrix,
+    ]
+
+    # 封閉解: 時間與疊加日皆以「天」為單位，運算順序與 BlackoutDecay.get_ratio 相同
+    t_array = np.arange(frame_count, dtype=np.int64) / frame_per_day_count
+    elapsed_day_matrix = (
+        t_array[:, None]
+        - last_hit_frame_matrix // frame_per_day_count
+    )
+    return np.where(
+        is_hit_matrix,
+        np.maximum(last_intensity_matrix - elapsed_day_matrix * decay_per_day, 0.0),
+        0.0,
+    )
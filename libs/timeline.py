@@ -0,0 +1,265 @@
+""" 停電事件時間軸資料包
+
+將 `data/news_list.json` 預先編譯為依日期排序的欄式 (columnar) 資料包，
+供瀏覽器端直接載入，避免在頁面啟動時逐筆解析新聞與日期字串。
+
+建置方法 (根目錄下執行):
+    python -m libs.timeline
+"""
+import datetime
+import json
+from pathlib import Path
+
+from libs.reason_emoji import REASON_EMOJI_LIST, get_reason_emoji_i_list
+
+DATA_DIR_PATH = Path(__file__).parent.parent / 'data'
+TIMELINE_JSON_PATH = DATA_DIR_PATH / 'timeline.json'
+
+TIMELINE_BUNDLE_VERSION = 1
+"""資料包格式版本"""
+
+MAX_COUNTY_COUNT = 31
+"""縣市數上限 (縣市位元遮罩須為非負的 32 位元整數，瀏覽器端的位元運算才不會轉為大整數)"""
+
+
+def build_timeline_bundle_dict(
+    news_dict_list: list[dict],
+    county_name_list: list[str],
+) -> dict:
+    """ 將新聞字典串列編譯為欄式時間軸資料包
+    Args:
+        news_dict_list (list[dict]): 新聞字典串列 (`data/news_list.json` 的內容)
+        county_name_list (list[str]): 縣市名稱串列 (固定的縣市索引表)，其索引即為縣市位元遮罩的位元位置，
+            也是瀏覽器端以縣市索引存放停電狀態的順序
+    Returns:
+        dict: 時間軸資料包
+            day_list: 各事件距離起始日的天數
+            household_list: 各事件的停電戶數
+            city_mask_list: 各事件的停電縣市位元遮罩
+            reason_code_list: 各事件的停電原因代碼，即 REASON_EMOJI_LIST 的索引 (-1: 無對應原因)
+            titles: 所有事件標題串接而成的字串
+            title_offset_list: 各事件標題於 titles 中的起始位置 (長度為事件數+1)
+    """
+    if len(county_name_list) > MAX_COUNTY_COUNT:
+        raise ValueError(f"縣市數 {len(county_name_list)} 超過位元遮罩的上限 {MAX_COUNTY_COUNT}")
+    county_name_to_bit_dict = {
+        county_name: 1 << county_i
+        for county_i, county_name in enumerate(county_name_list)
+    }
+
+    # 僅保留有標註停電戶數的新聞，並依日期排序
+    annotated_news_dict_list = sorted(
+        (
+            news_dict
+            for news_dict in news_dict_list
+            if news_dict.get("households")
+        ),
+        key=lambda news_dict: news_dict["date"],
+    )
+    if not annotated_news_dict_list:
+        raise ValueError("沒有任何已標註停電戶數的新聞")
+
+    start_date = datetime.date.fromisoformat(
+        annotated_news_dict_list[0]["date"]
+    )
+    start_ordinal = start_date.toordinal()
+
+    # 一次比對所有事件的停電原因，使瀏覽器端不需再分類
+    reason_code_list = get_reason_emoji_i_list([
+        news_dict["reason"] or ""
+        for news_dict in annotated_news_dict_list
+    ])
+
+    day_list = list[int]()
+    household_list = list[int]()
+    city_mask_list = list[int]()
+    title_list = list[str]()
+    title_offset_list = [0]
+    for news_dict in annotated_news_dict_list:
+        day_list.append(
+            datetime.date.fromisoformat(news_dict["date"]).toordinal()
+            - start_ordinal
+        )
+        household_list.append(news_dict["households"])
+
+        city_mask = 0
+        for city_name in news_dict["locations"] or []:
+            city_mask |= county_name_to_bit_dict[city_name]
+        city_mask_list.append(city_mask)
+
+        title_list.append(news_dict["title"])
+        title_offset_list.append(
+            title_offset_list[-1] + len(news_dict["title"])
+        )
+
+    return {
+        "version": TIMELINE_BUNDLE_VERSION,
+        "start_date": f"{start_date:%Y-%m-%d}",
+        "day_count": day_list[-1] + 1,
+        "county_name_list": county_name_list,
+        "reason_emoji_list": REASON_EMOJI_LIST,
+        "day_list": day_list,
+        "household_list": household_list,
+        "city_mask_list": city_mask_list,
+        "reason_code_list": reason_code_list,
+        "titles": "".join(title_list),
+        "title_offset_list": title_offset_list,
+    }
+
+
+def build_timeline_json(
+    news_list_json_path: Path = DATA_DIR_PATH / 'news_list.json',
+    geojson_path: Path = DATA_DIR_PATH / 'twCounty2010merge.geojson',
+    timeline_json_path: Path = TIMELINE_JSON_PATH,
+) -> dict:
+    """ 讀取新聞列表 (含日誌中尚未壓實的新聞) 與縣市 GeoJSON，並將時間軸資料包寫入 JSON 檔
+    """
+    # 僅建置時使用 (本模組的 Timeline 亦於 Brython 中使用)
+    from libs.news_store import read_news_dict_list
+
+    geojson_dict = json.loads(geojson_path.read_text(encoding="utf-8"))
+    county_name_list = [
+        city_dict["properties"]["COUNTYNAME"]
+        for city_dict in geojson_dict["features"]
+    ]
+    timeline_bundle_dict = build_timeline_bundle_dict(
+        news_dict_list=read_news_dict_list(news_list_json_path),
+        county_name_list=county_name_list,
+    )
+    timeline_json_path.write_text(
+        json.dumps(
+            timeline_bundle_dict,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ),
+        encoding="utf-8",
+    )
+    return timeline_bundle_dict
+
+
+class Timeline:
+    """ 時間軸資料包的唯讀存取介面 (可於 Brython 中使用)
+
+    事件依日期排序，並以「日索引」(距離起始日的天數) 直接查詢當天的事件索引範圍。
+    事件可分批載入 (load_events)，使瀏覽器端在載入期間仍能回應操作。
+    """
+
+    def __init__(
+        self,
+        timeline_bundle_dict: dict,
+        is_loading_events: bool = True,
+    ) -> None:
+        """
+        Args:
+            is_loading_events (bool): 是否立即載入所有事件，否則須以 load_events 逐批載入
+        """
+        self.start_date = datetime.date.fromisoformat(
+            timeline_bundle_dict["start_date"]
+        )
+        self.day_count: int = timeline_bundle_dict["day_count"]
+        self.event_count: int = len(timeline_bundle_dict["day_list"])
+        self.county_name_list: list[str] = list(timeline_bundle_dict["county_name_list"])
+        self.reason_emoji_list: list[str] = list(timeline_bundle_dict["reason_emoji_list"])
+        self.titles: str = timeline_bundle_dict["titles"]
+        self.day_list = list[int]()
+        self.household_list = list[int]()
+        self.city_mask_list = list[int]()
+        self.reason_code_list = list[int]()
+        self.title_offset_list = [0]
+
+        # 日索引: 第 day_i 天的事件索引範圍為 [day_offset_list[day_i], day_offset_list[day_i+1])，
+        # 只有前 loaded_day_count 天 (事件已全部載入) 的日索引有效
+        self.day_offset_list = [0] * (self.day_count + 1)
+        self.loaded_day_count = 0
+        if is_loading_events:
+            self.load_events(timeline_bundle_dict, self.event_count)
+
+    def load_events(self, timeline_bundle_dict: dict, end_event_i: int) -> None:
+        """ 載入資料包中尚未載入、索引小於 end_event_i 的事件，並更新日索引
+        (事件依日期排序，因此已載入的最後一個事件之前的日期皆已完整)
+        """
+        start_event_i = len(self.day_list)
+        end_event_i = min(max(end_event_i, start_event_i), self.event_count)
+        self.day_list.extend(timeline_bundle_dict["day_list"][start_event_i:end_event_i])
+        self.household_list.extend(timeline_bundle_dict["household_list"][start_event_i:end_event_i])
+        self.city_mask_list.extend(timeline_bundle_dict["city_mask_list"][start_event_i:end_event_i])
+        self.reason_code_list.extend(timeline_bundle_dict["reason_code_list"][start_event_i:end_event_i])
+        self.title_offset_list.extend(
+            timeline_bundle_dict["title_offset_list"][start_event_i + 1:end_event_i + 1]
+        )
+
+        loaded_day_count = (
+            self.day_count
+            if end_event_i == self.event_count else
+            self.day_list[-1] if self.day_list else
+            0
+        )
+        event_i = self.day_offset_list[self.loaded_day_count]
+        for day_i in range(self.loaded_day_count + 1, loaded_day_count + 1):
+            while event_i < end_event_i and self.day_list[event_i] < day_i:
+                event_i += 1
+            self.day_offset_list[day_i] = event_i
+        self.loaded_day_count = loaded_day_count
+
+    @property
+    def end_date(self) -> datetime.date:
+        """ 最後一個事件的日期 """
+        return self.start_date + datetime.timedelta(days=self.day_count - 1)
+
+    def get_day_index(self, date: datetime.date) -> int:
+        """ 取得指定日期的日索引 """
+        return (date - self.start_date).days
+
+    def get_event_index_range(self, date: datetime.date) -> range:
+        """ 取得指定日期的事件索引範圍 (若超出時間軸範圍或尚未載入則為空) """
+        day_i = self.get_day_index(date)
+        if not 0 <= day_i < self.loaded_day_count:
+            return range(0)
+        return range(
+            self.day_offset_list[day_i],
+            self.day_offset_list[day_i + 1],
+        )
+
+    def get_day_timeline(self, day_i: int) -> tuple["Timeline | None", int]:
+        """ 取得第 day_i 天的事件所在的時間軸與該天的日索引 (超出範圍或尚未載入則為 None)
+        (與 ShardedTimeline 相同的介面)
+        """
+        if not 0 <= day_i < self.loaded_day_count:
+            return None, day_i
+        return self, day_i
+
+    def get_title(self, event_i: int) -> str:
+        """ 取得事件的新聞標題 """
+        return self.titles[
+            self.title_offset_list[event_i]:self.title_offset_list[event_i + 1]
+        ]
+
+    def get_locations(self, event_i: int) -> list[str]:
+        """ 將事件的縣市位元遮罩解碼為縣市名稱串列 """
+        city_mask = self.city_mask_list[event_i]
+        return [
+            county_name
+            for county_i, county_name in enumerate(self.county_name_list)
+            if city_mask >> county_i & 1
+        ]
+
+    def get_reason_emoji(self, event_i: int) -> str:
+        """ 取得事件的停電原因 emoji """
+        reason_code = self.reason_code_list[event_i]
+        return self.reason_emoji_list[reason_code] if reason_code >= 0 else ""
+
+
+if __name__ == '__main__':
+    from libs.timeline_shard import (TIMELINE_SHARD_DIR_PATH,
+                                     build_timeline_shard_json)
+
+    timeline_bundle_dict = build_timeline_json()
+    print(
+        f"時間軸資料包已寫入 {TIMELINE_JSON_PATH} "
+        f"({len(timeline_bundle_dict['day_list'])} 筆事件)"
+    )
+    manifest_dict = build_timeline_shard_json(timeline_bundle_dict)
+    print(
+        f"月份分片已寫入 {TIMELINE_SHARD_DIR_PATH} "
+        f"({len(manifest_dict['shard_name_list'])} 個分片)"
+    )
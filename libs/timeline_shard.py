@@ -0,0 +1,289 @@
+""" 依月份分片的停電事件時間軸
+
+完整的時間軸資料包 (`data/timeline.json`) 隨歷史長度成長，但瀏覽器端只需要播放位置附近的事件。
+建置時將時間軸依月份切分為分片 (`data/timeline/YYYY-MM.json`)，並寫入小型清單 (`data/timeline/manifest.json`):
+    - 清單: 時間軸的日期範圍、縣市與停電原因，以及各分片的日期範圍與彙總 (事件數、停電戶數)
+    - 分片: 格式同時間軸資料包 (日索引自分片首日起算)，另附分片首日的事件發生前的衰減狀態 (關鍵影格)，
+      因此跳轉至任意日期只需載入該日所在的分片
+單日停電戶數 (供柱狀圖使用) 另存為 `data/timeline/households.json`。
+
+瀏覽器端以 `ShardedTimeline` 載入清單，並以 LRU 快取只保留最近使用的分片。
+
+建置方法 (根目錄下執行，與時間軸資料包一同產生):
+    python -m libs.timeline
+"""
+import bisect
+import datetime
+import json
+from pathlib import Path
+
+from libs.aggregate import AggregateIndex
+from libs.blackout import DECAY_PER_DAY, BlackoutDecay, hit_day_events
+from libs.timeline import DATA_DIR_PATH, TIMELINE_BUNDLE_VERSION, Timeline
+
+TIMELINE_SHARD_DIR_PATH = DATA_DIR_PATH / 'timeline'
+TIMELINE_MANIFEST_JSON_NAME = 'manifest.json'
+TIMELINE_HOUSEHOLDS_JSON_NAME = 'households.json'
+
+TIMELINE_SHARD_CACHE_SIZE = 6
+"""瀏覽器端最多保留的分片數"""
+
+
+def get_shard_start_day_i_list(timeline: Timeline) -> list[int]:
+    """ 取得各月份分片首日的日索引 (第一個分片自時間軸首日起)
+    """
+    shard_start_day_i_list = [0]
+    month_date = timeline.start_date.replace(day=1)
+    while True:
+        month_date = (month_date + datetime.timedelta(days=32)).replace(day=1)
+        day_i = timeline.get_day_index(month_date)
+        if day_i >= timeline.day_count:
+            return shard_start_day_i_list
+        shard_start_day_i_list.append(day_i)
+
+
+def build_timeline_shard_dict_list(
+    timeline_bundle_dict: dict,
+    decay_per_day: float = DECAY_PER_DAY,
+) -> tuple[dict, list[dict]]:
+    """ 將時間軸資料包切分為月份分片
+    Args:
+        timeline_bundle_dict (dict): 時間軸資料包 (`build_timeline_bundle_dict` 的結果)
+        decay_per_day (float): 關鍵影格使用的每日衰減速率
+    Returns:
+        tuple[dict, list[dict]]: (清單, 各分片的時間軸資料包)
+            清單的各分片欄位 (shard_*_list) 依分片順序排列
+    """
+    timeline = Timeline(timeline_bundle_dict)
+    aggregate_index = AggregateIndex(timeline)
+    shard_start_day_i_list = get_shard_start_day_i_list(timeline)
+    blackout_decay = BlackoutDecay(decay_per_day, timeline.county_name_list)
+
+    shard_name_list = list[str]()
+    shard_household_count_list = list[int]()
+    shard_dict_list = list[dict]()
+    for shard_i, start_day_i in enumerate(shard_start_day_i_list):
+        end_day_i = (
+            shard_start_day_i_list[shard_i + 1]
+            if shard_i + 1 < len(shard_start_day_i_list) else
+            timeline.day_count
+        )
+        start_date = timeline.start_date + datetime.timedelta(days=start_day_i)
+        start_event_i = timeline.day_offset_list[start_day_i]
+        end_event_i = timeline.day_offset_list[end_day_i]
+        start_title_offset = timeline.title_offset_list[start_event_i]
+
+        shard_name_list.append(f"{start_date:%Y-%m}")
+        shard_household_count_list.append(aggregate_index.get_household_count(
+            start_date,
+            start_date + datetime.timedelta(days=end_day_i - start_day_i - 1),
+        ))
+
+        # 關鍵影格: 分片首日的事件發生前的衰減狀態
+        # (關鍵影格最早用於查詢前一天結束時的停電比值，因此移除於前一天已完全淡出的縣市)
+        blackout_decay.prune(start_day_i - 1)
+        shard_dict_list.append({
+            "version": TIMELINE_BUNDLE_VERSION,
+            "start_date": f"{start_date:%Y-%m-%d}",
+            "day_count": end_day_i - start_day_i,
+            "day_list": [
+                day_i - start_day_i
+                for day_i in timeline.day_list[start_event_i:end_event_i]
+            ],
+            "household_list": timeline.household_list[start_event_i:end_event_i],
+            "city_mask_list": timeline.city_mask_list[start_event_i:end_event_i],
+            "reason_code_list": timeline.reason_code_list[start_event_i:end_event_i],
+            "titles": timeline.titles[
+                start_title_offset:timeline.title_offset_list[end_event_i]
+            ],
+            "title_offset_list": [
+                title_offset - start_title_offset
+                for title_offset in timeline.title_offset_list[start_event_i:end_event_i + 1]
+            ],
+            "keyframe_dict": {
+                city_name: list(hit)
+                for city_name, hit in blackout_decay.get_city_to_hit_dict().items()
+            },
+        })
+
+        for day_i in range(start_day_i, end_day_i):
+            hit_day_events(blackout_decay, timeline, day_i, day_i)
+
+    manifest_dict = {
+        "version": TIMELINE_BUNDLE_VERSION,
+        "start_date": timeline_bundle_dict["start_date"],
+        "day_count": timeline.day_count,
+        "event_count": timeline.event_count,
+        "county_name_list": timeline.county_name_list,
+        "reason_emoji_list": timeline.reason_emoji_list,
+        "decay_per_day": decay_per_day,
+        "shard_name_list": shard_name_list,
+        "shard_start_day_i_list": shard_start_day_i_list,
+        "shard_event_count_list": [
+            timeline.day_offset_list[end_day_i] - timeline.day_offset_list[start_day_i]
+            for start_day_i, end_day_i in zip(
+                shard_start_day_i_list,
+                shard_start_day_i_list[1:] + [timeline.day_count],
+            )
+        ],
+        "shard_household_count_list": shard_household_count_list,
+    }
+    return manifest_dict, shard_dict_list
+
+
+def build_timeline_shard_json(
+    timeline_bundle_dict: dict,
+    timeline_shard_dir_path: Path = TIMELINE_SHARD_DIR_PATH,
+) -> dict:
+    """ 將清單、各月份分片與單日停電戶數寫入分片資料夾 (並刪除已不存在的月份的分片)
+    Returns:
+        dict: 清單
+    """
+    manifest_dict, shard_dict_list = build_timeline_shard_dict_list(timeline_bundle_dict)
+    timeline_shard_dir_path.mkdir(parents=True, exist_ok=True)
+
+    def write_json(json_name: str, obj) -> None:
+        (timeline_shard_dir_path / json_name).write_text(
+            json.dumps(obj, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+
+    shard_json_name_set = set[str]()
+    for shard_name, shard_dict in zip(manifest_dict["shard_name_list"], shard_dict_list):
+        shard_json_name = f"{shard_name}.json"
+        write_json(shard_json_name, shard_dict)
+        shard_json_name_set.add(shard_json_name)
+    write_json(TIMELINE_MANIFEST_JSON_NAME, manifest_dict)
+    write_json(
+        TIMELINE_HOUSEHOLDS_JSON_NAME,
+        AggregateIndex(Timeline(timeline_bundle_dict)).get_day_household_count_list(),
+    )
+
+    for json_path in timeline_shard_dir_path.glob("*.json"):
+        if json_path.name not in shard_json_name_set | {
+            TIMELINE_MANIFEST_JSON_NAME,
+            TIMELINE_HOUSEHOLDS_JSON_NAME,
+        }:
+            json_path.unlink()
+    return manifest_dict
+
+
+class ShardedTimeline:
+    """ 依月份分片載入的時間軸 (可於 Brython 中使用)
+
+    只保留最近使用的 max_shard_count 個分片 (LRU)，因此記憶體用量與歷史長度無關。
+    提供 BlackoutSimulation 所需的逐日查詢 (get_day_timeline) 與關鍵影格 (get_city_to_ratio_dict) 介面。
+    """
+
+    def __init__(
+        self,
+        manifest_dict: dict,
+        max_shard_count: int = TIMELINE_SHARD_CACHE_SIZE,
+    ) -> None:
+        self.start_date = datetime.date.fromisoformat(manifest_dict["start_date"])
+        self.day_count: int = manifest_dict["day_count"]
+        self.event_count: int = manifest_dict["event_count"]
+        self.county_name_list: list[str] = list(manifest_dict["county_name_list"])
+        self.reason_emoji_list: list[str] = list(manifest_dict["reason_emoji_list"])
+        self.decay_per_day: float = manifest_dict["decay_per_day"]
+        self.shard_name_list: list[str] = list(manifest_dict["shard_name_list"])
+        self.shard_start_day_i_list: list[int] = list(manifest_dict["shard_start_day_i_list"])
+        self.shard_event_count_list: list[int] = list(manifest_dict["shard_event_count_list"])
+        self.shard_household_count_list: list[int] = list(manifest_dict["shard_household_count_list"])
+        self.max_shard_count = max_shard_count
+        self.shard_i_to_timeline_dict = {}
+        """已載入的分片 (依使用順序排列，最久未使用者在前)"""
+        self.shard_i_to_keyframe_dict = {}
+        """已載入分片的關鍵影格 (以日索引為時間單位的 BlackoutDecay)"""
+
+    @property
+    def end_date(self) -> datetime.date:
+        """ 最後一個事件的日期 """
+        return self.start_date + datetime.timedelta(days=self.day_count - 1)
+
+    def get_day_index(self, date: datetime.date) -> int:
+        """ 取得指定日期的日索引 """
+        return (date - self.start_date).days
+
+    def get_shard_i(self, day_i: int) -> int:
+        """ 取得第 day_i 天所在的分片 (超出時間軸範圍者歸入首尾分片) """
+        return min(
+            max(bisect.bisect_right(self.shard_start_day_i_list, day_i) - 1, 0),
+            len(self.shard_start_day_i_list) - 1,
+        )
+
+    def get_shard_name(self, shard_i: int) -> str:
+        """ 取得分片的名稱 (即分片 JSON 檔的主檔名) """
+        return self.shard_name_list[shard_i]
+
+    def is_shard_loaded(self, shard_i: int) -> bool:
+        """ 分片是否已載入 """
+        return shard_i in self.shard_i_to_timeline_dict
+
+    def add_shard(self, shard_i: int, shard_dict: dict) -> list[int]:
+        """ 加入已下載的分片，並移除超出快取容量的最久未使用分片
+        Returns:
+            list[int]: 被移除的分片
+        """
+        self.shard_i_to_timeline_dict.pop(shard_i, None)
+        self.shard_i_to_timeline_dict[shard_i] = Timeline({
+            "county_name_list": self.county_name_list,
+            "reason_emoji_list": self.reason_emoji_list,
+            **shard_dict,
+        })
+        keyframe = BlackoutDecay(self.decay_per_day, self.county_name_list)
+        keyframe.set_city_to_hit_dict(shard_dict["keyframe_dict"])
+        self.shard_i_to_keyframe_dict[shard_i] = keyframe
+        evicted_shard_i_list = list[int]()
+        while len(self.shard_i_to_timeline_dict) > self.max_shard_count:
+            evicted_shard_i = next(iter(self.shard_i_to_timeline_dict))
+            del self.shard_i_to_timeline_dict[evicted_shard_i]
+            del self.shard_i_to_keyframe_dict[evicted_shard_i]
+            evicted_shard_i_list.append(evicted_shard_i)
+        return evicted_shard_i_list
+
+    def get_shard_timeline(self, shard_i: int) -> Timeline | None:
+        """ 取得已載入的分片 (並標記為最近使用)，尚未載入則為 None """
+        if (timeline := self.shard_i_to_timeline_dict.pop(shard_i, None)) is None:
+            return None
+        self.shard_i_to_timeline_dict[shard_i] = timeline
+        return timeline
+
+    def get_missing_shard_i_list(self, day_i: int, ahead_shard_count: int) -> list[int]:
+        """ 取得第 day_i 天所在的分片及其後 ahead_shard_count 個分片中尚未載入者
+        """
+        shard_i = self.get_shard_i(day_i)
+        return [
+            _shard_i
+            for _shard_i in range(
+                shard_i,
+                min(shard_i + ahead_shard_count + 1, len(self.shard_name_list)),
+            )
+            if not self.is_shard_loaded(_shard_i)
+        ]
+
+    def get_day_timeline(self, day_i: int) -> tuple[Timeline | None, int]:
+        """ 取得第 day_i 天的事件所在的分片，與該天於分片中的日索引 (超出範圍或尚未載入則為 None)
+        """
+        if not 0 <= day_i < self.day_count:
+            return None, day_i
+        shard_i = self.get_shard_i(day_i)
+        return self.get_shard_timeline(shard_i), day_i - self.shard_start_day_i_list[shard_i]
+
+    def get_blackout_decay(self, day_i: int) -> BlackoutDecay:
+        """ 取得第 day_i 天 (含當天事件) 結束時的衰減狀態 (同 BlackoutKeyframeIndex)
+        由第 day_i+1 天所在分片的關鍵影格重播，因此只需載入該分片 (尚未載入則為空)
+        """
+        shard_i = self.get_shard_i(day_i + 1)
+        if day_i < 0 or (timeline := self.get_shard_timeline(shard_i)) is None:
+            return BlackoutDecay(self.decay_per_day, self.county_name_list)
+
+        start_day_i = self.shard_start_day_i_list[shard_i]
+        blackout_decay = self.shard_i_to_keyframe_dict[shard_i].copy()
+        for shard_day_i in range(min(day_i + 1 - start_day_i, timeline.day_count)):
+            hit_day_events(blackout_decay, timeline, shard_day_i, start_day_i + shard_day_i)
+        return blackout_decay
+
+    def get_city_to_ratio_dict(self, day_i: int) -> dict[str, float]:
+        """ 取得第 day_i 天 (含當天事件) 結束時各縣市的停電比值 """
+        return self.get_blackout_decay(day_i).get_city_to_ratio_dict(day_i)
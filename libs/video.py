@@ -0,0 +1,694 @@
+""" 無頭 (headless) 動畫輸出工具
+
+不需瀏覽器或螢幕，直接以 CPython 播放模擬並將每個影格輸出為 GIF / APNG / MP4:
+
+1. 以掃描線演算法將各縣市多邊形 (與前端相同的投影) 光柵化為一張「標籤影像」
+   (每個像素記錄所屬縣市的編號，另有背景與邊界兩種標籤)，只需計算一次
+2. 每個影格只需建立 256 bytes 的轉換表 (標籤 -> 顏色)，再以 `bytes.translate`
+   一次轉換整張標籤影像，即可得到該影格的像素資料
+   (RGB 輸出時，標籤影像預先展開為每像素 3 bytes: 3*標籤+色頻，轉換表即可直接給出 RGB)
+3. 影格以多個行程平行編碼，並依序串流寫入輸出檔，記憶體中只保留少量影格
+4. 連續相同的影格 (沒有停電的期間) 合併為一個延長顯示時間的影格，
+   GIF/APNG 的影格只編碼顏色有變化的縣市所涵蓋的矩形範圍
+
+GIF 與 APNG 以標準函式庫自行編碼，MP4 則需安裝 ffmpeg。
+
+使用方法 (根目錄下執行):
+    python -m libs.video --output img/demo.gif
+    python -m libs.video --output demo.png --width 1200 --start-date 2024-01-01
+    python -m libs.video --output demo.mp4 --fps 60 --frame-per-day-count 2
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import re
+import struct
+import subprocess
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from libs.blackout import (BLACKOUT_RGB_STR_LUT, PER_SEC_DAY_COUNT,
+                           get_blackout_color_index)
+from libs.geometry import (GEOJSON_PATH, VIEW_BOX_STR,
+                           get_feature_ring_list_list, project_mercator,
+                           simplify_ring_list)
+from libs.simulation import get_city_ratio_list_list, get_city_ratio_matrix
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+
+BACKGROUND_RGB = (255, 255, 255)
+"""背景顏色"""
+
+BORDER_RGB = (0, 0, 0)
+"""縣市邊界顏色"""
+
+VIDEO_FORMAT_LIST = ["gif", "apng", "mp4"]
+
+Rgb = tuple[int, int, int]
+Bbox = tuple[int, int, int, int]
+
+PNG_FILTER_LABEL = 255
+"""RGB 展開標籤影像中代表 PNG 濾波類型位元組的值 (轉換為 0: 不濾波)"""
+
+
+def get_rgb_tuple(rgb_str: str) -> Rgb:
+    """ 將 `rgb(r, g, b)` 字串轉為 (r, g, b) """
+    return tuple(int(value_str) for value_str in re.findall(r"\d+", rgb_str))
+
+
+BLACKOUT_RGB_LUT = [
+    get_rgb_tuple(rgb_str)
+    for rgb_str in BLACKOUT_RGB_STR_LUT
+]
+"""顏色查找表: 量化後的停電比值 -> (r, g, b)"""
+
+
+def get_video_format(output_path: Path) -> str:
+    """ 由副檔名判斷輸出格式 (.png 視為 APNG) """
+    suffix = output_path.suffix.lower().lstrip(".")
+    video_format = "apng" if suffix == "png" else suffix
+    if video_format not in VIDEO_FORMAT_LIST:
+        raise ValueError(f"不支援的輸出格式: {output_path.suffix}")
+    return video_format
+
+
+def get_label_bytes(
+    width: int,
+    geojson_path: Path = GEOJSON_PATH,
+) -> tuple[bytearray, int]:
+    """ 以掃描線演算法 (奇偶規則) 將各縣市光柵化為標籤影像
+    Args:
+        width (int): 影像寬度 (像素)，高度依 viewBox 的比例決定 (皆取偶數)
+    Returns:
+        tuple[bytearray, int]: (標籤影像, 影像高度)
+            標籤 0 為背景、1~縣市數 為縣市 (順序同 GeoJSON)、縣市數+1 為邊界
+    """
+    view_box_x, view_box_y, view_box_width, view_box_height = (
+        float(value_str) for value_str in VIEW_BOX_STR.split()
+    )
+    width -= width % 2
+    px_per_unit = width / view_box_width
+    height = round(view_box_height * px_per_unit)
+    height -= height % 2
+
+    # 投影並以半個像素的容許誤差簡化 (共用邊界只簡化一次，相鄰縣市之間不會出現縫隙)
+    geojson_dict = json.loads(geojson_path.read_text(encoding="utf-8"))
+    ring_list = list[list[tuple[float, float]]]()
+    ring_label_list = list[int]()
+    for feature_i, feature_ring_list in enumerate(
+        get_feature_ring_list_list(geojson_dict)
+    ):
+        for ring in feature_ring_list:
+            ring_list.append([
+                (
+                    (x - view_box_x) * px_per_unit,
+                    (y - view_box_y) * px_per_unit,
+                )
+                for x, y in (
+                    project_mercator(lon, lat)
+                    for lon, lat in ring
+                )
+            ])
+            ring_label_list.append(feature_i + 1)
+    border_label = max(ring_label_list) + 1
+    if 3 * border_label + 2 >= PNG_FILTER_LABEL:
+        raise ValueError(f"行政區數量過多 ({border_label - 1})，無法以單一 byte 表示 RGB 展開標籤")
+    simplified_ring_list = simplify_ring_list(ring_list, tolerance=0.5)
+
+    # 邊表: 列 -> 標籤 -> 邊與像素中心線 (y+0.5) 的交點 x 座標
+    row_to_label_to_x_list_dict = dict[int, dict[int, list[float]]]()
+    for ring, label in zip(simplified_ring_list, ring_label_list):
+        for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]):
+            if y0 == y1:
+                continue
+            start_row = max(math.ceil(min(y0, y1) - 0.5), 0)
+            end_row = min(math.ceil(max(y0, y1) - 0.5), height)
+            for row in range(start_row, end_row):
+                row_to_label_to_x_list_dict.setdefault(row, {}).setdefault(
+                    label, []
+                ).append(x0 + (row + 0.5 - y0) * (x1 - x0) / (y1 - y0))
+
+    label_bytes = bytearray(width * height)
+    for row, label_to_x_list_dict in row_to_label_to_x_list_dict.items():
+        row_offset = row * width
+        for label, x_list in label_to_x_list_dict.items():
+            x_list.sort()
+            for x_a, x_b in zip(x_list[::2], x_list[1::2]):
+                start_x = min(max(math.ceil(x_a - 0.5), 0), width)
+                end_x = min(max(math.ceil(x_b - 0.5), 0), width)
+                label_bytes[row_offset + start_x:row_offset + end_x] = (
+                    bytes((label,)) * (end_x - start_x)
+                )
+
+    # 與右方或下方像素標籤不同 (且不皆為背景) 者為邊界
+    border_i_list = list[int]()
+    for row in range(height):
+        row_offset = row * width
+        for x in range(width):
+            pixel_i = row_offset + x
+            label = label_bytes[pixel_i]
+            right_label = label_bytes[pixel_i + 1] if x + 1 < width else 0
+            bottom_label = label_bytes[pixel_i + width] if row + 1 < height else 0
+            if (label != right_label or label != bottom_label) and (
+                label or right_label or bottom_label
+            ):
+                border_i_list.append(pixel_i)
+    for pixel_i in border_i_list:
+        label_bytes[pixel_i] = border_label
+    return label_bytes, height
+
+
+def get_label_bbox_list(label_bytes: bytes, width: int) -> list[Bbox | None]:
+    """ 取得各標籤涵蓋的矩形範圍 (x0, y0, x1, y1)，不含 x1、y1 (不存在的標籤為 None)
+    """
+    label_bbox_list: list[Bbox | None] = [None] * 256
+    for row_i in range(len(label_bytes) // width):
+        row_bytes = label_bytes[row_i * width:(row_i + 1) * width]
+        for label in set(row_bytes):
+            label_byte = bytes((label,))
+            start_x = row_bytes.find(label_byte)
+            end_x = row_bytes.rfind(label_byte) + 1
+            if (bbox := label_bbox_list[label]) is None:
+                label_bbox_list[label] = (start_x, row_i, end_x, row_i + 1)
+            else:
+                label_bbox_list[label] = (
+                    min(bbox[0], start_x), bbox[1],
+                    max(bbox[2], end_x), row_i + 1,
+                )
+    return label_bbox_list
+
+
+def get_rgb_label_bytes(label_bytes: bytes) -> bytes:
+    """ 將標籤影像展開為每像素 3 bytes (3*標籤+色頻)，使單一轉換表即可產生 RGB 影像
+    """
+    rgb_label_bytes = bytearray(len(label_bytes) * 3)
+    for channel_i in range(3):
+        rgb_label_bytes[channel_i::3] = label_bytes.translate(bytes(
+            min(3 * label + channel_i, 254)
+            for label in range(256)
+        ))
+    return bytes(rgb_label_bytes)
+
+
+def get_cropped_bytes(
+    image_bytes: bytes,
+    row_byte_count: int,
+    bbox_byte: Bbox,
+    row_prefix_bytes: bytes = b"",
+) -> bytes:
+    """ 裁切影像的矩形範圍 (以 byte 為單位)，並可於每列開頭插入固定的 bytes
+    """
+    start_byte_i, start_row_i, end_byte_i, end_row_i = bbox_byte
+    return b"".join(
+        row_prefix_bytes
+        + image_bytes[
+            row_i * row_byte_count + start_byte_i:
+            row_i * row_byte_count + end_byte_i
+        ]
+        for row_i in range(start_row_i, end_row_i)
+    )
+
+
+def get_label_rgb_list(color_index_bytes: bytes) -> list[Rgb]:
+    """ 取得影格中各標籤的顏色 (背景、各縣市、邊界) """
+    return [
+        BACKGROUND_RGB,
+        *(BLACKOUT_RGB_LUT[color_i] for color_i in color_index_bytes),
+        BORDER_RGB,
+    ]
+
+
+def get_rgb_translate_table(color_index_bytes: bytes) -> bytes:
+    """ 取得 RGB 展開標籤影像的轉換表 (未使用的值 (含 PNG_FILTER_LABEL) 對應至 0) """
+    translate_table = bytearray(256)
+    for label, rgb in enumerate(get_label_rgb_list(color_index_bytes)):
+        translate_table[3 * label:3 * label + 3] = bytes(rgb)
+    return bytes(translate_table)
+
+
+# GIF 調色盤: 0 為背景，1~255 為停電比值的顏色 (停電比值 0 與 1/255 共用索引 1)，
+# 邊界為黑色，與停電比值 1 共用索引 255
+GIF_PALETTE_RGB_LIST = [BACKGROUND_RGB] + [
+    BLACKOUT_RGB_LUT[0 if palette_i == 1 else palette_i]
+    for palette_i in range(1, 256)
+]
+
+
+def get_gif_palette_i(color_i: int) -> int:
+    """ 量化後的停電比值 -> GIF 調色盤索引 """
+    return max(color_i, 1)
+
+
+def get_gif_translate_table(color_index_bytes: bytes) -> bytes:
+    """ 取得標籤影像轉為 GIF 調色盤索引的轉換表 """
+    translate_table = bytearray(256)
+    for label, color_i in enumerate(color_index_bytes, start=1):
+        translate_table[label] = get_gif_palette_i(color_i)
+    translate_table[len(color_index_bytes) + 1] = 255
+    return bytes(translate_table)
+
+
+def get_gif_lzw_bytes(index_bytes: bytes, min_code_size: int = 8) -> bytes:
+    """ 以 GIF 的可變長度 LZW 壓縮像素索引，並切分為子區塊
+    """
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    code_size = min_code_size + 1
+    next_code = end_code + 1
+    key_to_code_dict = dict[int, int]()
+
+    lzw_bytes = bytearray()
+    bit_buffer = 0
+    bit_count = 0
+
+    def emit(code: int) -> None:
+        nonlocal bit_buffer, bit_count
+        bit_buffer |= code << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            lzw_bytes.append(bit_buffer & 0xFF)
+            bit_buffer >>= 8
+            bit_count -= 8
+
+    emit(clear_code)
+    prefix_code = index_bytes[0]
+    for index in index_bytes[1:]:
+        key = prefix_code << 8 | index
+        if (code := key_to_code_dict.get(key)) is not None:
+            prefix_code = code
+            continue
+        emit(prefix_code)
+        if next_code == 4096:
+            emit(clear_code)
+            key_to_code_dict.clear()
+            code_size = min_code_size + 1
+            next_code = end_code + 1
+        else:
+            if next_code >= 1 << code_size:
+                code_size += 1
+            key_to_code_dict[key] = next_code
+            next_code += 1
+        prefix_code = index
+    emit(prefix_code)
+    emit(end_code)
+    if bit_count:
+        lzw_bytes.append(bit_buffer & 0xFF)
+
+    return bytes((min_code_size,)) + b"".join(
+        bytes((len(lzw_bytes[i:i + 255]),)) + lzw_bytes[i:i + 255]
+        for i in range(0, len(lzw_bytes), 255)
+    ) + b"\x00"
+
+
+_WORKER_STATE_DICT = {}
+"""編碼行程的狀態 (標籤影像與輸出格式)，由 _init_worker 設定"""
+
+
+def _init_worker(video_format: str, label_bytes: bytes, width: int) -> None:
+    _WORKER_STATE_DICT["video_format"] = video_format
+    _WORKER_STATE_DICT["width"] = width
+    _WORKER_STATE_DICT["height"] = len(label_bytes) // width
+    _WORKER_STATE_DICT["label_bbox_list"] = get_label_bbox_list(label_bytes, width)
+    _WORKER_STATE_DICT["label_bytes"] = (
+        label_bytes
+        if video_format == "gif" else
+        get_rgb_label_bytes(label_bytes)
+    )
+
+
+def get_changed_bbox(
+    previous_color_index_bytes: bytes | None,
+    color_index_bytes: bytes,
+) -> Bbox:
+    """ 取得與前一個影格相比，顏色有變化的縣市所涵蓋的矩形範圍 (無前一個影格時為整張影像)
+    """
+    width = _WORKER_STATE_DICT["width"]
+    height = _WORKER_STATE_DICT["height"]
+    if previous_color_index_bytes is None:
+        return (0, 0, width, height)
+    bbox_list = [
+        bbox
+        for label, (previous_color_i, color_i) in enumerate(
+            zip(previous_color_index_bytes, color_index_bytes),
+            start=1,
+        )
+        if previous_color_i != color_i
+        and (bbox := _WORKER_STATE_DICT["label_bbox_list"][label]) is not None
+    ]
+    if not bbox_list:
+        return (0, 0, 1, 1)
+    return (
+        min(bbox[0] for bbox in bbox_list),
+        min(bbox[1] for bbox in bbox_list),
+        max(bbox[2] for bbox in bbox_list),
+        max(bbox[3] for bbox in bbox_list),
+    )
+
+
+def encode_frame(
+    previous_color_index_bytes: bytes | None,
+    color_index_bytes: bytes,
+) -> tuple[Bbox, bytes]:
+    """ 編碼單一影格 (於編碼行程中執行)
+    Args:
+        previous_color_index_bytes (bytes | None): 前一個影格各縣市量化後的停電比值
+            (GIF/APNG 只編碼有變化的範圍; None 表示編碼整張影像)
+        color_index_bytes (bytes): 此影格各縣市量化後的停電比值
+    Returns:
+        tuple[Bbox, bytes]: (編碼的矩形範圍, 影格資料)
+            GIF 為 LZW 壓縮的索引資料、APNG 為 zlib 壓縮的掃描線、MP4 為整張影像的原始 RGB 像素
+    """
+    video_format = _WORKER_STATE_DICT["video_format"]
+    label_bytes = _WORKER_STATE_DICT["label_bytes"]
+    width = _WORKER_STATE_DICT["width"]
+    if video_format == "mp4":
+        return (
+            (0, 0, width, _WORKER_STATE_DICT["height"]),
+            label_bytes.translate(get_rgb_translate_table(color_index_bytes)),
+        )
+
+    bbox = get_changed_bbox(previous_color_index_bytes, color_index_bytes)
+    start_x, start_y, end_x, end_y = bbox
+    if video_format == "gif":
+        return bbox, get_gif_lzw_bytes(
+            get_cropped_bytes(label_bytes, width, bbox).translate(
+                get_gif_translate_table(color_index_bytes)
+            )
+        )
+    return bbox, zlib.compress(
+        get_cropped_bytes(
+            label_bytes,
+            width * 3,
+            (start_x * 3, start_y, end_x * 3, end_y),
+            row_prefix_bytes=bytes((PNG_FILTER_LABEL,)),
+        ).translate(get_rgb_translate_table(color_index_bytes)),
+        6,
+    )
+
+
+def get_png_chunk_bytes(chunk_type: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+APNG_MAX_DELAY_MS = 0xFFFF
+"""APNG 單一影格的最長顯示時間 (毫秒，fcTL 的 delay_num 為 u16)，超過者拆為多個相同的影格"""
+
+APNG_ACTL_OFFSET = 8 + 12 + 13
+"""acTL 區塊於檔案中的位置 (PNG 簽章與 IHDR 區塊之後)"""
+
+
+class ApngWriter:
+    """ 依序寫入 APNG 影格 (RGB，除第一個影格外只覆寫有變化的矩形範圍，
+    顯示時間以 1/1000 秒為單位累計取整，實際影格數於結束時回填至 acTL)
+    """
+
+    def __init__(self, output_path: Path, width: int, height: int, fps: float, frame_count: int) -> None:
+        self.output_file = output_path.open("wb")
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+        self.written_frame_count = 0
+        self.elapsed_frame_count = 0
+        self.sequence_i = 0
+        self.output_file.write(b"\x89PNG\r\n\x1a\n")
+        self.output_file.write(get_png_chunk_bytes(
+            b"IHDR",
+            struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0),
+        ))
+        self.output_file.write(get_png_chunk_bytes(
+            b"acTL",
+            struct.pack(">II", frame_count, 0),
+        ))
+
+    def write(self, bbox: Bbox, frame_bytes: bytes, repeat_count: int) -> None:
+        start_ms = round(self.elapsed_frame_count * 1000 / self.fps)
+        self.elapsed_frame_count += repeat_count
+        delay_ms = round(self.elapsed_frame_count * 1000 / self.fps) - start_ms
+        # 顯示時間超過 u16 上限時，重複寫入相同的影格 (不清除畫面，覆寫相同內容不影響畫面)
+        split_count = max(math.ceil(delay_ms / APNG_MAX_DELAY_MS), 1)
+        for split_i in range(split_count):
+            self._write_frame(
+                bbox,
+                frame_bytes,
+                min(delay_ms - split_i * APNG_MAX_DELAY_MS, APNG_MAX_DELAY_MS),
+            )
+
+    def _write_frame(self, bbox: Bbox, frame_bytes: bytes, delay_ms: int) -> None:
+        start_x, start_y, end_x, end_y = bbox
+        self.output_file.write(get_png_chunk_bytes(
+            b"fcTL",
+            struct.pack(
+                ">IIIIIHHBB",
+                self.sequence_i, end_x - start_x, end_y - start_y, start_x, start_y,
+                delay_ms, 1000, 0, 0,
+            ),
+        ))
+        self.sequence_i += 1
+        self.written_frame_count += 1
+        if self.sequence_i == 1:
+            self.output_file.write(get_png_chunk_bytes(b"IDAT", frame_bytes))
+        else:
+            self.output_file.write(get_png_chunk_bytes(
+                b"fdAT",
+                struct.pack(">I", self.sequence_i) + frame_bytes,
+            ))
+            self.sequence_i += 1
+
+    def close(self) -> None:
+        self.output_file.write(get_png_chunk_bytes(b"IEND", b""))
+        if self.written_frame_count != self.frame_count:
+            self.output_file.seek(APNG_ACTL_OFFSET)
+            self.output_file.write(get_png_chunk_bytes(
+                b"acTL",
+                struct.pack(">II", self.written_frame_count, 0),
+            ))
+        self.output_file.close()
+
+
+GIF_MAX_DELAY_CS = 0xFFFF
+"""GIF 單一影格的最長顯示時間 (1/100 秒，圖形控制延伸的延遲時間為 u16)，超過者拆為多個相同的影格"""
+
+
+class GifWriter:
+    """ 依序寫入 GIF 影格 (全域調色盤，顯示時間以 1/100 秒為單位累計取整，
+    影格保留於畫面上 (不清除)，下一個影格只覆寫有變化的矩形範圍)
+    """
+
+    def __init__(self, output_path: Path, width: int, height: int, fps: float, frame_count: int) -> None:
+        self.output_file = output_path.open("wb")
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.elapsed_frame_count = 0
+        self.output_file.write(
+            b"GIF89a"
+            + struct.pack("<HHBBB", width, height, 0xF7, 0, 0)
+            + b"".join(bytes(rgb) for rgb in GIF_PALETTE_RGB_LIST)
+            # 無限循環播放
+            + b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"
+        )
+
+    def write(self, bbox: Bbox, frame_bytes: bytes, repeat_count: int) -> None:
+        start_cs = round(self.elapsed_frame_count * 100 / self.fps)
+        self.elapsed_frame_count += repeat_count
+        delay_cs = round(self.elapsed_frame_count * 100 / self.fps) - start_cs
+        # 顯示時間超過 u16 上限時，重複寫入相同的影格 (不清除畫面，覆寫相同內容不影響畫面)
+        split_count = max(math.ceil(delay_cs / GIF_MAX_DELAY_CS), 1)
+        for split_i in range(split_count):
+            self._write_frame(
+                bbox,
+                frame_bytes,
+                min(delay_cs - split_i * GIF_MAX_DELAY_CS, GIF_MAX_DELAY_CS),
+            )
+
+    def _write_frame(self, bbox: Bbox, frame_bytes: bytes, delay_cs: int) -> None:
+        start_x, start_y, end_x, end_y = bbox
+        self.output_file.write(
+            # 圖形控制延伸: 處置方式 1 (不清除)
+            b"\x21\xF9\x04\x04" + struct.pack("<H", delay_cs) + b"\x00\x00"
+            + b"\x2C" + struct.pack(
+                "<HHHHB",
+                start_x, start_y, end_x - start_x, end_y - start_y, 0,
+            )
+            + frame_bytes
+        )
+
+    def close(self) -> None:
+        self.output_file.write(b"\x3B")
+        self.output_file.close()
+
+
+class FfmpegWriter:
+    """ 將原始 RGB 影格串流至 ffmpeg 編碼為 MP4 """
+
+    def __init__(self, output_path: Path, width: int, height: int, fps: float, frame_count: int) -> None:
+        try:
+            self.process = subprocess.Popen(
+                [
+                    "ffmpeg", "-y", "-loglevel", "error",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24",
+                    "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-",
+                    "-c:v", "libx264", "-pix_fmt", "yuv420p", str(output_path),
+                ],
+                stdin=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("輸出 MP4 需要安裝 ffmpeg") from e
+
+    def write(self, bbox: Bbox, frame_bytes: bytes, repeat_count: int) -> None:
+        for _ in range(repeat_count):
+            self.process.stdin.write(frame_bytes)
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError(f"ffmpeg 結束代碼: {self.process.returncode}")
+
+
+VIDEO_FORMAT_TO_WRITER_CLASS_DICT = {
+    "gif": GifWriter,
+    "apng": ApngWriter,
+    "mp4": FfmpegWriter,
+}
+
+
+def get_color_index_bytes_list(
+    timeline: Timeline,
+    frame_per_day_count: int = 1,
+) -> list[bytes]:
+    """ 取得各影格各縣市量化後的停電比值 (有 NumPy 時以向量化計算)
+    """
+    try:
+        city_ratio_list_list = get_city_ratio_matrix(
+            timeline,
+            frame_per_day_count,
+        ).tolist()
+    except ImportError:
+        city_ratio_list_list = get_city_ratio_list_list(
+            timeline,
+            frame_per_day_count,
+        )
+    return [
+        bytes(
+            get_blackout_color_index(city_ratio)
+            for city_ratio in city_ratio_list
+        )
+        for city_ratio_list in city_ratio_list_list
+    ]
+
+
+def get_run_length_list(color_index_bytes_list: list[bytes]) -> list[tuple[bytes, int]]:
+    """ 將連續相同的影格合併為 (影格, 重複次數) """
+    run_length_list = list[tuple[bytes, int]]()
+    for color_index_bytes in color_index_bytes_list:
+        if run_length_list and run_length_list[-1][0] == color_index_bytes:
+            run_length_list[-1] = (color_index_bytes, run_length_list[-1][1] + 1)
+        else:
+            run_length_list.append((color_index_bytes, 1))
+    return run_length_list
+
+
+def render_video(
+    output_path: Path,
+    width: int = 600,
+    fps: float = PER_SEC_DAY_COUNT,
+    frame_per_day_count: int = 1,
+    start_date: datetime.date | None = None,
+    end_date: datetime.date | None = None,
+    max_worker_count: int | None = None,
+    timeline_json_path: Path = TIMELINE_JSON_PATH,
+    geojson_path: Path = GEOJSON_PATH,
+) -> int:
+    """ 播放模擬並輸出動畫
+    Args:
+        output_path (Path): 輸出檔路徑，由副檔名決定格式 (.gif, .png/.apng, .mp4)
+        width (int): 影像寬度 (像素)
+        fps (float): 每秒影格數 (預設與網頁播放速度相同)
+        frame_per_day_count (int): 每天的影格數
+        start_date, end_date (datetime.date | None): 輸出的日期範圍 (預設為整條時間軸)
+        max_worker_count (int | None): 編碼行程數 (預設為 CPU 核心數)
+    Returns:
+        int: 輸出的影格數 (不計合併)
+    """
+    video_format = get_video_format(output_path)
+    timeline = Timeline(
+        json.loads(timeline_json_path.read_text(encoding="utf-8"))
+    )
+    start_day_i = timeline.get_day_index(start_date) if start_date else 0
+    end_day_i = (
+        timeline.get_day_index(end_date) + 1 if end_date else timeline.day_count + 1
+    )
+    color_index_bytes_list = get_color_index_bytes_list(
+        timeline,
+        frame_per_day_count,
+    )[max(start_day_i, 0) * frame_per_day_count:end_day_i * frame_per_day_count]
+    if not color_index_bytes_list:
+        raise ValueError("日期範圍內沒有任何影格")
+    run_length_list = get_run_length_list(color_index_bytes_list)
+
+    label_bytes, height = get_label_bytes(width, geojson_path)
+    width -= width % 2
+    writer = VIDEO_FORMAT_TO_WRITER_CLASS_DICT[video_format](
+        output_path, width, height, fps, len(run_length_list),
+    )
+    max_worker_count = max_worker_count or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_worker_count,
+            initializer=_init_worker,
+            initargs=(video_format, bytes(label_bytes), width),
+        ) as executor:
+            # 依序寫入影格，同時最多只有 2 倍行程數的影格在編碼中
+            pending_deque = deque()
+            previous_color_index_bytes = None
+            for color_index_bytes, repeat_count in run_length_list:
+                if len(pending_deque) >= 2 * max_worker_count:
+                    future, _repeat_count = pending_deque.popleft()
+                    writer.write(*future.result(), _repeat_count)
+                pending_deque.append((
+                    executor.submit(
+                        encode_frame,
+                        previous_color_index_bytes,
+                        color_index_bytes,
+                    ),
+                    repeat_count,
+                ))
+                previous_color_index_bytes = color_index_bytes
+            while pending_deque:
+                future, _repeat_count = pending_deque.popleft()
+                writer.write(*future.result(), _repeat_count)
+    finally:
+        writer.close()
+    return len(color_index_bytes_list)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="輸出停電模擬動畫 (GIF / APNG / MP4)")
+    parser.add_argument("--output", type=Path, default=Path("img/demo.gif"))
+    parser.add_argument("--width", type=int, default=600)
+    parser.add_argument("--fps", type=float, default=PER_SEC_DAY_COUNT)
+    parser.add_argument("--frame-per-day-count", type=int, default=1)
+    parser.add_argument("--start-date", type=datetime.date.fromisoformat)
+    parser.add_argument("--end-date", type=datetime.date.fromisoformat)
+    parser.add_argument("--worker-count", type=int)
+    args = parser.parse_args()
+
+    frame_count = render_video(
+        output_path=args.output,
+        width=args.width,
+        fps=args.fps,
+        frame_per_day_count=args.frame_per_day_count,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        max_worker_count=args.worker_count,
+    )
+    print(f"已輸出 {frame_count} 個影格至 {args.output}")
@@ -1,318 +1,610 @@
 import datetime
 import json
-from collections import defaultdict
-from dataclasses import dataclass
-from itertools import groupby
+import math
 
-from browser import doc, timer, window
-from browser.html import AUDIO, DIV, INPUT, SOURCE, SPAN, SVG
+from browser import doc, timer, window, worker
+from browser.html import CANVAS, DIV, INPUT, OPTION, SELECT, SPAN, SVG
 
-from libs.reason_emoji import get_reason_emoji
+from libs.audio_mixer import AudioMixer
+from libs.blackout import BLACKOUT_RGB_STR_LUT
+from libs.downsample import MinMaxPyramid
+from libs.event_log import EventLog, EventLogRow
+from libs.map_canvas import RegionGridIndex
+from libs.playback_clock import PER_SEC_DAY_COUNT_TO_LABEL_DICT, PlaybackClock
 from libs.type_hint import D3
 
 d3: D3 = window.d3
 tw_svg: D3 = None
 
 
-@dataclass
-class News:
-    """ 停電新聞
-    """
-    date: datetime.date
-    title: str
-    households: int | None = None
-    """停電戶數"""
-    locations: list[str] | None = None
-    """停電縣市"""
-    reason: str | None = None
-    """停電原因"""
-
-    @classmethod
-    def from_dict(cls, news_dict: dict) -> 'News':
-        return cls(
-            date=(
-                datetime.datetime.strptime(
-                    news_dict['date'],
-                    "%Y-%m-%d",
-                ).date()
-            ),
-            title=news_dict['title'],
-            households=news_dict['households'],
-            locations=news_dict['locations'],
-            reason=news_dict['reason'],
-        )
+# 停電模擬的 Web Worker (src/worker.py): 依月份分片的時間軸 (由 `python -m libs.timeline` 產生) 的
+# 下載、解析與停電模擬皆於 Worker 中執行，主執行緒只將其傳回的逐影格差異套用至 DOM
+SIMULATION_WORKER = None
+TIMELINE_SHARD_DIR_URL = "data/timeline/"
 
+# 滑條的起始日期 (時間軸起始日的前一天)
+start_date: datetime.date = None
 
-# 載入新聞串列
-news_dict_list: list[dict] = json.load(
-    open("data/news_list.json", "r", encoding="utf-8")
+# 地圖繪製器 (於啟動時以網址參數選擇，例如 index.html?renderer=canvas):
+#     svg: 每個縣市一個 path 元素 (預設)
+#     canvas: 各行政區快取為 Path2D，只重繪顏色有變化的行政區的邊界框，適用於數百個鄉鎮市區
+MAP_RENDERER = (
+    "canvas"
+    if window.URLSearchParams.new(window.location.search).get("renderer") == "canvas" else
+    "svg"
 )
-# window.console.log(news_dict_list)
-# print(f"{len(news_dict_list)=}")
-news_list = [
-    News.from_dict(news_dict)
-    for news_dict in news_dict_list
-    if news_dict.get("households", 0)
-]
-# print(f"{len(news_list)=}")
-
-# # # 🐛debug: 測試一小段近幾筆資料
-# news_list = news_list[-200:]
-
-# 以日期分組新聞串列
-date_to_news_list_dict = {
-    date: list(news_iter)
-    for date, news_iter in groupby(
-        news_list,
-        key=lambda news: news.date,
+
+MAP_VIEW_BOX = (0, 200, 600, 800)
+"""地圖的 viewBox (x, y, 寬, 高)，與 `libs.geometry` 的投影一致"""
+
+# 各縣市的 SVG path 元素 (於 GeoJSON 載入後建立)
+CITY_TO_PATH_NODE_DICT = {}
+
+# Canvas 繪製器: 各行政區的名稱、Path2D 與邊界框的網格索引，以及預先繪製靜態邊界線的離屏 canvas
+REGION_NAME_LIST = list[str]()
+REGION_NAME_TO_I_DICT = dict[str, int]()
+REGION_PATH2D_LIST = list()
+REGION_GRID_INDEX: RegionGridIndex = None
+MAP_BORDER_CANVAS = None
+
+# 各縣市目前已繪製的顏色索引 (未記錄者為 0: 黃色)
+RENDERED_CITY_TO_COLOR_INDEX_DICT = dict[str, int]()
+
+# 停電事件日誌的環形緩衝區，與已繪製的日誌版本
+EVENT_LOG = EventLog()
+RENDERED_EVENT_LOG_VERSION = 0
+
+# 停電事件日誌的列元素池
+EVENT_ROW_DIV_LIST = list[DIV]()
+
+# 停電音效: 音檔僅解碼一次，並由固定數量的發聲槽 (GainNode) 播放
+AUDIO_CONTEXT = window.AudioContext.new()
+AUDIO_MIXER = AudioMixer()
+POWER_OUTAGE_AUDIO_BUFFER = None
+VOICE_GAIN_NODE_LIST = list()
+for _ in AUDIO_MIXER.voice_end_sec_list:
+    voice_gain_node = AUDIO_CONTEXT.createGain()
+    voice_gain_node.connect(AUDIO_CONTEXT.destination)
+    VOICE_GAIN_NODE_LIST.append(voice_gain_node)
+
+# 已排定的動畫影格請求 (None 表示地圖閒置中)
+ANIMATION_FRAME_REQUEST_ID = None
+
+# 是否正在等待 Worker 傳回逐影格差異，與等待期間是否又有新的重繪請求
+IS_WAITING_FRAME_DIFF = False
+IS_FRAME_DIFF_OUTDATED = False
+
+
+def get_now_sec() -> float:
+    """ 取得目前的時間 (秒) """
+    return window.performance.now() / 1000
+
+
+def mark_performance(name: str) -> None:
+    """ 記錄效能標記，並量測自頁面開始載入至今的耗時
+    (可於開發者工具的 Performance 面板或 performance.getEntriesByType("measure") 檢視)
+    """
+    window.performance.mark(name)
+    window.performance.measure(name)
+
+
+def setup_power_outage_audio() -> None:
+    """ 載入並解碼停電音效
+    """
+    def on_decode_audio_data(audio_buffer) -> None:
+        global POWER_OUTAGE_AUDIO_BUFFER
+        POWER_OUTAGE_AUDIO_BUFFER = audio_buffer
+        AUDIO_MIXER.clip_duration_sec = audio_buffer.duration
+
+    (
+        window.fetch("audio/power_outage.mp3")
+        .then(lambda response: response.arrayBuffer())
+        .then(lambda array_buffer: AUDIO_CONTEXT.decodeAudioData(array_buffer))
+        .then(on_decode_audio_data)
+        .catch(lambda error: print(f"加載停電音效時發生錯誤：{error}"))
     )
-}
-# print(date_to_news_list_dict)
-# exit()
 
-# 各縣市的停電比值字典
-CITY_TO_BLACKOUT_RATIO_DICT = defaultdict(int)
+
+def play_power_outage_audio() -> None:
+    """ 合併本影格內觸發的停電音效，並以閒置的發聲槽播放
+    """
+    if POWER_OUTAGE_AUDIO_BUFFER is None:
+        AUDIO_MIXER.pending_darkness_ratio_sum = 0.0
+        return
+    if (voice := AUDIO_MIXER.flush(AUDIO_CONTEXT.currentTime)) is None:
+        return
+    voice_i, power_outage_volume_ratio = voice
+    voice_gain_node = VOICE_GAIN_NODE_LIST[voice_i]
+    voice_gain_node.gain.value = power_outage_volume_ratio
+    audio_buffer_source_node = AUDIO_CONTEXT.createBufferSource()
+    audio_buffer_source_node.buffer = POWER_OUTAGE_AUDIO_BUFFER
+    audio_buffer_source_node.connect(voice_gain_node)
+    audio_buffer_source_node.start()
+
+
+def update_tw_svg(changed_city_to_color_index_dict: dict[str, int]) -> None:
+    """ 將顏色有變化的縣市 (量化後的停電比值) 套用至地圖的填充顏色
+    (SVG: 更新 path 元素的樣式，Canvas: 只重繪這些縣市的邊界框)
+    """
+    for city_name, color_i in changed_city_to_color_index_dict.items():
+        if color_i:
+            RENDERED_CITY_TO_COLOR_INDEX_DICT[city_name] = color_i
+        else:
+            RENDERED_CITY_TO_COLOR_INDEX_DICT.pop(city_name, None)
+        if (path_node := CITY_TO_PATH_NODE_DICT.get(city_name)) is None:
+            continue
+        path_node.style.fill = BLACKOUT_RGB_STR_LUT[color_i]
+
+    if MAP_RENDERER == "canvas" and REGION_GRID_INDEX is not None:
+        draw_tw_canvas(REGION_GRID_INDEX.get_dirty_bbox_list([
+            REGION_NAME_TO_I_DICT[city_name]
+            for city_name in changed_city_to_color_index_dict
+            if city_name in REGION_NAME_TO_I_DICT
+        ]))
 
 
-def get_blackout_rgb_str(blackout_ratio: float) -> str:
-    """ 根據停電比值返回對應的 RGB 顏色
+def draw_tw_canvas(dirty_bbox_list: list[list[float]] | None = None) -> None:
+    """ 重繪 Canvas 地圖: 於各重繪範圍內依序填充與其相交的行政區，再貼上離屏 canvas 的靜態邊界線
     Args:
-        blackout_ratio (float): 停電比值
-            0: 黃色
-            1: 黑色
+        dirty_bbox_list (list[list[float]] | None): 重繪範圍 (viewBox 單位)，None 表示重繪整張地圖
     """
-    return f"rgb({255 - int(255 * blackout_ratio)}, {255 - int(255 * blackout_ratio)}, 0)"
+    canvas = doc["tw_canvas"]
+    context = canvas.getContext("2d")
+    view_box_x, view_box_y, view_box_width, view_box_height = MAP_VIEW_BOX
+    px_per_unit = canvas.width / view_box_width
+    if dirty_bbox_list is None:
+        dirty_bbox_list = [[
+            view_box_x,
+            view_box_y,
+            view_box_x + view_box_width,
+            view_box_y + view_box_height,
+        ]]
+
+    for bbox in dirty_bbox_list:
+        # 重繪範圍對齊至整數像素 (並以對齊後的範圍查詢行政區，避免清除後未重新填充的邊緣)
+        x0 = max(math.floor((bbox[0] - view_box_x) * px_per_unit), 0)
+        y0 = max(math.floor((bbox[1] - view_box_y) * px_per_unit), 0)
+        x1 = min(math.ceil((bbox[2] - view_box_x) * px_per_unit), canvas.width)
+        y1 = min(math.ceil((bbox[3] - view_box_y) * px_per_unit), canvas.height)
+        if x1 <= x0 or y1 <= y0:
+            continue
+
+        context.save()
+        context.setTransform(1, 0, 0, 1, 0, 0)
+        context.beginPath()
+        context.rect(x0, y0, x1 - x0, y1 - y0)
+        context.clip()
+        context.clearRect(x0, y0, x1 - x0, y1 - y0)
+
+        context.setTransform(
+            px_per_unit, 0, 0, px_per_unit,
+            -view_box_x * px_per_unit, -view_box_y * px_per_unit,
+        )
+        for region_i in REGION_GRID_INDEX.get_region_i_list([
+            x0 / px_per_unit + view_box_x,
+            y0 / px_per_unit + view_box_y,
+            x1 / px_per_unit + view_box_x,
+            y1 / px_per_unit + view_box_y,
+        ]):
+            context.fillStyle = BLACKOUT_RGB_STR_LUT[
+                RENDERED_CITY_TO_COLOR_INDEX_DICT.get(REGION_NAME_LIST[region_i], 0)
+            ]
+            context.fill(REGION_PATH2D_LIST[region_i])
+
+        context.setTransform(1, 0, 0, 1, 0, 0)
+        context.drawImage(
+            MAP_BORDER_CANVAS,
+            x0, y0, x1 - x0, y1 - y0,
+            x0, y0, x1 - x0, y1 - y0,
+        )
+        context.restore()
+
+
+def send_worker_message(message_type: str, **kwargs) -> None:
+    """ 傳送訊息至停電模擬的 Web Worker (訊息格式見 src/worker.py) """
+    SIMULATION_WORKER.send(json.dumps({"type": message_type, **kwargs}))
 
 
-def update_city_to_blackout_ratio_dict() -> None:
-    """ 更新每個縣市的停電比值: 逐漸淡出至 0 (黑色→黃色)
+def on_animation_frame(timestamp: float) -> None:
+    """ 動畫影格: 向 Worker 請求目前播放位置的逐影格差異 (同時只有一個請求，於 on_frame_diff 中套用)
     """
-    global CITY_TO_BLACKOUT_RATIO_DICT
-    fade_out_duration_sec_int = 5  # 淡出時間 (秒)
-    update_per_ms_int = 10
-    for city_name, blackout_ratio in CITY_TO_BLACKOUT_RATIO_DICT.items():
-        if blackout_ratio > 0:
-            CITY_TO_BLACKOUT_RATIO_DICT[city_name] -= (
-                update_per_ms_int
-                / (fade_out_duration_sec_int * 1000)
-            )
-        else:
-            CITY_TO_BLACKOUT_RATIO_DICT[city_name] = 0
+    global ANIMATION_FRAME_REQUEST_ID, IS_WAITING_FRAME_DIFF, IS_FRAME_DIFF_OUTDATED
+    ANIMATION_FRAME_REQUEST_ID = None
+
+    if SIMULATION_WORKER is None:
+        return
+    advance_playback()
+    if IS_WAITING_FRAME_DIFF:
+        IS_FRAME_DIFF_OUTDATED = True
+        return
+    IS_WAITING_FRAME_DIFF = True
+    IS_FRAME_DIFF_OUTDATED = False
+    send_worker_message("frame", t=get_playback_day_position())
+
+
+def on_frame_diff(frame_diff_dict: dict) -> None:
+    """ 套用 Worker 傳回的逐影格差異: 重繪地圖與事件日誌並播放停電音效，
+    若仍在播放 (或等待期間有新的重繪請求) 則排定下一個影格
+    (衰減以模擬天數計算，暫停時播放位置不變，地圖也不再變化)
+    """
+    global IS_WAITING_FRAME_DIFF
+    IS_WAITING_FRAME_DIFF = False
 
+    update_tw_svg(frame_diff_dict["city_to_color_index_dict"])
+    for row_tuple in frame_diff_dict["row_tuple_list"]:
+        EVENT_LOG.append(EventLogRow(*row_tuple))
+    render_events_div()
+    AUDIO_MIXER.trigger(frame_diff_dict["darkness_ratio_list"])
+    play_power_outage_audio()
+    if IS_FRAME_DIFF_OUTDATED or PLAYBACK_CLOCK.is_playing:
+        request_animation_frame()
 
-def update_tw_svg(
-    city_to_blackout_ratio_dict: dict,
-    tw_svg: D3,
-) -> None:
-    """ 根據停電比值更新 SVG 圖形的填充顏色
+
+def request_animation_frame() -> None:
+    """ 排定下一個動畫影格 (若已排定則忽略)
     """
-    tw_svg.selectAll("path").style(
-        "fill", lambda d, i, nodes: (
-            get_blackout_rgb_str(
-                city_to_blackout_ratio_dict[d["properties"]["name"]]
-            )
+    global ANIMATION_FRAME_REQUEST_ID
+    if ANIMATION_FRAME_REQUEST_ID is None:
+        ANIMATION_FRAME_REQUEST_ID = timer.request_animation_frame(
+            on_animation_frame
         )
+
+
+def render_events_div() -> None:
+    """ 重繪停電事件日誌: 僅以固定的列元素池呈現足以填滿可視區塊的最新幾列
+    """
+    global RENDERED_EVENT_LOG_VERSION
+    if RENDERED_EVENT_LOG_VERSION == EVENT_LOG.version:
+        return
+    RENDERED_EVENT_LOG_VERSION = EVENT_LOG.version
+
+    events_div = doc["events_div"]
+    visible_row_list = EVENT_LOG.get_visible_row_list(
+        height_px=events_div.clientHeight,
     )
 
+    # 依需求擴充列元素池
+    while len(EVENT_ROW_DIV_LIST) < len(visible_row_list):
+        row_div = DIV([
+            # 停電時間
+            SPAN(),
+            # 停電縣市+戶數
+            SPAN(style="color: blue;"),
+            # 停電原因 emoji
+            SPAN(),
+            # 新聞標題
+            SPAN(),
+        ])
+        events_div <= row_div
+        EVENT_ROW_DIV_LIST.append(row_div)
+
+    # 將最新的列對齊至列元素池的尾端，並隱藏未使用的列元素
+    hidden_row_count = len(EVENT_ROW_DIV_LIST) - len(visible_row_list)
+    for row_div_i, row_div in enumerate(EVENT_ROW_DIV_LIST):
+        if row_div_i < hidden_row_count:
+            row_div.style.display = "none"
+            continue
+        row = visible_row_list[row_div_i - hidden_row_count]
+        date_span, location_households_span, reason_emoji_span, title_span = (
+            row_div.children
+        )
+        date_span.text = row.date_str
+        location_households_span.text = row.location_households_str
+        reason_emoji_span.text = row.reason_emoji
+        title_span.text = row.title
+        row_div.style.fontSize = f"{row.font_size_pt}pt"
+        row_div.style.display = "block"
+    events_div.scrollTop = events_div.scrollHeight
 
-def get_event_div_font_size_pt(household_count: int) -> float:
-    # 設定事件日誌字體大小設定
-    min_font_size_pt = 10
-    max_font_size_pt = 50
-    min_font_size_household_count = 100
-    max_font_size_household_count = 1_000_000
 
-    a = (
-        (max_font_size_pt-min_font_size_pt)
-        / (max_font_size_household_count-min_font_size_household_count)
-    )
-    b = min_font_size_pt - a*min_font_size_household_count
-    return max(
-        min(
-            household_count*a+b,
-            max_font_size_pt,
-        ),
-        min_font_size_pt,
-    )
+def get_day_index(date: datetime.date) -> int:
+    """ 取得指定日期的日索引 (距離時間軸起始日的天數，滑條起始日為 -1) """
+    return (date - start_date).days - 1
 
 
-def simulate_blackout_events(date: datetime.date) -> None:
-    """ 模擬指定日期的停電事件: 更新各縣市的停電比值字典
+def get_playback_day_position() -> float:
+    """ 取得播放位置的日索引 (含小數，即 Worker 計算停電比值衰減的時間，同 get_day_index 的單位) """
+    return PLAYBACK_CLOCK.position - 1
+
+
+def simulate_blackout_events(first_date: datetime.date, last_date: datetime.date) -> None:
+    """ 請 Worker 一次模擬 first_date 至 last_date (含) 的停電事件 (結果於下一個逐影格差異中傳回並統一重繪)
     """
-    doc["date_h2"].text = f"{date:%Y-%m-%d}"
+    doc["date_h2"].text = f"{last_date:%Y-%m-%d}"
+    send_worker_message(
+        "simulate",
+        start_day_i=get_day_index(first_date),
+        end_day_i=get_day_index(last_date) + 1,
+    )
+    request_animation_frame()
 
-    # 設定動畫特效為全黑的戶數
-    max_households_threshold = 1_000_000
-
-    # 遍歷處理當天的停電事件
-    darkness_ratio_list = list[float]()
-    for news in date_to_news_list_dict.get(date, []):
-        # 更新停電比值字典: 設定指定縣市的停電比值
-        for city_name in news.locations:
-            darkness_ratio = max(
-                (news.households/max_households_threshold)**0.5,
-                0.1,
-            )
-            CITY_TO_BLACKOUT_RATIO_DICT[city_name] = min(
-                CITY_TO_BLACKOUT_RATIO_DICT[city_name]+darkness_ratio,
-                1.0,
-            )
-            darkness_ratio_list.append(darkness_ratio)
 
-        # 追加停電事件日誌跑馬燈
-        font_size_pt = get_event_div_font_size_pt(
-            household_count=news.households
+def advance_playback() -> None:
+    """ 依播放時鐘推進滑條，並將本影格經過的所有天數一次交由 Worker 模擬 (播放中則排定下一個影格)
+    """
+    if not PLAYBACK_CLOCK.is_playing:
+        return
+    slider_value_range = PLAYBACK_CLOCK.tick(get_now_sec(), int(SLIDER.max))
+    if slider_value_range:
+        SLIDER.value = slider_value_range[-1]
+        simulate_blackout_events(
+            start_date + datetime.timedelta(days=slider_value_range[0]),
+            start_date + datetime.timedelta(days=slider_value_range[-1]),
         )
-        locations_str = (
-            "全台" if len(news.locations) >= 20 else
-            ",".join(
-                [location_str for location_str in news.locations]
+    if PLAYBACK_CLOCK.is_playing:
+        request_animation_frame()
+
+
+def get_map_lod_i(lod_tolerance_px_list: list[float]) -> int:
+    """ 根據地圖實際顯示的大小，選擇簡化誤差不超過 1 個裝置像素的最粗細節層級
+    Args:
+        lod_tolerance_px_list (list[float]): 各細節層級的簡化容許誤差 (由粗至細)
+    """
+    map_element = doc["tw_canvas"] if MAP_RENDERER == "canvas" else doc["tw_svg"]
+    device_px_per_unit = (
+        map_element.getBoundingClientRect().height
+        * window.devicePixelRatio
+        / MAP_VIEW_BOX[3]
+    )
+    for lod_i, tolerance_px in enumerate(lod_tolerance_px_list):
+        if tolerance_px * device_px_per_unit <= 1:
+            return lod_i
+    return len(lod_tolerance_px_list) - 1
+
+
+def draw_svg_map_lod(map_lod_dict) -> None:
+    """ SVG 繪製器: 繪製 (或更新) 地圖，並記錄各縣市的 path 元素以供局部重繪
+    """
+    if not CITY_TO_PATH_NODE_DICT:
+        for city_name in map_lod_dict["name_list"]:
+            path_node = (
+                tw_svg.append("path")
+                .attr("stroke", "#000")
+                .attr("stroke-width", 1)
+                .style(
+                    "fill",
+                    BLACKOUT_RGB_STR_LUT[RENDERED_CITY_TO_COLOR_INDEX_DICT.get(city_name, 0)],
+                )
+                .node()
             )
-        )
-        reason_emoji = get_reason_emoji(reason=news.reason)
-        doc["events_div"] <= DIV(
-            [
-                # 停電時間
-                SPAN(f"{news.date:%Y-%m-%d} "),
-                # 停電縣市+戶數
-                SPAN(
-                    f"[{locations_str} +{news.households:,}戶] ",
-                    style="color: blue;",
-                ),
-                # 停電原因 emoji
-                SPAN(reason_emoji),
-                # 新聞標題
-                SPAN(news.title),
-            ],
-            style=f"font-size: {font_size_pt}pt"
-        )
-        doc["events_div"].scrollTop = doc["events_div"].scrollHeight
+            CITY_TO_PATH_NODE_DICT[city_name] = path_node
 
-    # 播放停電音效
-    if (power_outage_volume_ratio := min(sum(darkness_ratio_list), 1)) > 0:
-        power_outage_audio = AUDIO(
-            SOURCE(src="audio/power_outage.mp3", type="audio/mpeg")
-        )
-        power_outage_audio.volume = max(
-            power_outage_volume_ratio,
-            0.3,
-        )
-        power_outage_audio.play()
+    for city_name, path_str in zip(
+        map_lod_dict["name_list"],
+        map_lod_dict["path_list"],
+    ):
+        CITY_TO_PATH_NODE_DICT[city_name].setAttribute("d", path_str)
+
+
+def draw_canvas_map_lod(map_lod_dict) -> None:
+    """ Canvas 繪製器: 將各行政區快取為 Path2D，將靜態邊界線繪製於離屏 canvas，再重繪整張地圖
+    """
+    global REGION_PATH2D_LIST, REGION_GRID_INDEX, MAP_BORDER_CANVAS
+    canvas = doc["tw_canvas"]
+    REGION_NAME_LIST[:] = list(map_lod_dict["name_list"])
+    REGION_NAME_TO_I_DICT.clear()
+    REGION_NAME_TO_I_DICT.update({
+        region_name: region_i
+        for region_i, region_name in enumerate(REGION_NAME_LIST)
+    })
+    REGION_PATH2D_LIST = [
+        window.Path2D.new(path_str)
+        for path_str in map_lod_dict["path_list"]
+    ]
+    REGION_GRID_INDEX = RegionGridIndex(list(map_lod_dict["bbox_list"]))
+
+    MAP_BORDER_CANVAS = CANVAS(width=canvas.width, height=canvas.height)
+    border_context = MAP_BORDER_CANVAS.getContext("2d")
+    px_per_unit = canvas.width / MAP_VIEW_BOX[2]
+    border_context.setTransform(
+        px_per_unit, 0, 0, px_per_unit,
+        -MAP_VIEW_BOX[0] * px_per_unit, -MAP_VIEW_BOX[1] * px_per_unit,
+    )
+    border_context.strokeStyle = "#000"
+    border_context.lineWidth = 1
+    for path2d in REGION_PATH2D_LIST:
+        border_context.stroke(path2d)
+
+    draw_tw_canvas()
 
 
 def setup_tw_svg() -> None:
-    """ 初始化台灣行政區 SVG
+    """ 初始化台灣行政區地圖 (SVG 或 Canvas): 先繪製最粗的細節層級，必要時再升級為較細的層級
+    (path 資料由 `python -m libs.geometry` 預先簡化並投影)
     """
     global tw_svg
-    doc["tw_svg_div"] <= SVG(id="tw_svg")
+    if MAP_RENDERER == "canvas":
+        canvas = CANVAS(id="tw_canvas", style="width: 100%")
+        doc["tw_svg_div"] <= canvas
+        canvas.width = round(canvas.getBoundingClientRect().width * window.devicePixelRatio)
+        canvas.height = round(canvas.width * MAP_VIEW_BOX[3] / MAP_VIEW_BOX[2])
+    else:
+        doc["tw_svg_div"] <= SVG(id="tw_svg")
+        tw_svg = (
+            d3.select("#tw_svg")
+            .attr("viewBox", " ".join(str(value) for value in MAP_VIEW_BOX))
+        )
 
-    tw_svg = (
-        d3.select("#tw_svg")
-        .attr("viewBox", "0 200 600 800")
-    )
+    def load_map_lod(lod_name: str) -> None:
+        d3.json(f"data/twCounty2010merge.{lod_name}.json").then(
+            on_load_map_lod
+        ).catch(lambda error: print(f"加載地圖資料時發生錯誤：{error}"))
 
-    projection = (
-        d3.geoMercator()
-        .center([121, 24])
-        .scale(8000)
-        .translate([600 / 2, 800 / 2])
-    )
+    def on_load_map_lod(map_lod_dict) -> None:
+        """ 繪製 (或更新) 地圖
+        """
+        is_first_paint = not CITY_TO_PATH_NODE_DICT and not REGION_NAME_LIST
+        if MAP_RENDERER == "canvas":
+            draw_canvas_map_lod(map_lod_dict)
+        else:
+            draw_svg_map_lod(map_lod_dict)
+        if is_first_paint:
+            mark_performance("map_first_paint")
 
-    path = d3.geoPath().projection(projection)
+        # 若目前的細節層級不足以呈現地圖實際顯示的大小，則載入較細的層級
+        lod_tolerance_px_list = list(map_lod_dict["lod_tolerance_px_list"])
+        lod_i = get_map_lod_i(lod_tolerance_px_list)
+        if lod_tolerance_px_list[lod_i] < map_lod_dict["tolerance_px"]:
+            load_map_lod(map_lod_dict["lod_name_list"][lod_i])
 
-    # 加載 GeoJSON 並繪製地圖
-    d3.json("data/twCounty2010merge.geojson").then(lambda data: (
-        tw_svg.selectAll("path")
-        .data(data["features"])
-        .enter().append("path")
-        .attr("d", path)
-        .attr("stroke", "#000")
-        .attr("stroke-width", 1)
-    )).catch(lambda error: print(f"加載 GeoJSON 時發生錯誤：{error}"))
+    # 加載最粗的細節層級並繪製地圖
+    load_map_lod("low")
 
     return tw_svg
 
 
-PLAYING_SLIDER_TIMER = None
+# 日期滑條與播放時鐘 (滑條的值即播放位置)
+SLIDER: INPUT = None
+PLAYBACK_CLOCK = PlaybackClock()
 
 
 def play_or_pause_slider(slider: INPUT) -> None:
     """ 播放/暫停按鈕的點擊事件處理函數
     """
-    global PLAYING_SLIDER_TIMER
+    # 瀏覽器須於使用者操作後才允許播放音效
+    AUDIO_CONTEXT.resume()
 
-    # 設置播放速度: 每秒播放的天數
-    per_sec_day_count = 30
+    # 進行滑條播放或者暫停 (播放由動畫影格依實際經過的時間推進，見 advance_playback)
+    if PLAYBACK_CLOCK.is_playing:
+        PLAYBACK_CLOCK.pause()
+    else:
+        PLAYBACK_CLOCK.play(int(slider.value), get_now_sec())
+        request_animation_frame()
 
-    def add_slider_step() -> None:
-        """ 進步滑條的值
-        """
-        global PLAYING_SLIDER_TIMER
-        # 若已達最大值，則停止播放
-        if int(slider.value) == int(slider.max):
-            timer.clear_interval(PLAYING_SLIDER_TIMER)
-            PLAYING_SLIDER_TIMER = None
-            return
-
-        slider.value = int(slider.value) + 1
-        simulate_blackout_events(
-            start_date + datetime.timedelta(days=int(slider.value)),
-        )
 
-    # 進行滑條播放或者暫停
-    if PLAYING_SLIDER_TIMER is None:
-        PLAYING_SLIDER_TIMER = timer.set_interval(
-            add_slider_step,
-            1000/per_sec_day_count,
-        )
-    else:
-        timer.clear_interval(PLAYING_SLIDER_TIMER)
-        PLAYING_SLIDER_TIMER = None
+def on_change_speed(speed_select: SELECT) -> None:
+    """ 播放速度選單的變更事件處理函數
+    """
+    PLAYBACK_CLOCK.set_speed(int(speed_select.value), get_now_sec())
 
 
 def on_click_slider(slider: INPUT) -> None:
     """ 滑條的點擊事件處理函數
     """
-    global PLAYING_SLIDER_TIMER
+    # 無條件暫停滑條的播放，並將播放位置移至滑條的值
+    PLAYBACK_CLOCK.pause()
+    PLAYBACK_CLOCK.seek(int(slider.value))
+
+    # 瀏覽器須於使用者操作後才允許播放音效
+    AUDIO_CONTEXT.resume()
+
+    # 由分片的關鍵影格求得前一天結束時的地圖狀態，再呈現對應日期的停電事件
+    date = start_date + datetime.timedelta(days=int(slider.value))
+    doc["date_h2"].text = f"{date:%Y-%m-%d}"
+    send_worker_message("seek", day_i=get_day_index(date))
+    request_animation_frame()
+
+
+# 單日停電戶數柱狀圖: Chart.js 圖表、降採樣金字塔、可視範圍 [start_i, end_i) 與已排定的重繪請求
+HOUSEHOLDS_CHART = None
+HOUSEHOLDS_MIN_MAX_PYRAMID = None
+HOUSEHOLDS_CHART_RANGE = [0, 0]
+HOUSEHOLDS_CHART_REQUEST_ID = None
+
+HOUSEHOLDS_CHART_ZOOM_RATIO_PER_WHEEL_PX = 1.002
+"""滾輪每滾動 1px 的縮放倍率"""
+
+HOUSEHOLDS_CHART_MIN_DAY_COUNT = 14
+"""最大放大時可視範圍的天數"""
+
+
+def get_households_chart_data_list() -> list[dict]:
+    """ 依可視範圍與圖表的像素寬度降採樣單日停電戶數: 每個像素最多一根長條，且保留範圍內的高峰
+    """
+    start_i, end_i = HOUSEHOLDS_CHART_RANGE
+    y_list = HOUSEHOLDS_MIN_MAX_PYRAMID.y_list
+    return [
+        {"x": i, "y": y_list[i]}
+        for i in HOUSEHOLDS_MIN_MAX_PYRAMID.get_index_list(
+            start_i,
+            end_i,
+            max_point_count=max(doc["chart_div"].clientWidth, 100),
+        )
+    ]
+
+
+def update_households_chart(timestamp: float = 0) -> None:
+    """ 以可視範圍重新降採樣並重繪圖表 (不播放動畫)
+    """
+    global HOUSEHOLDS_CHART_REQUEST_ID
+    HOUSEHOLDS_CHART_REQUEST_ID = None
+    start_i, end_i = HOUSEHOLDS_CHART_RANGE
+    HOUSEHOLDS_CHART.data.datasets[0].data = get_households_chart_data_list()
+    HOUSEHOLDS_CHART.options.scales.x.min = start_i - 0.5
+    HOUSEHOLDS_CHART.options.scales.x.max = end_i - 0.5
+    HOUSEHOLDS_CHART.update("none")
 
-    # 無條件暫停滑條的播放
-    if PLAYING_SLIDER_TIMER is not None:
-        timer.clear_interval(PLAYING_SLIDER_TIMER)
-        PLAYING_SLIDER_TIMER = None
 
-    # 根據滑條的值呈現對應日期的停電事件
-    simulate_blackout_events(
-        start_date + datetime.timedelta(days=int(slider.value)),
+def zoom_households_chart(center_i: float, zoom_ratio: float) -> None:
+    """ 以 center_i 為中心縮放可視範圍 (center_i 於畫面上的位置不變)
+    """
+    start_i, end_i = HOUSEHOLDS_CHART_RANGE
+    point_count = len(HOUSEHOLDS_MIN_MAX_PYRAMID.y_list)
+    day_count = min(
+        max(round((end_i - start_i) * zoom_ratio), HOUSEHOLDS_CHART_MIN_DAY_COUNT),
+        point_count,
     )
+    center_ratio = (center_i - start_i) / max(end_i - start_i, 1)
+    start_i = min(max(round(center_i - day_count * center_ratio), 0), point_count - day_count)
+    set_households_chart_range(start_i, start_i + day_count)
+
+
+def set_households_chart_range(start_i: int, end_i: int) -> None:
+    """ 設定圖表的可視範圍，並於下一個動畫影格重繪 (同一影格內的多次設定只重繪一次)
+    """
+    global HOUSEHOLDS_CHART_REQUEST_ID
+    HOUSEHOLDS_CHART_RANGE[:] = [start_i, end_i]
+    if HOUSEHOLDS_CHART_REQUEST_ID is None:
+        HOUSEHOLDS_CHART_REQUEST_ID = timer.request_animation_frame(
+            update_households_chart
+        )
 
 
 def plot_households(
     date_list: list[datetime.date],
     household_count_list: list[int],
 ) -> None:
-    """ 繪製單日停電戶數的柱狀圖
+    """ 繪製單日停電戶數的柱狀圖: 只繪製降採樣後的長條，滾輪縮放時只重新取樣可視範圍
+    (雙擊恢復完整範圍)
     """
+    global HOUSEHOLDS_CHART, HOUSEHOLDS_MIN_MAX_PYRAMID
+    HOUSEHOLDS_MIN_MAX_PYRAMID = MinMaxPyramid(household_count_list)
+    HOUSEHOLDS_CHART_RANGE[:] = [0, len(household_count_list)]
+
+    def get_tick_label(value, *args) -> str:
+        """ 將 x 軸的索引轉為日期 """
+        i = int(value)
+        return f"{date_list[i]:%Y-%m-%d}" if 0 <= i < len(date_list) else ""
+
     # 創建圖表配置
     config = {
         'type': 'bar',
         'data': {
-            'labels': [
-                date.strftime("%Y-%m-%d")
-                for date in date_list
-            ],
             'datasets': [{
                 'label': 'Households',
-                'data': [
-                    household_count for household_count in household_count_list
-                ],
+                'data': get_households_chart_data_list(),
                 'backgroundColor': 'rgba(75, 192, 192, 0.6)',
                 'borderColor': 'rgba(75, 192, 192, 1)',
-                'borderWidth': 1
+                'borderWidth': 1,
+                'barPercentage': 1,
+                'categoryPercentage': 1,
             }]
         },
         'options': {
             'responsive': True,
+            'animation': False,
+            'parsing': False,
+            'normalized': True,
             'scales': {
+                'x': {
+                    'type': 'linear',
+                    'min': -0.5,
+                    'max': len(household_count_list) - 0.5,
+                    'ticks': {
+                        'callback': get_tick_label,
+                        'maxRotation': 0,
+                    },
+                },
                 'y': {
                     'beginAtZero': True,
                     # 'type': 'logarithmic',
@@ -325,33 +617,37 @@ def plot_households(
                 'title': {
                     'display': True,
                     'text': '單日停電戶數'
-                }
+                },
+                'tooltip': {
+                    'callbacks': {
+                        'title': lambda item_list, *args: get_tick_label(item_list[0].parsed.x),
+                    },
+                },
             }
         }
     }
 
     # 創建圖表
-    window.Chart.new(doc['chart_div'], config)
+    HOUSEHOLDS_CHART = window.Chart.new(doc['chart_div'], config)
 
+    def on_wheel(ev) -> None:
+        ev.preventDefault()
+        zoom_households_chart(
+            center_i=HOUSEHOLDS_CHART.scales.x.getValueForPixel(ev.offsetX),
+            zoom_ratio=HOUSEHOLDS_CHART_ZOOM_RATIO_PER_WHEEL_PX ** ev.deltaY,
+        )
 
-# def main():
-if __name__ == '__main__':
-    # 初始化 SVG 圖形
-    tw_svg = setup_tw_svg()
-
-    # 設定計時器: 不斷更新各縣市停電比值與 SVG 圖形
-    update_per_ms_int = 10
-    timer.set_interval(
-        update_city_to_blackout_ratio_dict,
-        update_per_ms_int,
-    )
-    timer.set_interval(
-        lambda: update_tw_svg(
-            CITY_TO_BLACKOUT_RATIO_DICT,
-            tw_svg,
-        ),
-        update_per_ms_int,
-    )
+    def on_dblclick(ev) -> None:
+        set_households_chart_range(0, len(household_count_list))
+
+    doc['chart_div'].bind("wheel", on_wheel)
+    doc['chart_div'].bind("dblclick", on_dblclick)
+
+
+def setup_slider(timeline_start_date: datetime.date, day_count: int) -> INPUT:
+    """ 追加播放/暫停按鈕與日期滑條 (只需時間軸的日期範圍，因此可於事件載入前建立)
+    """
+    global start_date, SLIDER
 
     # 追加一個播放/暫停按鈕
     doc["slider_div"] <= INPUT(
@@ -362,26 +658,23 @@ if __name__ == '__main__':
         lambda ev: play_or_pause_slider(slider),
     )
 
-    # 追加日期滑條
-    start_date = news_list[0].date - datetime.timedelta(days=1)
-    end_date = news_list[-1].date + datetime.timedelta(days=1)
-    duration_day_count = (end_date - start_date).days
-    date_list = [
-        start_date+datetime.timedelta(days=day_i)
-        for day_i in range(duration_day_count)
-    ]
-    household_count_list = [
-        sum(
-            news.households
-            for news in date_to_news_list_dict.get(date, [])
-        )
-        for date in date_list
-    ]
+    # 追加播放速度選單
+    speed_select = SELECT().bind(
+        "change",
+        lambda ev: on_change_speed(speed_select),
+    )
+    for per_sec_day_count, label in PER_SEC_DAY_COUNT_TO_LABEL_DICT.items():
+        speed_select <= OPTION(label, value=per_sec_day_count)
+    speed_select.value = PLAYBACK_CLOCK.per_sec_day_count
+    doc["slider_div"] <= speed_select
+
+    # 追加日期滑條 (時間軸起始日的前一天至最後一個事件的後一天)
+    start_date = timeline_start_date - datetime.timedelta(days=1)
     doc["date_h2"].text = f"{start_date:%Y-%m-%d}"
     slider = INPUT(
         type="range",
         min=0,
-        max=duration_day_count,
+        max=day_count + 1,
         value=0,
         style="width: 100%",
     ).bind(
@@ -389,6 +682,62 @@ if __name__ == '__main__':
         lambda ev: on_click_slider(slider),
     )
     doc["slider_div"] <= slider
+    SLIDER = slider
+    return slider
+
+
+def on_worker_message(ev) -> None:
+    """ 處理 Worker 傳回的訊息 (訊息格式見 src/worker.py)
+    """
+    message_dict = json.loads(ev.data)
+    message_type = message_dict["type"]
+    if message_type == "frame":
+        on_frame_diff(message_dict)
+    elif message_type == "manifest":
+        setup_slider(
+            datetime.date.fromisoformat(message_dict["start_date"]),
+            message_dict["day_count"],
+        )
+        mark_performance("slider_ready")
+    elif message_type == "households":
+        # 滑條的第一天 (時間軸起始日的前一天) 沒有事件
+        household_count_list = [0] + message_dict["household_count_list"]
+        date_list = [
+            start_date + datetime.timedelta(days=day_i)
+            for day_i in range(len(household_count_list))
+        ]
+        plot_households(date_list, household_count_list)
+        mark_performance("households_chart_ready")
+    elif message_type == "ready":
+        mark_performance("first_shard_loaded")
+
+
+def setup_simulation_worker() -> None:
+    """ 建立停電模擬的 Web Worker，並請其下載時間軸資料
+    """
+    def on_ready(simulation_worker) -> None:
+        global SIMULATION_WORKER
+        SIMULATION_WORKER = simulation_worker
+        send_worker_message(
+            "load",
+            timeline_shard_dir_url=window.URL.new(
+                TIMELINE_SHARD_DIR_URL,
+                window.location.href,
+            ).href,
+        )
+
+    worker.create_worker(
+        "simulation_worker",
+        on_ready,
+        on_worker_message,
+        lambda ev: print(f"停電模擬的 Web Worker 發生錯誤：{ev.data}"),
+    )
+
+
+if __name__ == '__main__':
+    # 建立停電模擬的 Web Worker (於背景下載時間軸資料)，同時初始化 SVG 圖形 (地圖資料於背景下載)
+    setup_simulation_worker()
+    setup_tw_svg()
 
-    # # 繪製單日停電戶數的柱狀圖
-    # plot_households(date_list, household_count_list)
+    # 載入停電音效
+    setup_power_outage_audio()
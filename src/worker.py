@@ -0,0 +1,164 @@
+""" 停電模擬的 Web Worker
+
+時間軸資料的下載與解析、分片的預先下載與停電模擬皆於此執行，主執行緒 (src/index.py) 只將傳回的
+逐影格差異套用至 DOM，因此不論解析或模擬的耗時，滑條與按鈕皆能立即回應。
+
+訊息皆為 JSON 字串，"type" 為訊息種類。主執行緒 -> Worker (依收到的順序處理):
+    load: {timeline_shard_dir_url} 下載時間軸清單、單日停電戶數與第一個分片
+    seek: {day_i} 跳轉至第 day_i 天開始前，並模擬當天的停電事件 (佇列中有較新的跳轉時略過)
+    simulate: {start_day_i, end_day_i} 一次模擬第 start_day_i 至 end_day_i-1 天的停電事件 (播放時同一影格經過的天數)
+    frame: {t} 取得時間 t (播放位置，含小數的日索引) 的逐影格差異
+Worker -> 主執行緒:
+    manifest: {start_date, day_count} 時間軸的日期範圍
+    households: {household_count_list} 單日停電戶數
+    ready: 第一個分片已載入
+    frame: BlackoutSimulationDiffer.get_frame_diff_dict 的結果
+"""
+import json
+from collections import deque
+
+from browser import aio, bind, self
+
+from libs.simulation import BlackoutSimulation, BlackoutSimulationDiffer
+from libs.timeline_shard import ShardedTimeline
+
+TIMELINE_SHARD_PREFETCH_COUNT = 2
+"""播放時預先下載播放位置之後的分片數"""
+
+# 依月份分片的時間軸與其網址 (於 load 訊息中建立)
+TIMELINE_SHARD_DIR_URL = ""
+timeline: ShardedTimeline = None
+
+# 下載中的分片
+LOADING_SHARD_I_SET = set()
+
+# 停電模擬與其逐影格差異
+BLACKOUT_SIMULATION_DIFFER: BlackoutSimulationDiffer = None
+
+# 待處理的訊息，與是否正在處理中
+MESSAGE_DICT_DEQUE = deque()
+IS_PROCESSING_MESSAGES = False
+
+
+def send_message(message_type: str, **kwargs) -> None:
+    """ 傳送訊息至主執行緒 """
+    self.send(json.dumps({"type": message_type, **kwargs}, ensure_ascii=False))
+
+
+async def get_json(url: str):
+    """ 下載並解析 JSON (失敗時為 None) """
+    request = await aio.get(url)
+    if request.status != 200:
+        print(f"加載 {url} 時發生錯誤：{request.status}")
+        return None
+    return json.loads(request.data)
+
+
+async def load_timeline_shard(shard_i: int) -> None:
+    """ 下載分片並加入時間軸 (若已載入則忽略，若下載中則等待其完成)
+    """
+    while shard_i in LOADING_SHARD_I_SET:
+        await aio.sleep(0.05)
+    if timeline.is_shard_loaded(shard_i):
+        return
+
+    LOADING_SHARD_I_SET.add(shard_i)
+    try:
+        shard_dict = await get_json(
+            f"{TIMELINE_SHARD_DIR_URL}{timeline.get_shard_name(shard_i)}.json"
+        )
+    finally:
+        LOADING_SHARD_I_SET.discard(shard_i)
+    if shard_dict is not None:
+        timeline.add_shard(shard_i, shard_dict)
+
+
+def prefetch_timeline_shards(day_i: int) -> None:
+    """ 於背景下載第 day_i 天所在的分片與其後的分片 (超出快取容量時移除最久未使用的分片)
+    """
+    for shard_i in timeline.get_missing_shard_i_list(day_i, TIMELINE_SHARD_PREFETCH_COUNT):
+        if shard_i not in LOADING_SHARD_I_SET:
+            aio.run(load_timeline_shard(shard_i))
+
+
+async def load_timeline(timeline_shard_dir_url: str) -> None:
+    """ 下載時間軸清單並建立模擬，再下載單日停電戶數與第一個分片
+    """
+    global TIMELINE_SHARD_DIR_URL, timeline, BLACKOUT_SIMULATION_DIFFER
+    TIMELINE_SHARD_DIR_URL = timeline_shard_dir_url
+    if (manifest_dict := await get_json(f"{TIMELINE_SHARD_DIR_URL}manifest.json")) is None:
+        return
+    timeline = ShardedTimeline(manifest_dict)
+    BLACKOUT_SIMULATION_DIFFER = BlackoutSimulationDiffer(BlackoutSimulation(timeline))
+    send_message(
+        "manifest",
+        start_date=f"{timeline.start_date:%Y-%m-%d}",
+        day_count=timeline.day_count,
+    )
+
+    if (household_count_list := await get_json(f"{TIMELINE_SHARD_DIR_URL}households.json")) is not None:
+        send_message("households", household_count_list=household_count_list)
+    await load_timeline_shard(0)
+    prefetch_timeline_shards(0)
+    send_message("ready")
+
+
+async def simulate_day(day_i: int, is_seeking: bool = False) -> None:
+    """ 下載第 day_i 天所在的分片後模擬當天的停電事件，並預先下載之後的分片
+    Args:
+        is_seeking (bool): 是否先跳轉至第 day_i 天開始前 (由分片的關鍵影格求得前一天結束時的狀態)
+    """
+    if 0 <= day_i < timeline.day_count:
+        await load_timeline_shard(timeline.get_shard_i(day_i))
+    if is_seeking:
+        BLACKOUT_SIMULATION_DIFFER.seek(day_i)
+    BLACKOUT_SIMULATION_DIFFER.simulate_day(day_i)
+    prefetch_timeline_shards(day_i)
+
+
+async def handle_message(message_dict: dict) -> None:
+    """ 處理一則主執行緒的訊息
+    """
+    message_type = message_dict["type"]
+    if message_type == "load":
+        await load_timeline(message_dict["timeline_shard_dir_url"])
+    elif timeline is None:
+        return
+    elif message_type == "seek":
+        await simulate_day(message_dict["day_i"], is_seeking=True)
+    elif message_type == "simulate":
+        for day_i in range(message_dict["start_day_i"], message_dict["end_day_i"]):
+            await simulate_day(day_i)
+    elif message_type == "frame":
+        send_message(
+            "frame",
+            **BLACKOUT_SIMULATION_DIFFER.get_frame_diff_dict(message_dict["t"]),
+        )
+
+
+async def process_messages() -> None:
+    """ 依序處理待處理的訊息 (下載分片時暫停處理，以維持訊息的順序)
+    """
+    global IS_PROCESSING_MESSAGES
+    try:
+        while MESSAGE_DICT_DEQUE:
+            message_dict = MESSAGE_DICT_DEQUE.popleft()
+            # 拖動滑條時只需處理最後一次跳轉
+            if message_dict["type"] == "seek" and any(
+                _message_dict["type"] == "seek"
+                for _message_dict in MESSAGE_DICT_DEQUE
+            ):
+                continue
+            await handle_message(message_dict)
+    finally:
+        IS_PROCESSING_MESSAGES = False
+
+
+@bind(self, "message")
+def on_message(ev) -> None:
+    """ 將主執行緒的訊息加入佇列 """
+    global IS_PROCESSING_MESSAGES
+    MESSAGE_DICT_DEQUE.append(json.loads(ev.data))
+    if not IS_PROCESSING_MESSAGES:
+        IS_PROCESSING_MESSAGES = True
+        aio.run(process_messages())
@@ -0,0 +1,82 @@
+import datetime
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.aggregate import AggregateIndex
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+
+
+@pytest.fixture(scope="module")
+def timeline() -> Timeline:
+    return Timeline(
+        json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    )
+
+
+def get_brute_force_household_count(
+    timeline: Timeline,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    city_name: str | None = None,
+    reason_emoji: str | None = None,
+) -> int:
+    """ 逐一掃描事件的參考實作 """
+    return sum(
+        timeline.household_list[event_i]
+        for event_i, day_i in enumerate(timeline.day_list)
+        if start_date <= timeline.start_date + datetime.timedelta(days=day_i) <= end_date
+        and (city_name is None or city_name in timeline.get_locations(event_i))
+        and (reason_emoji is None or timeline.get_reason_emoji(event_i) == reason_emoji)
+    )
+
+
+def test_aggregate_index_range_query(timeline: Timeline):
+    """ 測試任意日期範圍 × 縣市 × 停電原因的總和與逐一掃描的結果一致
+    """
+    aggregate_index = AggregateIndex(timeline)
+    date_range_list = [
+        (timeline.start_date, timeline.end_date),
+        (datetime.date(2017, 8, 1), datetime.date(2017, 8, 31)),
+        (datetime.date(2021, 5, 13), datetime.date(2021, 5, 13)),
+        (datetime.date(2000, 1, 1), datetime.date(2016, 1, 1)),
+        (datetime.date(2030, 1, 1), datetime.date(2031, 1, 1)),
+    ]
+    for start_date, end_date in date_range_list:
+        for city_name in [None, "台北市", "高雄市"]:
+            for reason_emoji in [None, "", timeline.reason_emoji_list[0]]:
+                assert aggregate_index.get_household_count(
+                    start_date, end_date, city_name, reason_emoji,
+                ) == get_brute_force_household_count(
+                    timeline, start_date, end_date, city_name, reason_emoji,
+                )
+    assert aggregate_index.get_event_count(
+        timeline.start_date,
+        timeline.end_date,
+    ) == len(timeline.day_list)
+
+
+def test_aggregate_index_rollup(timeline: Timeline):
+    """ 測試每日、滑動視窗與每月的彙總
+    """
+    aggregate_index = AggregateIndex(timeline)
+    day_household_count_list = aggregate_index.get_day_household_count_list()
+    assert len(day_household_count_list) == timeline.day_count
+    assert sum(day_household_count_list) == sum(timeline.household_list)
+
+    rolling_household_count_list = aggregate_index.get_rolling_household_count_list(7)
+    for day_i in [0, 3, 100, timeline.day_count - 1]:
+        assert rolling_household_count_list[day_i] == sum(
+            day_household_count_list[max(day_i - 6, 0):day_i + 1]
+        )
+
+    month_household_count_list = aggregate_index.get_month_household_count_list()
+    assert month_household_count_list[0][0] == timeline.start_date.replace(day=1)
+    assert month_household_count_list[-1][0] == timeline.end_date.replace(day=1)
+    assert sum(
+        household_count
+        for _, household_count in month_household_count_list
+    ) == sum(timeline.household_list)
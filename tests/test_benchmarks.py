@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from benchmarks.run import BENCHMARK_NAME_TO_SETUP_DICT, run_benchmark_suite
+from benchmarks.synthetic import generate_news_dict_list, get_county_name_list
+from libs.news import NewsList
+from libs.reason_emoji import get_reason_emoji
+
+
+def test_generate_news_dict_list_is_seeded_and_valid():
+    """ 測試仿真新聞列表: 相同種子產生相同資料，且格式、縣市名稱與停電原因皆有效
+    """
+    news_dict_list = generate_news_dict_list(scale=0.5, seed=1)
+    assert news_dict_list == generate_news_dict_list(scale=0.5, seed=1)
+    assert news_dict_list != generate_news_dict_list(scale=0.5, seed=2)
+
+    news_list = NewsList.model_validate(news_dict_list).root
+    assert [news.date for news in news_list] == sorted(news.date for news in news_list)
+    county_name_set = set(get_county_name_list())
+    for news in news_list:
+        if news.reason is None:
+            continue
+        assert set(news.locations) <= county_name_set
+        assert get_reason_emoji(news.reason) != ""
+
+
+def test_run_benchmark_suite():
+    """ 測試量測套件可執行並產生每個量測項目的結果
+    """
+    result_dict = run_benchmark_suite(scale_list=[0.1], repeat_count=1)
+    name_set = {
+        _result_dict["name"]
+        for _result_dict in result_dict["result_list"]
+    }
+    assert name_set <= set(BENCHMARK_NAME_TO_SETUP_DICT)
+    assert "simulation.simulate_day" in name_set
+    assert all(
+        _result_dict["min_sec"] >= 0
+        for _result_dict in result_dict["result_list"]
+    )
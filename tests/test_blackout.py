@@ -0,0 +1,75 @@
+import datetime
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.blackout import (BlackoutDecay, BlackoutKeyframeIndex,
+                           get_darkness_ratio)
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+
+
+def test_blackout_decay_closed_form():
+    """ 測試停電比值的疊加上限與線性衰減
+    """
+    blackout_decay = BlackoutDecay(0.2, ["台北市", "高雄市"])
+    blackout_decay.hit("台北市", 0, 0.7)
+    blackout_decay.hit("台北市", 1, 0.7)
+    assert blackout_decay.get_ratio("台北市", 1) == 1.0
+    assert abs(blackout_decay.get_ratio("台北市", 3) - 0.6) < 1e-9
+    assert blackout_decay.get_ratio("台北市", 100) == 0
+    assert blackout_decay.get_ratio("高雄市", 1) == 0
+    assert blackout_decay.get_ratio("金門縣", 1) == 0
+
+
+def test_blackout_decay_hit_city_mask():
+    """ 測試以縣市位元遮罩疊加停電比值，以及移除已淡出的縣市
+    """
+    county_name_list = ["台北市", "高雄市", "花蓮縣"]
+    blackout_decay = BlackoutDecay(0.2, county_name_list)
+    assert blackout_decay.hit_city_mask(0b101, 0, 0.5) == 2
+    assert blackout_decay.hit_city_mask(0b001, 2, 0.5) == 1
+    assert blackout_decay.get_hit_county_i_list() == [0, 2]
+    assert blackout_decay.get_city_to_hit_dict() == {
+        "台北市": (2, 0.6),
+        "花蓮縣": (0, 0.5),
+    }
+
+    keyframe = blackout_decay.copy()
+    blackout_decay.prune(3)
+    assert blackout_decay.get_city_to_ratio_dict(3) == {"台北市": blackout_decay.get_ratio("台北市", 3)}
+    assert keyframe.get_hit_county_i_list() == [0, 2]
+
+    blackout_decay.set_city_to_hit_dict(keyframe.get_city_to_hit_dict())
+    assert blackout_decay.get_city_to_ratio_dict(1) == keyframe.get_city_to_ratio_dict(1)
+
+
+def test_blackout_keyframe_index_matches_full_replay():
+    """ 測試由關鍵影格求得的停電比值與從頭重播的結果一致
+    """
+    timeline = Timeline(
+        json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    )
+    blackout_keyframe_index = BlackoutKeyframeIndex(
+        timeline,
+        keyframe_interval_day_count=7,
+    )
+
+    blackout_decay = BlackoutDecay(
+        blackout_keyframe_index.decay_per_day,
+        timeline.county_name_list,
+    )
+    for day_i in range(timeline.day_count + 10):
+        for event_i in timeline.get_event_index_range(
+            timeline.start_date + datetime.timedelta(days=day_i)
+        ):
+            for city_name in timeline.get_locations(event_i):
+                blackout_decay.hit(
+                    city_name,
+                    day_i,
+                    get_darkness_ratio(timeline.household_list[event_i]),
+                )
+        assert (
+            blackout_keyframe_index.get_city_to_ratio_dict(day_i)
+            == blackout_decay.get_city_to_ratio_dict(day_i)
+        ), day_i
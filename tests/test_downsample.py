@@ -0,0 +1,58 @@
+import datetime
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.aggregate import AggregateIndex
+from libs.downsample import MinMaxPyramid, downsample_lttb
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+
+
+def test_downsample_lttb():
+    """ 測試 LTTB: 點數不超過上限、包含首尾，且保留尖峰
+    """
+    y_list = [0.0] * 1000
+    y_list[321] = 100.0
+    index_list = downsample_lttb(y_list, 50)
+    assert len(index_list) == 50
+    assert index_list[0] == 0 and index_list[-1] == 999
+    assert index_list == sorted(index_list)
+    assert 321 in index_list
+    assert downsample_lttb(y_list[:10], 50) == list(range(10))
+
+
+def test_min_max_pyramid_keeps_extrema():
+    """ 測試 min/max 金字塔: 任意可視範圍的極值皆被保留，且點數不超過上限
+    """
+    _random = random.Random(0)
+    y_list = [_random.randrange(1000) for _ in range(5000)]
+    min_max_pyramid = MinMaxPyramid(y_list)
+    for _ in range(50):
+        start_i = _random.randrange(len(y_list))
+        end_i = _random.randrange(start_i + 1, len(y_list) + 1)
+        max_point_count = _random.randrange(10, 400)
+        index_list = min_max_pyramid.get_index_list(start_i, end_i, max_point_count)
+        assert index_list == sorted(set(index_list))
+        assert all(start_i <= i < end_i for i in index_list)
+        assert len(index_list) <= 2 * max_point_count + 4
+        visible_y_list = y_list[start_i:end_i]
+        assert max(y_list[i] for i in index_list) == max(visible_y_list)
+        assert min(y_list[i] for i in index_list) == min(visible_y_list)
+    assert min_max_pyramid.get_index_list(10, 20, 100) == list(range(10, 20))
+
+
+def test_min_max_pyramid_keeps_household_peaks():
+    """ 測試整條時間軸降採樣至 300 點時，仍保留 2017-08-15 與 2021-05-13 的停電高峰
+    """
+    timeline = Timeline(
+        json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    )
+    min_max_pyramid = MinMaxPyramid(
+        AggregateIndex(timeline).get_day_household_count_list()
+    )
+    index_list = min_max_pyramid.get_index_list(0, timeline.day_count, 300)
+    assert len(index_list) <= 300
+    for date in [datetime.date(2017, 8, 15), datetime.date(2021, 5, 13)]:
+        assert timeline.get_day_index(date) in index_list
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.event_log import EventLog, EventLogRow
+
+
+def test_event_log_is_bounded_and_fills_visible_height():
+    """ 測試事件日誌的容量上限，以及可視列數足以填滿日誌區塊
+    """
+    event_log = EventLog(capacity=50)
+    for row_i in range(1000):
+        event_log.append(
+            EventLogRow.from_event(
+                date_str="2021-05-13",
+                locations=["高雄市"],
+                households=row_i,
+                reason_emoji="🔌",
+                title=f"新聞標題 {row_i}",
+            )
+        )
+    assert len(event_log) == 50
+    assert event_log.version == 1000
+
+    visible_row_list = event_log.get_visible_row_list(height_px=600)
+    assert visible_row_list[-1].title == "新聞標題 999"
+    assert sum(row.min_height_px for row in visible_row_list) >= 600
+    assert sum(row.min_height_px for row in visible_row_list[1:]) < 600
@@ -0,0 +1,50 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.geometry import (GEOJSON_PATH, LOD_NAME_TO_TOLERANCE_PX_DICT,
+                           build_lod_json, get_feature_ring_list_list,
+                           get_lod_json_path, simplify_ring_list)
+
+
+def test_map_lod_json_up_to_date(tmp_path: Path):
+    """ 測試各細節層級的地圖 path 資料是否與 GeoJSON 同步 (若失敗請執行 `python -m libs.geometry`)
+    """
+    geojson_path = tmp_path / GEOJSON_PATH.name
+    geojson_path.write_bytes(GEOJSON_PATH.read_bytes())
+    build_lod_json(geojson_path=geojson_path)
+    for lod_name in LOD_NAME_TO_TOLERANCE_PX_DICT:
+        assert (
+            get_lod_json_path(geojson_path, lod_name).read_text(encoding="utf-8")
+            == get_lod_json_path(GEOJSON_PATH, lod_name).read_text(encoding="utf-8")
+        ), f"地圖資料已過期，請執行 `python -m libs.geometry` 重新產生 ({lod_name})"
+
+
+def test_simplify_ring_list_keeps_shared_borders():
+    """ 測試簡化後，相鄰行政區共用的邊界點在所有共用的環中同時保留或同時捨棄
+    """
+    ring_list = [
+        ring
+        for feature_ring_list in get_feature_ring_list_list(
+            json.loads(GEOJSON_PATH.read_text(encoding="utf-8"))
+        )
+        for ring in feature_ring_list
+    ]
+    simplified_ring_list = simplify_ring_list(ring_list, tolerance=0.01)
+    assert sum(map(len, simplified_ring_list)) < sum(map(len, ring_list))
+
+    point_to_ring_i_set_dict = dict()
+    for ring_i, ring in enumerate(ring_list):
+        for point in ring:
+            point_to_ring_i_set_dict.setdefault(point, set()).add(ring_i)
+    simplified_point_set_list = [
+        set(simplified_ring)
+        for simplified_ring in simplified_ring_list
+    ]
+    for point, ring_i_set in point_to_ring_i_set_dict.items():
+        assert len({
+            point in simplified_point_set_list[ring_i]
+            for ring_i in ring_i_set
+            if simplified_point_set_list[ring_i]
+        }) <= 1, point
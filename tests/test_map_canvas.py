@@ -0,0 +1,50 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.geometry import GEOJSON_PATH, get_lod_json_path
+from libs.map_canvas import (RegionGridIndex, is_bbox_intersected,
+                             merge_bbox_list)
+
+
+def test_merge_bbox_list():
+    """ 測試只合併相交的邊界框 (含合併後才與其他邊界框相交的連鎖合併)
+    """
+    assert merge_bbox_list([]) == []
+    assert merge_bbox_list([[0, 0, 1, 1], [5, 5, 6, 6]]) == [[0, 0, 1, 1], [5, 5, 6, 6]]
+    assert merge_bbox_list([[0, 0, 2, 2], [1, 1, 3, 3]]) == [[0, 0, 3, 3]]
+    assert merge_bbox_list([
+        [0, 0, 2, 2],
+        [4, 0, 6, 2],
+        [1, 0, 5, 1],
+        [10, 10, 11, 11],
+    ]) == [[0, 0, 6, 2], [10, 10, 11, 11]]
+
+
+def test_region_grid_index_matches_linear_scan():
+    """ 測試網格索引查詢的結果與逐一比對所有行政區的邊界框相同
+    """
+    bbox_list = json.loads(
+        get_lod_json_path(GEOJSON_PATH, "low").read_text(encoding="utf-8")
+    )["bbox_list"]
+    region_grid_index = RegionGridIndex(bbox_list, cell_size=37)
+
+    random_ = random.Random(0)
+    for _ in range(200):
+        x, y = random_.uniform(-50, 650), random_.uniform(150, 1050)
+        bbox = [x, y, x + random_.uniform(0, 120), y + random_.uniform(0, 120)]
+        assert region_grid_index.get_region_i_list(bbox) == [
+            region_i
+            for region_i, region_bbox in enumerate(bbox_list)
+            if is_bbox_intersected(region_bbox, bbox)
+        ]
+
+    dirty_bbox_list = region_grid_index.get_dirty_bbox_list([0, 1])
+    for region_i in (0, 1):
+        assert any(
+            dirty_bbox[0] < bbox_list[region_i][0] and bbox_list[region_i][2] < dirty_bbox[2]
+            and dirty_bbox[1] < bbox_list[region_i][1] and bbox_list[region_i][3] < dirty_bbox[3]
+            for dirty_bbox in dirty_bbox_list
+        )
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.near_duplicate import (get_near_duplicate_cluster_list,
+                                 merge_near_duplicate_news_dict_list)
+
+
+def test_near_duplicate_cluster_within_date_window():
+    """ 測試不同媒體的近似標題會被分為同一組，且日期相距超出視窗者不會被合併
+    """
+    news_dict_list = [
+        {"date": "2024-06-18", "title": "內科一帶655戶停電台電：饋線跳脫導致已全數復電| 生活 - 中央社即時新聞", "households": None},
+        {"date": "2024-06-18", "title": "內科一帶655戶停電 台電：饋線跳脫導致、已全數復電 - Yahoo奇摩新聞", "households": 655},
+        {"date": "2024-06-19", "title": "高雄前金區地下變壓器故障899戶無預警停電 - Yahoo奇摩新聞", "households": None},
+        {"date": "2024-09-18", "title": "內科一帶655戶停電 台電：饋線跳脫導致、已全數復電 - 聯合新聞網", "households": None},
+    ]
+    near_duplicate_cluster_list = get_near_duplicate_cluster_list(news_dict_list)
+    assert near_duplicate_cluster_list == [[0, 1]]
+    assert merge_near_duplicate_news_dict_list(
+        news_dict_list,
+        near_duplicate_cluster_list,
+    ) == news_dict_list[1:]
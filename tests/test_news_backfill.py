@@ -0,0 +1,188 @@
+import datetime
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from gnews.exceptions import NetworkError
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs import news as news_module
+from libs.news import News, backfill_news_list_json
+from libs.news_cache import NewsCacheMissError
+from libs.news_store import read_news_dict_list
+
+
+def test_backfill_news_list_json_resumes_from_checkpoint(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """ 測試回填中斷後可從進度檔續傳，且合併結果依月份順序去除重複標題
+    """
+    news_list_json_path = tmp_path / "news_list.json"
+    news_list_json_path.write_text("[]", encoding="utf-8")
+    checkpoint_json_path = tmp_path / "checkpoint.json"
+    monkeypatch.setattr(news_module, "NEWS_LIST_JSON_PATH", news_list_json_path)
+    monkeypatch.setattr(time, "sleep", lambda sec: None)
+
+    fetched_year_month_list = list[tuple[int, int]]()
+
+    def get_news_list(year_int: int, month_int: int) -> list[News]:
+        fetched_year_month_list.append((year_int, month_int))
+        if (year_int, month_int) == (2021, 6) and is_june_broken:
+            raise ConnectionError("連線失敗")
+        return [
+            News(
+                date=datetime.date(year_int, month_int, 1),
+                title=f"{month_int}月停電",
+                url=f"https://example.com/{month_int}",
+            ),
+            News(
+                date=datetime.date(year_int, month_int, 2),
+                title="重複的標題",
+                url=f"https://example.com/{month_int}/duplicate",
+            ),
+        ]
+    monkeypatch.setattr(news_module, "get_news_list", get_news_list)
+
+    # 第一次執行: 6 月持續失敗，其他月份記錄於進度檔
+    is_june_broken = True
+    backfill_news_list_json(
+        (2021, 4), (2021, 6),
+        checkpoint_json_path=checkpoint_json_path,
+    )
+    assert json.loads(news_list_json_path.read_text(encoding="utf-8")) == []
+    assert set(json.loads(checkpoint_json_path.read_text(encoding="utf-8"))) == {
+        "2021-04", "2021-05",
+    }
+
+    # 第二次執行: 只爬取尚未完成的 6 月
+    is_june_broken = False
+    fetched_year_month_list.clear()
+    backfill_news_list_json(
+        (2021, 4), (2021, 6),
+        checkpoint_json_path=checkpoint_json_path,
+    )
+    assert fetched_year_month_list == [(2021, 6)]
+    assert not checkpoint_json_path.exists()
+    assert [
+        (news_dict["date"], news_dict["title"])
+        for news_dict in read_news_dict_list(news_list_json_path)
+    ] == [
+        ("2021-04-01", "4月停電"),
+        ("2021-04-02", "重複的標題"),
+        ("2021-05-01", "5月停電"),
+        ("2021-06-01", "6月停電"),
+    ]
+
+
+def test_get_raw_news_dict_list_adaptively_splits_saturated_windows(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """ 測試查詢結果飽和的區間會被遞迴切分，且合併後的新聞不重複也不遺漏
+    """
+    # 模擬每天 10 則新聞，查詢結果最多返回前 GNEWS_MAX_RESULT_COUNT 則
+    def get_raw_news_dict_list(
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> list[dict]:
+        return [
+            {"title": f"{start_date + datetime.timedelta(days=day_i)} 停電 {news_i}"}
+            for day_i in range((end_date - start_date).days + 1)
+            for news_i in range(10)
+        ][:news_module.GNEWS_MAX_RESULT_COUNT]
+    monkeypatch.setattr(
+        news_module,
+        "get_raw_news_dict_list",
+        get_raw_news_dict_list,
+    )
+
+    raw_news_dict_list = news_module.get_raw_news_dict_list_adaptively(
+        datetime.date(2021, 5, 1),
+        datetime.date(2021, 5, 31),
+    )
+    title_list = [
+        raw_news_dict["title"]
+        for raw_news_dict in raw_news_dict_list
+    ]
+    assert len(title_list) == len(set(title_list)) == 31 * 10
+
+
+def test_retry_with_backoff_only_retries_transient_errors(monkeypatch: pytest.MonkeyPatch):
+    """ 測試只重試暫時性的網路錯誤，快取未命中與驗證失敗則立即拋出
+    """
+    sleep_sec_list = list[float]()
+    monkeypatch.setattr(time, "sleep", sleep_sec_list.append)
+
+    attempt_count = 0
+
+    def flaky_func() -> str:
+        nonlocal attempt_count
+        attempt_count += 1
+        if attempt_count < 3:
+            raise ConnectionError("連線失敗")
+        return "ok"
+    assert news_module.retry_with_backoff(flaky_func) == "ok"
+    assert sleep_sec_list == [2.0, 4.0]
+
+    sleep_sec_list.clear()
+    for error in [
+        NewsCacheMissError("離線模式下未命中快取"),
+        ValueError("無效的新聞"),
+    ]:
+        def failing_func():
+            raise error
+        with pytest.raises(type(error)):
+            news_module.retry_with_backoff(failing_func)
+    assert sleep_sec_list == []
+
+
+def test_backfill_news_list_json_keeps_errored_month_pending(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """ 測試 GNews 拋出的暫時性錯誤會被重試，且持續失敗的月份不記錄於進度檔 (續傳時重新爬取)
+    """
+    news_list_json_path = tmp_path / "news_list.json"
+    news_list_json_path.write_text("[]", encoding="utf-8")
+    checkpoint_json_path = tmp_path / "checkpoint.json"
+    monkeypatch.setattr(news_module, "NEWS_LIST_JSON_PATH", news_list_json_path)
+    monkeypatch.setattr(time, "sleep", lambda sec: None)
+    monkeypatch.setattr(
+        news_module,
+        "get_cached_raw_news_dict_list",
+        lambda request_dict, end_date, fetch_raw_news_dict_list: fetch_raw_news_dict_list(),
+    )
+    monkeypatch.setattr(
+        news_module.HOST_TO_RATE_LIMITER_DICT["news.google.com"],
+        "wait",
+        lambda: None,
+    )
+
+    start_date_list = list[datetime.date]()
+
+    class FakeGNews:
+        def __init__(self, start_date: datetime.date, **kwargs) -> None:
+            self.start_date = start_date
+
+        def get_news(self, query_str: str) -> list[dict]:
+            start_date_list.append(self.start_date)
+            if self.start_date.month == 6:
+                raise NetworkError("Failed to fetch or parse news feed")
+            return [{
+                "title": f"{self.start_date.month}月停電",
+                "published date": f"{self.start_date:%a, %d %b %Y} 00:00:00 GMT",
+                "url": f"https://example.com/{self.start_date.month}",
+            }]
+    monkeypatch.setattr(news_module, "GNews", FakeGNews)
+
+    backfill_news_list_json(
+        (2021, 5), (2021, 6),
+        checkpoint_json_path=checkpoint_json_path,
+    )
+    assert start_date_list.count(datetime.date(2021, 6, 1)) == 5
+    assert set(json.loads(checkpoint_json_path.read_text(encoding="utf-8"))) == {
+        "2021-05",
+    }
+    assert json.loads(news_list_json_path.read_text(encoding="utf-8")) == []
@@ -0,0 +1,61 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.news_cache import (CURRENT_WINDOW_TTL_SEC, PAST_WINDOW_TTL_SEC,
+                             NewsCacheMissError, get_cached_raw_news_dict_list,
+                             get_news_cache_ttl_sec)
+
+
+def test_news_cache_replays_offline(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """ 測試查詢結果寫入快取後可離線重播，且離線模式未命中快取時拋出例外
+    """
+    request_dict = {"query": "停電", "start_date": "2021-05-01"}
+    end_date = datetime.date(2021, 5, 31)
+    fetch_count_list = [0]
+
+    def fetch_raw_news_dict_list() -> list[dict]:
+        fetch_count_list[0] += 1
+        return [{"title": "停電"}]
+
+    for news_cache_mode in ["online", "online", "offline"]:
+        monkeypatch.setenv("NEWS_CACHE_MODE", news_cache_mode)
+        assert get_cached_raw_news_dict_list(
+            request_dict,
+            end_date,
+            fetch_raw_news_dict_list,
+            news_cache_dir_path=tmp_path,
+        ) == [{"title": "停電"}]
+    assert fetch_count_list == [1]
+
+    monkeypatch.setenv("NEWS_CACHE_MODE", "refresh")
+    get_cached_raw_news_dict_list(
+        request_dict,
+        end_date,
+        fetch_raw_news_dict_list,
+        news_cache_dir_path=tmp_path,
+    )
+    assert fetch_count_list == [2]
+
+    monkeypatch.setenv("NEWS_CACHE_MODE", "offline")
+    with pytest.raises(NewsCacheMissError):
+        get_cached_raw_news_dict_list(
+            {**request_dict, "start_date": "2021-05-02"},
+            end_date,
+            fetch_raw_news_dict_list,
+            news_cache_dir_path=tmp_path,
+        )
+
+
+def test_news_cache_ttl_sec():
+    """ 測試已結束月份的查詢結果有效期限較長
+    """
+    today = datetime.date(2024, 7, 18)
+    assert get_news_cache_ttl_sec(datetime.date(2024, 6, 30), today) == PAST_WINDOW_TTL_SEC
+    assert get_news_cache_ttl_sec(datetime.date(2024, 7, 1), today) == CURRENT_WINDOW_TTL_SEC
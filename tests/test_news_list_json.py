@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))  # noqa
-from libs.news import NEWS_LIST_JSON_PATH, NewsList
+from libs.news import load_news_list
 from libs.reason_emoji import get_reason_emoji
 
 
@@ -12,9 +12,7 @@ def test_news_list_json_locations():
     """
 
     # 讀取現有的新聞列表資料中的縣市名稱
-    news_list = NewsList.model_validate_json(
-        NEWS_LIST_JSON_PATH.read_text(encoding="utf-8")
-    ).root
+    news_list = load_news_list()
     news_list_city_name_set: set[str] = {
         city_name
         for news in news_list
@@ -43,12 +41,65 @@ def test_news_list_json_reason_emoji():
     """
 
     # 讀取現有的新聞列表資料中的縣市名稱
-    news_list = NewsList.model_validate_json(
-        NEWS_LIST_JSON_PATH.read_text(encoding="utf-8")
-    ).root
+    news_list = load_news_list()
 
     for news in news_list:
         if news.reason is None:
             continue
         reason_emoji = get_reason_emoji(news.reason)
         assert reason_emoji != "", f"此停電原因沒有對應的 emoji: {news.reason} ({news.date=}, {news.title=})"
+
+
+def test_load_news_list_snapshot(tmp_path: Path):
+    """ 測試新聞列表快照: 內容未變動時直接使用快照，只重新驗證變動的記錄
+    """
+    news_dict_list = [
+        {
+            "date": f"2024-01-0{day}",
+            "title": f"停電新聞 {day}",
+            "url": f"https://example.com/{day}",
+            "households": None,
+            "reason": None,
+            "locations": None,
+        }
+        for day in range(1, 4)
+    ]
+    news_list_json_path = tmp_path / "news_list.json"
+    news_list_snapshot_path = tmp_path / "news_list.snapshot.pickle"
+    news_list_json_path.write_text(json.dumps(news_dict_list), encoding="utf-8")
+
+    news_list = load_news_list(news_list_json_path, news_list_snapshot_path)
+    assert [news.title for news in news_list] == [
+        news_dict["title"] for news_dict in news_dict_list
+    ]
+    assert news_list_snapshot_path.exists()
+    assert load_news_list(news_list_json_path, news_list_snapshot_path) == news_list
+
+    # 修改一筆記錄: 只重新驗證變動的記錄
+    news_dict_list[1]["households"] = 100
+    news_list_json_path.write_text(json.dumps(news_dict_list), encoding="utf-8")
+    updated_news_list = load_news_list(news_list_json_path, news_list_snapshot_path)
+    assert updated_news_list[1].households == 100
+
+    # 延遲驗證
+    news_dict_list.append({**news_dict_list[0], "title": "停電新聞 4"})
+    news_list_json_path.write_text(json.dumps(news_dict_list), encoding="utf-8")
+    lazy_news_list = load_news_list(
+        news_list_json_path,
+        news_list_snapshot_path,
+        lazy=True,
+    )
+    assert len(lazy_news_list) == 4
+    assert lazy_news_list[-1].title == "停電新聞 4"
+    assert [news.title for news in lazy_news_list[:2]] == ["停電新聞 1", "停電新聞 2"]
+
+    # 日誌中尚未壓實的新聞
+    journal_jsonl_path = tmp_path / "news_list.journal.jsonl"
+    journal_jsonl_path.write_text(
+        json.dumps({**news_dict_list[0], "title": "停電新聞 5"}) + "\n",
+        encoding="utf-8",
+    )
+    news_list = load_news_list(news_list_json_path, news_list_snapshot_path)
+    assert sorted(news.title for news in news_list) == [
+        f"停電新聞 {day}" for day in range(1, 6)
+    ]
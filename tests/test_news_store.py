@@ -0,0 +1,123 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.news_store import (COMPACT_JOURNAL_RECORD_COUNT, NewsStore,
+                             read_news_dict_list, write_text_atomic)
+
+
+def get_news_dict(date_str: str, title: str, households: int | None = None) -> dict:
+    return {
+        "date": date_str,
+        "title": title,
+        "url": f"https://example.com/{title}",
+        "households": households,
+        "locations": None,
+        "reason": None,
+    }
+
+
+def test_news_store_appends_to_journal_and_compacts(tmp_path: Path):
+    """ 測試新聞先追加至日誌 (不改寫新聞列表)，壓實後才依日期合併回新聞列表
+    """
+    news_list_json_path = tmp_path / "news_list.json"
+    news_list_json_path.write_text(
+        json.dumps([get_news_dict("2021-05-13", "513停電")], ensure_ascii=False, indent=4),
+        encoding="utf-8",
+    )
+    news_list_json_text = news_list_json_path.read_text(encoding="utf-8")
+
+    news_store = NewsStore(news_list_json_path)
+    assert news_store.append([
+        get_news_dict("2021-05-17", "517停電"),
+        get_news_dict("2021-05-13", "513停電"),
+        get_news_dict("2017-08-15", "815停電"),
+        get_news_dict("2017-08-15", "815停電"),
+    ]) == [
+        get_news_dict("2021-05-17", "517停電"),
+        get_news_dict("2017-08-15", "815停電"),
+    ]
+    news_store.upsert([get_news_dict("2021-05-13", "513停電", households=4_000_000)])
+    assert news_list_json_path.read_text(encoding="utf-8") == news_list_json_text
+
+    # 重新開啟時沿用持久化的索引
+    news_store = NewsStore(news_list_json_path)
+    assert news_store.journal_record_count == 3
+    assert news_store.append([get_news_dict("2021-05-17", "517停電")]) == []
+
+    news_store.compact()
+    assert not news_store.journal_jsonl_path.exists()
+    assert json.loads(news_list_json_path.read_text(encoding="utf-8")) == [
+        get_news_dict("2017-08-15", "815停電"),
+        get_news_dict("2021-05-13", "513停電", households=4_000_000),
+        get_news_dict("2021-05-17", "517停電"),
+    ]
+
+
+def test_write_text_atomic_from_threads(tmp_path: Path):
+    """ 測試多個執行緒同時寫入同一檔案時，結果為其中一次完整的寫入，且不殘留暫存檔
+    """
+    json_path = tmp_path / "cache.json"
+    text_list = [json.dumps({"thread_i": thread_i, "data": "x" * 100_000}) for thread_i in range(8)]
+    thread_list = [
+        threading.Thread(target=lambda text=text: [write_text_atomic(json_path, text) for _ in range(5)])
+        for text in text_list
+    ]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+    assert json_path.read_text(encoding="utf-8") in text_list
+    assert [path.name for path in tmp_path.iterdir()] == ["cache.json"]
+
+
+def test_news_store_rewrite_rebuilds_index(tmp_path: Path):
+    """ 測試改寫整份新聞列表後清空日誌，且移除的新聞可再次追加
+    """
+    news_list_json_path = tmp_path / "news_list.json"
+    news_list_json_path.write_text("[]", encoding="utf-8")
+    news_store = NewsStore(news_list_json_path)
+    news_store.append([
+        get_news_dict("2021-05-13", "513停電"),
+        get_news_dict("2021-05-13", "513大停電"),
+    ])
+    news_store.compact()
+
+    news_store.rewrite([get_news_dict("2021-05-13", "513停電")])
+    assert not news_store.journal_jsonl_path.exists()
+    news_store = NewsStore(news_list_json_path)
+    assert news_store.contains(get_news_dict("2021-05-13", "513停電"))
+    assert not news_store.contains(get_news_dict("2021-05-13", "513大停電"))
+
+
+def test_news_store_compacts_only_past_threshold(tmp_path: Path):
+    """ 測試少量追加不改寫新聞列表 (讀取者經由日誌即可讀到)，日誌筆數達到門檻時才壓實
+    """
+    news_list_json_path = tmp_path / "news_list.json"
+    news_list_json_path.write_text(
+        json.dumps([get_news_dict("2021-05-13", "513停電")], ensure_ascii=False, indent=4),
+        encoding="utf-8",
+    )
+    news_list_json_stat = news_list_json_path.stat()
+
+    news_store = NewsStore(news_list_json_path)
+    news_store.append([get_news_dict("2017-08-15", "815停電")])
+    news_store.compact_if_needed()
+    assert news_list_json_path.stat().st_mtime_ns == news_list_json_stat.st_mtime_ns
+    assert news_store.journal_jsonl_path.exists()
+    assert read_news_dict_list(news_list_json_path) == [
+        get_news_dict("2017-08-15", "815停電"),
+        get_news_dict("2021-05-13", "513停電"),
+    ]
+
+    news_store.append([
+        get_news_dict("2020-01-01", f"停電 {news_i}")
+        for news_i in range(COMPACT_JOURNAL_RECORD_COUNT)
+    ])
+    news_store.compact_if_needed()
+    assert not news_store.journal_jsonl_path.exists()
+    assert len(json.loads(news_list_json_path.read_text(encoding="utf-8"))) == (
+        COMPACT_JOURNAL_RECORD_COUNT + 2
+    )
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.playback_clock import MAX_FRAME_SEC, PlaybackClock
+
+
+def test_playback_clock_batches_days_by_elapsed_time():
+    """ 測試播放位置依實際經過的時間推進，且同一影格經過的天數一次返回
+    """
+    playback_clock = PlaybackClock(per_sec_day_count=8)
+    assert playback_clock.tick(1.0, 100) == range(0)
+
+    playback_clock.play(10, now_sec=1.0)
+    assert playback_clock.tick(1.0625, 100) == range(0)
+    assert playback_clock.tick(1.125, 100) == range(11, 12)
+    assert playback_clock.tick(1.25, 100) == range(12, 13)
+
+    # 變更速度前經過的時間仍以原本的速度推進
+    playback_clock.set_speed(64, now_sec=1.3125)
+    assert playback_clock.tick(1.375, 100) == range(13, 17)
+
+    # 單一影格最多推進 MAX_FRAME_SEC 秒 (超出的時間於之後的影格追上)
+    assert playback_clock.tick(60.0, 100) == range(17, 17 + int(MAX_FRAME_SEC * 64))
+
+    # 播放至最後一天時停止
+    assert playback_clock.tick(60.25, 40) == range(17 + int(MAX_FRAME_SEC * 64), 41)
+    assert not playback_clock.is_playing
+    assert playback_clock.tick(60.5, 40) == range(0)
+
+
+def test_playback_clock_pause_and_seek():
+    """ 測試暫停期間不推進，跳轉後自新的位置繼續播放
+    """
+    playback_clock = PlaybackClock(per_sec_day_count=1)
+    playback_clock.play(0, now_sec=0.0)
+    assert playback_clock.tick(0.25, 10) == range(0)
+    playback_clock.pause()
+    assert playback_clock.tick(5.0, 10) == range(0)
+
+    playback_clock.play(5, now_sec=5.0)
+    assert playback_clock.tick(5.25, 10) == range(0)
+    assert playback_clock.tick(5.5, 10) == range(0)
+    assert playback_clock.tick(5.75, 10) == range(0)
+    assert playback_clock.tick(6.0, 10) == range(6, 7)
+
+
+def test_playback_clock_catches_up_after_long_frame():
+    """ 測試超過單一影格上限的時間不會被捨棄: 耗時 1 秒的影格以 30 倍速播放，之後的影格共推進 30 天
+    """
+    playback_clock = PlaybackClock(per_sec_day_count=30)
+    playback_clock.play(0, now_sec=0.0)
+    day_i_list = list[int]()
+    day_i_list.extend(playback_clock.tick(1.0, 1000))
+    assert day_i_list == list(range(1, int(MAX_FRAME_SEC * 30) + 1))
+    while len(day_i_list) < 30:
+        day_range = playback_clock.tick(1.0, 1000)
+        assert 0 < len(day_range) <= MAX_FRAME_SEC * 30 + 1
+        day_i_list.extend(day_range)
+    assert day_i_list == list(range(1, 31))
+    assert playback_clock.tick(1.0, 1000) == range(0)
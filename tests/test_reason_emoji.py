@@ -0,0 +1,54 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.news import NEWS_LIST_JSON_PATH
+from libs.reason_emoji import (EMOJI_TO_KW_LIST_DICT, get_reason_emoji,
+                               get_reason_emoji_list)
+
+
+def get_reason_emoji_by_linear_scan(reason: str) -> str:
+    """ 逐一比對關鍵字的參考實作 """
+    for reason_emoji, reason_kw_str_list in EMOJI_TO_KW_LIST_DICT.items():
+        if any(
+            reason_kw_str in reason
+            for reason_kw_str in reason_kw_str_list
+        ):
+            return reason_emoji
+    return ""
+
+
+def test_reason_emoji_matches_linear_scan():
+    """ 測試預先編譯的比對結果與逐一比對關鍵字 (先符合的 emoji 優先) 一致
+    """
+    reason_list = [
+        news_dict["reason"]
+        for news_dict in json.loads(
+            NEWS_LIST_JSON_PATH.read_text(encoding="utf-8")
+        )
+        if news_dict["reason"] is not None
+    ]
+    # 追加關鍵字彼此重疊或相鄰的停電原因
+    reason_kw_str_list = [
+        reason_kw_str
+        for reason_kw_str_list in EMOJI_TO_KW_LIST_DICT.values()
+        for reason_kw_str in reason_kw_str_list
+    ]
+    reason_list += reason_kw_str_list
+    reason_list += [
+        reason_kw_str_a + reason_kw_str_b
+        for reason_kw_str_a in reason_kw_str_list
+        for reason_kw_str_b in reason_kw_str_list
+    ]
+    reason_list += ["", "原因不明人士", "颱風吹倒路樹", "無關的原因"]
+
+    expected_reason_emoji_list = [
+        get_reason_emoji_by_linear_scan(reason)
+        for reason in reason_list
+    ]
+    assert [
+        get_reason_emoji(reason)
+        for reason in reason_list
+    ] == expected_reason_emoji_list
+    assert get_reason_emoji_list(reason_list) == expected_reason_emoji_list
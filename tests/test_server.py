@@ -0,0 +1,129 @@
+import gzip
+import http.client
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.server import (IMMUTABLE_CACHE_CONTROL_STR, create_server,
+                         parse_range, precompress_site, select_encoding)
+
+
+@pytest.fixture
+def server_port(tmp_path: Path):
+    """ 於背景執行緒啟動伺服器 (網站內容: 可壓縮的 JSON、音效檔與含雜湊值的檔名) """
+    (tmp_path / "index.html").write_text("<html>" + "停電" * 1000 + "</html>", encoding="utf-8")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "timeline.json").write_text("[" + "1," * 5000 + "1]", encoding="utf-8")
+    (tmp_path / "audio.mp3").write_bytes(bytes(range(256)) * 4)
+    (tmp_path / "app.3f9a2c1b.js").write_text("console.log(1);" * 100, encoding="utf-8")
+    assert precompress_site(tmp_path) == 3
+    assert precompress_site(tmp_path) == 0
+
+    server = create_server(tmp_path, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def request(port: int, method: str, path: str, header_dict: dict | None = None):
+    """ 發送請求並回傳 (回應, 內容) """
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request(method, path, headers=header_dict or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_server_gzip_etag_and_cache_control(server_port: int, tmp_path: Path):
+    """ 測試壓縮格式協商、強 ETag 與 304 回應
+    """
+    data = (tmp_path / "data" / "timeline.json").read_bytes()
+    response, body = request(server_port, "GET", "/data/timeline.json", {"Accept-Encoding": "gzip, deflate"})
+    assert response.status == 200
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert response.getheader("Cache-Control") == "no-cache"
+    assert response.getheader("Content-Type") == "application/json; charset=utf-8"
+    assert len(body) < len(data) / 10
+    assert gzip.decompress(body) == data
+    gzip_etag = response.getheader("ETag")
+
+    response, body = request(server_port, "GET", "/data/timeline.json")
+    assert response.getheader("Content-Encoding") is None
+    assert body == data
+    assert response.getheader("ETag") != gzip_etag
+
+    response, body = request(server_port, "GET", "/data/timeline.json", {
+        "Accept-Encoding": "gzip",
+        "If-None-Match": gzip_etag,
+    })
+    assert response.status == 304
+    assert body == b""
+    assert response.getheader("ETag") == gzip_etag
+
+    response, body = request(server_port, "GET", "/", {"Accept-Encoding": "gzip;q=0"})
+    assert response.status == 200
+    assert response.getheader("Content-Encoding") is None
+    assert body == (tmp_path / "index.html").read_bytes()
+
+    response, _ = request(server_port, "HEAD", "/app.3f9a2c1b.js")
+    assert response.getheader("Cache-Control") == IMMUTABLE_CACHE_CONTROL_STR
+
+    response, _ = request(server_port, "GET", "/missing.json")
+    assert response.status == 404
+
+    # 解析後位於網站根目錄之外的符號連結
+    outside_path = tmp_path.parent / f"{tmp_path.name}_outside.json"
+    outside_path.write_text("{}", encoding="utf-8")
+    (tmp_path / "outside.json").symlink_to(outside_path)
+    response, _ = request(server_port, "GET", "/outside.json")
+    assert response.status == 404
+
+
+def test_server_range_request(server_port: int, tmp_path: Path):
+    """ 測試位元組範圍請求與 If-Range
+    """
+    data = (tmp_path / "audio.mp3").read_bytes()
+    response, body = request(server_port, "GET", "/audio.mp3", {"Range": "bytes=100-199"})
+    assert response.status == 206
+    assert response.getheader("Content-Range") == f"bytes 100-199/{len(data)}"
+    assert response.getheader("Content-Type") == "audio/mpeg"
+    assert body == data[100:200]
+    etag = response.getheader("ETag")
+
+    response, body = request(server_port, "GET", "/audio.mp3", {"Range": "bytes=-24", "If-Range": etag})
+    assert response.status == 206
+    assert body == data[-24:]
+
+    response, body = request(server_port, "GET", "/audio.mp3", {"Range": "bytes=0-", "If-Range": '"stale"'})
+    assert response.status == 200
+    assert body == data
+
+    response, _ = request(server_port, "GET", "/audio.mp3", {"Range": f"bytes={len(data)}-"})
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(data)}"
+
+
+def test_parse_range_and_select_encoding():
+    """ 測試 Range 標頭的解析與 Accept-Encoding 的協商
+    """
+    assert parse_range("bytes=0-9", 100) == (0, 10)
+    assert parse_range("bytes=90-200", 100) == (90, 100)
+    assert parse_range("bytes=-10", 100) == (90, 100)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    assert parse_range("bytes=a-b", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+    assert select_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert select_encoding("gzip, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert select_encoding("*", ["gzip"]) == "gzip"
+    assert select_encoding("identity", ["br", "gzip"]) is None
+    assert select_encoding("", ["gzip"]) is None
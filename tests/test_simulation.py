@@ -0,0 +1,163 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.blackout import BlackoutKeyframeIndex
+from libs.event_log import EventLog, EventLogRow
+from libs.playback_clock import PlaybackClock
+from libs.simulation import (BlackoutSimulation, BlackoutSimulationDiffer,
+                             get_city_ratio_list_list, get_city_ratio_matrix)
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+
+
+@pytest.fixture(scope="module")
+def timeline() -> Timeline:
+    return Timeline(
+        json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    )
+
+
+def test_city_ratio_list_list_matches_keyframe_index(timeline: Timeline):
+    """ 測試參考實作每天結束時的停電比值與關鍵影格索引一致
+    """
+    blackout_keyframe_index = BlackoutKeyframeIndex(timeline)
+    city_ratio_list_list = get_city_ratio_list_list(timeline)
+    for day_i in range(0, timeline.day_count, 13):
+        city_to_ratio_dict = blackout_keyframe_index.get_city_to_ratio_dict(day_i)
+        assert city_ratio_list_list[day_i] == [
+            city_to_ratio_dict.get(county_name, 0)
+            for county_name in timeline.county_name_list
+        ], day_i
+
+
+@pytest.mark.parametrize("frame_per_day_count", [1, 4])
+def test_city_ratio_matrix_is_bit_identical(
+    timeline: Timeline,
+    frame_per_day_count: int,
+):
+    """ 測試 NumPy 向量化的結果與純 Python 參考實作逐位元相同
+    """
+    pytest.importorskip("numpy")
+    city_ratio_matrix = get_city_ratio_matrix(timeline, frame_per_day_count)
+    city_ratio_list_list = get_city_ratio_list_list(timeline, frame_per_day_count)
+    assert city_ratio_matrix.shape == (
+        len(city_ratio_list_list),
+        len(timeline.county_name_list),
+    )
+    assert [
+        [float(ratio).hex() for ratio in city_ratio_list]
+        for city_ratio_list in city_ratio_matrix.tolist()
+    ] == [
+        [float(ratio).hex() for ratio in city_ratio_list]
+        for city_ratio_list in city_ratio_list_list
+    ]
+
+
+def test_blackout_simulation_simulate_day_and_seek(timeline: Timeline):
+    """ 測試即時模擬: 疊加當天事件、追加事件日誌，以及跳轉後的狀態
+    """
+    blackout_simulation = BlackoutSimulation(timeline)
+    day_i = timeline.day_list[0]
+    event_count = len(timeline.get_event_index_range(timeline.start_date))
+
+    darkness_ratio_list = blackout_simulation.simulate_day(day_i)
+    assert len(darkness_ratio_list) >= event_count
+    assert len(blackout_simulation.event_log.row_deque) == event_count
+    assert blackout_simulation.is_active
+    assert all(blackout_simulation.get_city_to_color_index_dict(day_i).values())
+
+    # 淡出後所有縣市皆被移除
+    blackout_simulation.get_city_to_color_index_dict(day_i + 1000)
+    assert not blackout_simulation.is_active
+
+    # 跳轉: 狀態等同於關鍵影格索引於前一天結束時的停電比值
+    blackout_simulation.seek(day_i + 1)
+    assert blackout_simulation.blackout_decay.get_city_to_ratio_dict(day_i) == (
+        blackout_simulation.blackout_keyframe_index.get_city_to_ratio_dict(day_i)
+    )
+    assert blackout_simulation.simulate_day(timeline.day_count) == []
+
+
+def test_blackout_simulation_differ(timeline: Timeline):
+    """ 測試逐影格差異: 依序套用差異後的地圖與日誌，與直接讀取模擬狀態的結果相同
+    """
+    blackout_simulation = BlackoutSimulation(timeline)
+    blackout_simulation_differ = BlackoutSimulationDiffer(
+        BlackoutSimulation(timeline, event_log=EventLog(capacity=5))
+    )
+    rendered_city_to_color_index_dict = dict[str, int]()
+    rendered_event_log = EventLog(capacity=5)
+
+    blackout_simulation.seek(2000)
+    blackout_simulation_differ.seek(2000)
+    for frame_i in range(400):
+        t = 2000 + frame_i / 2
+        if frame_i % 2 == 0 and frame_i < 300:
+            darkness_ratio_list = blackout_simulation.simulate_day(2000 + frame_i // 2)
+            blackout_simulation_differ.simulate_day(2000 + frame_i // 2)
+        else:
+            darkness_ratio_list = []
+
+        frame_diff_dict = blackout_simulation_differ.get_frame_diff_dict(t)
+        for city_name, color_i in frame_diff_dict["city_to_color_index_dict"].items():
+            assert rendered_city_to_color_index_dict.get(city_name, 0) != color_i
+            rendered_city_to_color_index_dict[city_name] = color_i
+        for row_tuple in frame_diff_dict["row_tuple_list"]:
+            rendered_event_log.append(EventLogRow(*row_tuple))
+
+        assert frame_diff_dict["darkness_ratio_list"] == darkness_ratio_list
+        assert {
+            city_name: color_i
+            for city_name, color_i in rendered_city_to_color_index_dict.items()
+            if color_i
+        } == {
+            city_name: color_i
+            for city_name, color_i in blackout_simulation.get_city_to_color_index_dict(t).items()
+            if color_i
+        }
+        assert list(rendered_event_log.row_deque) == list(blackout_simulation.event_log.row_deque)[-5:]
+        assert frame_diff_dict["is_active"] == blackout_simulation.is_active
+    assert not blackout_simulation.is_active
+
+
+@pytest.mark.parametrize("per_sec_day_count", [7, 365])
+def test_blackout_simulation_seek_matches_playback(
+    timeline: Timeline,
+    per_sec_day_count: int,
+):
+    """ 測試以非預設的播放速度連續播放後，跳轉至同一天的地圖與連續播放的結果相同
+    (衰減以模擬天數計算，與播放速度無關)
+    """
+    playback_clock = PlaybackClock(per_sec_day_count)
+    blackout_simulation = BlackoutSimulation(timeline)
+    blackout_simulation.seek(2000)
+    blackout_simulation.simulate_day(2000)
+    playback_clock.play(2000, now_sec=0.0)
+    now_sec = 0.0
+    while playback_clock.day_i < 2300:
+        now_sec += 1 / 60
+        for day_i in playback_clock.tick(now_sec, timeline.day_count):
+            blackout_simulation.simulate_day(day_i)
+        city_to_color_index_dict = blackout_simulation.get_city_to_color_index_dict(
+            playback_clock.position
+        )
+
+    seeked_blackout_simulation = BlackoutSimulation(timeline)
+    seeked_blackout_simulation.seek(playback_clock.day_i)
+    seeked_blackout_simulation.simulate_day(playback_clock.day_i)
+    seeked_city_to_color_index_dict = seeked_blackout_simulation.get_city_to_color_index_dict(
+        playback_clock.position
+    )
+    assert {
+        city_name: color_i
+        for city_name, color_i in seeked_city_to_color_index_dict.items()
+        if color_i
+    } == {
+        city_name: color_i
+        for city_name, color_i in city_to_color_index_dict.items()
+        if color_i
+    }
+    assert any(seeked_city_to_color_index_dict.values())
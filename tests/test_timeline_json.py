@@ -0,0 +1,86 @@
+import datetime
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.blackout import BlackoutKeyframeIndex
+from libs.news import NEWS_LIST_JSON_PATH
+from libs.timeline import TIMELINE_JSON_PATH, Timeline, build_timeline_json
+
+
+def test_timeline_json_up_to_date(tmp_path: Path):
+    """ 測試時間軸資料包是否與新聞列表資料同步 (若失敗請執行 `python -m libs.timeline`)
+    """
+    timeline_json_path = tmp_path / "timeline.json"
+    build_timeline_json(timeline_json_path=timeline_json_path)
+    assert (
+        timeline_json_path.read_text(encoding="utf-8")
+        == TIMELINE_JSON_PATH.read_text(encoding="utf-8")
+    ), "時間軸資料包已過期，請執行 `python -m libs.timeline` 重新產生"
+
+
+def test_timeline_matches_news_list_json():
+    """ 測試時間軸資料包解碼後的事件是否與新聞列表資料一致
+    """
+    timeline = Timeline(
+        json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    )
+    news_dict_list = [
+        news_dict
+        for news_dict in json.loads(
+            NEWS_LIST_JSON_PATH.read_text(encoding="utf-8")
+        )
+        if news_dict["households"]
+    ]
+
+    event_i_list = [
+        event_i
+        for day_i in range(timeline.day_count)
+        for event_i in range(
+            timeline.day_offset_list[day_i],
+            timeline.day_offset_list[day_i + 1],
+        )
+    ]
+    assert event_i_list == list(range(len(news_dict_list)))
+    for event_i, news_dict in enumerate(news_dict_list):
+        date = (
+            timeline.start_date
+            + datetime.timedelta(days=timeline.day_list[event_i])
+        )
+        assert f"{date:%Y-%m-%d}" == news_dict["date"]
+        assert event_i in timeline.get_event_index_range(date)
+        assert timeline.get_title(event_i) == news_dict["title"]
+        assert timeline.household_list[event_i] == news_dict["households"]
+        assert set(timeline.get_locations(event_i)) == set(news_dict["locations"])
+
+
+def test_timeline_load_events_in_chunks():
+    """ 測試分批載入事件時，日索引與關鍵影格索引皆與一次載入的結果一致
+    """
+    timeline_bundle_dict = json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    timeline = Timeline(timeline_bundle_dict)
+    chunk_timeline = Timeline(timeline_bundle_dict, is_loading_events=False)
+    blackout_keyframe_index = BlackoutKeyframeIndex(timeline)
+    chunk_blackout_keyframe_index = BlackoutKeyframeIndex(chunk_timeline)
+    assert chunk_timeline.loaded_day_count == 0
+
+    while chunk_timeline.loaded_day_count < chunk_timeline.day_count:
+        loaded_day_count = chunk_timeline.loaded_day_count
+        chunk_timeline.load_events(timeline_bundle_dict, len(chunk_timeline.day_list) + 97)
+        chunk_blackout_keyframe_index.build()
+        assert chunk_timeline.loaded_day_count >= loaded_day_count
+        assert (
+            chunk_timeline.day_offset_list[:chunk_timeline.loaded_day_count + 1]
+            == timeline.day_offset_list[:chunk_timeline.loaded_day_count + 1]
+        )
+
+    assert chunk_timeline.day_offset_list == timeline.day_offset_list
+    assert chunk_timeline.title_offset_list == timeline.title_offset_list
+    assert [
+        keyframe.get_city_to_hit_dict()
+        for keyframe in chunk_blackout_keyframe_index.keyframe_list
+    ] == [
+        keyframe.get_city_to_hit_dict()
+        for keyframe in blackout_keyframe_index.keyframe_list
+    ]
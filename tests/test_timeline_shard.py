@@ -0,0 +1,110 @@
+import datetime
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.blackout import BlackoutKeyframeIndex
+from libs.simulation import BlackoutSimulation
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+from libs.timeline_shard import (TIMELINE_MANIFEST_JSON_NAME,
+                                 TIMELINE_SHARD_DIR_PATH, ShardedTimeline,
+                                 build_timeline_shard_dict_list,
+                                 build_timeline_shard_json)
+
+
+@pytest.fixture(scope="module")
+def timeline_bundle_dict() -> dict:
+    return json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+
+
+def get_sharded_timeline(
+    timeline_bundle_dict: dict,
+    max_shard_count: int,
+) -> tuple[ShardedTimeline, list[dict]]:
+    """ 建立尚未載入任何分片的 ShardedTimeline 與各分片的資料 """
+    manifest_dict, shard_dict_list = build_timeline_shard_dict_list(timeline_bundle_dict)
+    return ShardedTimeline(manifest_dict, max_shard_count=max_shard_count), shard_dict_list
+
+
+def test_timeline_shard_json_up_to_date(tmp_path: Path, timeline_bundle_dict: dict):
+    """ 測試月份分片是否與時間軸資料包同步 (若失敗請執行 `python -m libs.timeline`)
+    """
+    build_timeline_shard_json(timeline_bundle_dict, timeline_shard_dir_path=tmp_path)
+    assert sorted(json_path.name for json_path in tmp_path.glob("*.json")) == sorted(
+        json_path.name for json_path in TIMELINE_SHARD_DIR_PATH.glob("*.json")
+    )
+    for json_path in tmp_path.glob("*.json"):
+        assert (
+            json_path.read_text(encoding="utf-8")
+            == (TIMELINE_SHARD_DIR_PATH / json_path.name).read_text(encoding="utf-8")
+        ), "月份分片已過期，請執行 `python -m libs.timeline` 重新產生"
+    assert (tmp_path / TIMELINE_MANIFEST_JSON_NAME).stat().st_size < 8 * 1024
+
+
+def test_sharded_timeline_matches_timeline(timeline_bundle_dict: dict):
+    """ 測試依序載入分片 (快取容量有限) 時，各天的事件與關鍵影格的停電比值皆與完整時間軸一致
+    """
+    timeline = Timeline(timeline_bundle_dict)
+    blackout_keyframe_index = BlackoutKeyframeIndex(timeline)
+    sharded_timeline, shard_dict_list = get_sharded_timeline(timeline_bundle_dict, 2)
+    assert sum(sharded_timeline.shard_event_count_list) == timeline.event_count
+
+    for day_i in range(-1, timeline.day_count + 1):
+        for shard_i in sharded_timeline.get_missing_shard_i_list(day_i, 1):
+            sharded_timeline.add_shard(shard_i, shard_dict_list[shard_i])
+        assert len(sharded_timeline.shard_i_to_timeline_dict) <= 2
+
+        shard_timeline, shard_day_i = sharded_timeline.get_day_timeline(day_i)
+        if not 0 <= day_i < timeline.day_count:
+            assert shard_timeline is None
+            continue
+        date = shard_timeline.start_date + datetime.timedelta(days=shard_day_i)
+        assert date == timeline.start_date + datetime.timedelta(days=day_i)
+        event_i_range = timeline.get_event_index_range(date)
+        shard_event_i_range = range(
+            shard_timeline.day_offset_list[shard_day_i],
+            shard_timeline.day_offset_list[shard_day_i + 1],
+        )
+        assert [timeline.get_title(event_i) for event_i in event_i_range] == [
+            shard_timeline.get_title(event_i) for event_i in shard_event_i_range
+        ]
+
+        assert {
+            city_name: ratio
+            for city_name, ratio in sharded_timeline.get_city_to_ratio_dict(day_i).items()
+            if ratio > 0
+        } == {
+            city_name: ratio
+            for city_name, ratio in blackout_keyframe_index.get_city_to_ratio_dict(day_i).items()
+            if ratio > 0
+        }
+
+
+def test_blackout_simulation_on_sharded_timeline(timeline_bundle_dict: dict):
+    """ 測試以分片時間軸播放與跳轉的結果與完整時間軸相同
+    """
+    sharded_timeline, shard_dict_list = get_sharded_timeline(timeline_bundle_dict, 3)
+    blackout_simulation = BlackoutSimulation(Timeline(timeline_bundle_dict))
+    sharded_blackout_simulation = BlackoutSimulation(sharded_timeline)
+
+    for day_i in [1000, *range(2000, 2100)]:
+        for shard_i in sharded_timeline.get_missing_shard_i_list(day_i, 0):
+            sharded_timeline.add_shard(shard_i, shard_dict_list[shard_i])
+        if day_i in (1000, 2000):
+            blackout_simulation.seek(day_i)
+            sharded_blackout_simulation.seek(day_i)
+        assert (
+            blackout_simulation.simulate_day(day_i)
+            == sharded_blackout_simulation.simulate_day(day_i)
+        )
+        assert (
+            blackout_simulation.get_city_to_color_index_dict(day_i)
+            == sharded_blackout_simulation.get_city_to_color_index_dict(day_i)
+        )
+    assert (
+        blackout_simulation.event_log.get_visible_row_list(10_000)
+        == sharded_blackout_simulation.event_log.get_visible_row_list(10_000)
+    )
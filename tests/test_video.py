@@ -0,0 +1,173 @@
+import datetime
+import json
+import random
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))  # noqa
+from libs.timeline import TIMELINE_JSON_PATH, Timeline
+from libs.video import (APNG_MAX_DELAY_MS, BACKGROUND_RGB, BLACKOUT_RGB_LUT,
+                        GIF_MAX_DELAY_CS, ApngWriter, GifWriter,
+                        get_gif_lzw_bytes, get_label_bytes, render_video)
+
+
+def decode_gif_lzw_bytes(gif_lzw_bytes: bytes) -> bytes:
+    """ 參考用的 GIF LZW 解碼器 """
+    min_code_size = gif_lzw_bytes[0]
+    data = bytearray()
+    i = 1
+    while gif_lzw_bytes[i]:
+        data += gif_lzw_bytes[i + 1:i + 1 + gif_lzw_bytes[i]]
+        i += 1 + gif_lzw_bytes[i]
+
+    clear_code = 1 << min_code_size
+    bit_int = int.from_bytes(data, "little")
+    bit_i = 0
+    decoded_bytes = bytearray()
+    code_size = min_code_size + 1
+    entry_list = list[bytes]()
+    previous_code = None
+    while bit_i + code_size <= len(data) * 8:
+        code = bit_int >> bit_i & ((1 << code_size) - 1)
+        bit_i += code_size
+        if code == clear_code:
+            entry_list = [bytes((code,)) for code in range(clear_code)] + [b"", b""]
+            code_size = min_code_size + 1
+            previous_code = None
+            continue
+        if code == clear_code + 1:
+            break
+        entry = (
+            entry_list[code]
+            if code < len(entry_list) else
+            entry_list[previous_code] + entry_list[previous_code][:1]
+        )
+        decoded_bytes += entry
+        if previous_code is not None and len(entry_list) < 4096:
+            entry_list.append(entry_list[previous_code] + entry[:1])
+            if len(entry_list) == 1 << code_size and code_size < 12:
+                code_size += 1
+        previous_code = code
+    return bytes(decoded_bytes)
+
+
+def test_gif_lzw_round_trip():
+    """ 測試 GIF LZW 壓縮可被標準解碼 (含編碼表滿載後的重設)
+    """
+    _random = random.Random(0)
+    for index_bytes in [
+        b"\x07",
+        bytes(100_000),
+        bytes(_random.randrange(256) for _ in range(50_000)),
+        bytes(_random.choice([0, 1, 2, 255]) for _ in range(50_000)),
+    ]:
+        assert decode_gif_lzw_bytes(get_gif_lzw_bytes(index_bytes)) == index_bytes
+
+
+def test_label_bytes():
+    """ 測試縣市標籤影像: 含背景、縣市與邊界標籤，且尺寸為偶數
+    """
+    label_bytes, height = get_label_bytes(121)
+    assert len(label_bytes) == 120 * height
+    assert height % 2 == 0
+    label_set = set(label_bytes)
+    assert 0 in label_set
+    assert len(label_set) > 10
+
+
+def iter_png_chunk(png_bytes: bytes):
+    i = 8
+    while i < len(png_bytes):
+        (length,) = struct.unpack(">I", png_bytes[i:i + 4])
+        yield png_bytes[i + 4:i + 8], png_bytes[i + 8:i + 8 + length]
+        i += 12 + length
+
+
+def test_render_video(tmp_path: Path):
+    """ 測試輸出 APNG 與 GIF: 影格數、第一個影格為完整畫面且顏色正確
+    """
+    timeline = Timeline(
+        json.loads(TIMELINE_JSON_PATH.read_text(encoding="utf-8"))
+    )
+    start_date = timeline.end_date - datetime.timedelta(days=10)
+
+    apng_path = tmp_path / "demo.png"
+    frame_count = render_video(
+        apng_path,
+        width=80,
+        start_date=start_date,
+        max_worker_count=2,
+    )
+    assert frame_count == 12
+    chunk_list = list(iter_png_chunk(apng_path.read_bytes()))
+    chunk_type_list = [chunk_type for chunk_type, _ in chunk_list]
+    assert chunk_type_list[:2] == [b"IHDR", b"acTL"]
+    assert chunk_type_list[-1] == b"IEND"
+    width, height = struct.unpack(">II", chunk_list[0][1][:8])
+    (apng_frame_count, _) = struct.unpack(">II", chunk_list[1][1])
+    assert apng_frame_count == chunk_type_list.count(b"fcTL")
+    assert struct.unpack(">II", chunk_list[2][1][4:12]) == (width, height)
+
+    # 第一個影格: 左上角為背景，且包含縣市的顏色
+    first_frame_bytes = zlib.decompress(chunk_list[3][1])
+    assert len(first_frame_bytes) == (1 + width * 3) * height
+    assert tuple(first_frame_bytes[1:4]) == BACKGROUND_RGB
+    rgb_set = {
+        tuple(first_frame_bytes[i:i + 3])
+        for row_i in range(height)
+        for i in range(row_i * (1 + width * 3) + 1, (row_i + 1) * (1 + width * 3), 3)
+    }
+    assert rgb_set & set(BLACKOUT_RGB_LUT)
+
+    gif_path = tmp_path / "demo.gif"
+    render_video(gif_path, width=80, start_date=start_date, max_worker_count=1)
+    gif_bytes = gif_path.read_bytes()
+    assert gif_bytes[:6] == b"GIF89a"
+    assert struct.unpack("<HH", gif_bytes[6:10]) == (width, height)
+    assert gif_bytes[-1:] == b"\x3B"
+
+
+def test_apng_writer_frame_delay(tmp_path: Path):
+    """ 測試 APNG 影格的顯示時間: 非整數的 fps 累計後不偏移，超過 u16 上限的顯示時間拆為多個影格
+    """
+    apng_path = tmp_path / "delay.png"
+    apng_writer = ApngWriter(apng_path, 1, 1, 29.97, 3)
+    frame_bytes = zlib.compress(b"\x00\xff\xff\xff")
+    for repeat_count in (1, 2, 3000):
+        apng_writer.write((0, 0, 1, 1), frame_bytes, repeat_count)
+    apng_writer.close()
+
+    chunk_list = list(iter_png_chunk(apng_path.read_bytes()))
+    delay_list = list[tuple[int, int]]()
+    for chunk_type, data in chunk_list:
+        if chunk_type == b"fcTL":
+            delay_list.append(struct.unpack(">HH", data[20:24]))
+    assert all(delay_den == 1000 for _, delay_den in delay_list)
+    delay_ms_list = [delay_num for delay_num, _ in delay_list]
+    assert delay_ms_list[:2] == [33, 67]
+    assert max(delay_ms_list) == APNG_MAX_DELAY_MS
+    assert sum(delay_ms_list) == round(3003 * 1000 / 29.97)
+    (apng_frame_count, _) = struct.unpack(">II", chunk_list[1][1])
+    assert apng_frame_count == len(delay_list) == 4
+
+
+def test_gif_writer_frame_delay(tmp_path: Path):
+    """ 測試 GIF 影格的顯示時間: 超過 u16 上限的顯示時間拆為多個影格
+    """
+    gif_path = tmp_path / "delay.gif"
+    gif_writer = GifWriter(gif_path, 1, 1, 10, 2)
+    frame_bytes = get_gif_lzw_bytes(b"\x00")
+    for repeat_count in (1, 7000):
+        gif_writer.write((0, 0, 1, 1), frame_bytes, repeat_count)
+    gif_writer.close()
+
+    gif_bytes = gif_path.read_bytes()
+    delay_cs_list = list[int]()
+    i = gif_bytes.find(b"\x21\xF9\x04\x04")
+    while i >= 0:
+        delay_cs_list.append(struct.unpack("<H", gif_bytes[i + 4:i + 6])[0])
+        i = gif_bytes.find(b"\x21\xF9\x04\x04", i + 1)
+    assert delay_cs_list == [10, GIF_MAX_DELAY_CS, 70000 - GIF_MAX_DELAY_CS]
+    assert gif_bytes.count(b"\x2C\x00\x00\x00\x00\x01\x00\x01\x00\x00") == 3